@@ -0,0 +1,178 @@
+import random
+
+
+class CityGenerator:
+    """
+    Generates a synthetic CityJSON (dictionary) with buildings and trees laid out on a grid.
+    The same parameters always generate the same CityJSON.
+    The vertices are unique (as in a CityJSON written by pycityjson) so the parsers don't merge any of them.
+    """
+
+    def __init__(
+        self,
+        cityobjects: int = 1000,
+        *,
+        lod: str = '2',
+        semantics_density: float = 1.0,
+        instance_ratio: float = 0.1,
+        hierarchy_depth: int = 1,
+        templates: int = 3,
+        seed: int = 0,
+    ):
+        """
+        :param cityobjects: number of CityObjects (the parts of the buildings are counted)
+        :param lod: '1' for boxes (6 faces) or '2' for boxes with a gabled roof (7 faces)
+        :param semantics_density: ratio [0, 1] of the building geometries with semantic surfaces
+        :param instance_ratio: ratio [0, 1] of the CityObjects that are trees with a GeometryInstance
+        :param hierarchy_depth: number of levels of BuildingPart under each Building (0 for no children)
+        :param templates: number of geometry templates used by the instances
+        :param seed: seed of the random sizes of the CityObjects
+        """
+        if lod not in ('1', '2'):
+            raise ValueError(f'The lod must be "1" or "2", not "{lod}"')
+        if not 0.0 <= semantics_density <= 1.0 or not 0.0 <= instance_ratio <= 1.0:
+            raise ValueError('The semantics density and the instance ratio must be between 0 and 1')
+        self.cityobjects = cityobjects
+        self.lod = lod
+        self.semantics_density = semantics_density
+        self.instance_ratio = instance_ratio
+        self.hierarchy_depth = hierarchy_depth
+        self.templates = templates
+        self.seed = seed
+
+    def __box(self, i: int, x: int, y: int, z: int, width: int, height: int) -> tuple[list[list[int]], list[list[list[int]]]]:
+        """
+        :param i: index of the first vertex of the building in the vertices of the CityJSON
+        :param x: x of the corner of the building
+        :param y: y of the corner of the building
+        :param z: z of the ground of the building
+        :param width: width of the building
+        :param height: height of the walls
+        :return: the vertices of the building (integers, in millimeters) and its faces (exterior shell of a Solid) - the ground, the walls and the roof surfaces
+        """
+        corners = [(x, y), (x + width, y), (x + width, y + width), (x, y + width)]
+        vertices = [[cx, cy, z] for cx, cy in corners] + [[cx, cy, z + height] for cx, cy in corners]
+        ground = [[i + 3, i + 2, i + 1, i]]
+        if self.lod == '1':
+            walls = [[[i + k, i + (k + 1) % 4, i + 4 + (k + 1) % 4, i + 4 + k]] for k in range(4)]
+            return vertices, [ground] + walls + [[[i + 4, i + 5, i + 6, i + 7]]]
+
+        # gabled roof: the ridge is parallel to the x axis
+        middle = y + width // 2
+        vertices += [[x, middle, z + height + width // 2], [x + width, middle, z + height + width // 2]]
+        walls = [
+            [[i, i + 1, i + 5, i + 4]],
+            [[i + 1, i + 2, i + 6, i + 9, i + 5]],
+            [[i + 2, i + 3, i + 7, i + 6]],
+            [[i + 3, i, i + 4, i + 8, i + 7]],
+        ]
+        roofs = [[[i + 4, i + 5, i + 9, i + 8]], [[i + 6, i + 7, i + 8, i + 9]]]
+        return vertices, [ground] + walls + roofs
+
+    def __semantics(self, faces: list) -> dict:
+        """
+        :param faces: faces of a building (see __box())
+        :return: the semantics of the faces
+        """
+        surfaces = [{'type': 'GroundSurface'}, {'type': 'WallSurface'}, {'type': 'RoofSurface', 'slope': 45.0}]
+        values = [0] + [1, 1, 1, 1] + [2] * (len(faces) - 5)
+        return {'surfaces': surfaces, 'values': [values]}
+
+    @staticmethod
+    def __add_vertices(vertices: list[list[int]], used: set[tuple[int, int, int]], new_vertices: list[list[int]]) -> bool:
+        """
+        :param vertices: list of the vertices of the CityJSON
+        :param used: the vertices of the CityJSON as tuples
+        :param new_vertices: vertices to add
+        :return: True if the vertices were added, False if one of them already exists (nothing is added)
+        """
+        keys = [tuple(vertex) for vertex in new_vertices]
+        if len(set(keys)) < len(keys) or any(key in used for key in keys):
+            return False
+        vertices += new_vertices
+        used.update(keys)
+        return True
+
+    def __building(self, rng: random.Random, vertices: list[list[int]], used: set[tuple[int, int, int]], x: int, y: int, level: int) -> dict:
+        """
+        :param rng: random generator of the sizes
+        :param vertices: list of the vertices of the CityJSON
+        :param used: the vertices of the CityJSON as tuples
+        :param x: x of the corner of the cell of the grid
+        :param y: y of the corner of the cell of the grid
+        :param level: 0 for the building, the level of the BuildingPart otherwise. The ground of the level n is n millimeters high
+        :return: the geometry of a building in a cell of 10 x 10 meters. The sizes are drawn again until all the vertices are new
+        """
+        while True:
+            width = rng.randint(4000, 8000)
+            height = rng.randint(3000, 20000)
+            new_vertices, faces = self.__box(len(vertices), x + 1000, y + 1000, level, width, height)
+            if self.__add_vertices(vertices, used, new_vertices):
+                break
+        geometry = {'type': 'Solid', 'lod': self.lod, 'boundaries': [faces]}
+        if rng.random() < self.semantics_density:
+            geometry['semantics'] = self.__semantics(faces)
+        return geometry
+
+    def __geometry_templates(self) -> dict:
+        """
+        :return: the geometry templates - pyramids of different sizes
+        """
+        templates = []
+        vertices_templates = []
+        for t in range(self.templates):
+            i = len(vertices_templates)
+            size = 1.0 + t
+            vertices_templates += [[-size, -size, 0.0], [size, -size, 0.0], [size, size, 0.0], [-size, size, 0.0], [0.0, 0.0, 3.0 * size]]
+            faces = [[[i + 3, i + 2, i + 1, i]], [[i, i + 1, i + 4]], [[i + 1, i + 2, i + 4]], [[i + 2, i + 3, i + 4]], [[i + 3, i, i + 4]]]
+            templates.append({'type': 'MultiSurface', 'lod': '2', 'boundaries': faces})
+        return {'templates': templates, 'vertices-templates': vertices_templates}
+
+    def generate(self) -> dict:
+        """
+        :return: the CityJSON as a dictionary
+        """
+        rng = random.Random(self.seed)
+        vertices: list[list[int]] = []
+        used: set[tuple[int, int, int]] = set()
+        cityobjects: dict[str, dict] = {}
+        trees = round(self.cityobjects * self.instance_ratio) if self.templates > 0 else 0
+        columns = max(int((self.cityobjects - trees) ** 0.5), 1)
+
+        cell = 0
+        while len(cityobjects) < self.cityobjects - trees:
+            x, y = (cell % columns) * 10000, (cell // columns) * 10000
+            uuid = f'building-{cell}'
+            cityobjects[uuid] = {'type': 'Building', 'attributes': {'cell': cell}, 'geometry': [self.__building(rng, vertices, used, x, y, 0)]}
+            parent = uuid
+            for level in range(self.hierarchy_depth):
+                if len(cityobjects) >= self.cityobjects - trees:
+                    break
+                part = f'{uuid}-part-{level}'
+                cityobjects[part] = {'type': 'BuildingPart', 'parents': [parent], 'geometry': [self.__building(rng, vertices, used, x, y, level + 1)]}
+                cityobjects[parent]['children'] = [part]
+                parent = part
+            cell += 1
+
+        for i in range(trees):
+            while not self.__add_vertices(vertices, used, [[rng.randint(0, columns * 10000), rng.randint(0, (cell // columns + 1) * 10000), 0]]):
+                pass
+            instance = {
+                'type': 'GeometryInstance',
+                'template': i % self.templates,
+                'boundaries': [len(vertices) - 1],
+                'transformationMatrix': [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0],
+            }
+            cityobjects[f'tree-{i}'] = {'type': 'SolitaryVegetationObject', 'attributes': {'species': rng.choice(['oak', 'maple', 'pine'])}, 'geometry': [instance]}
+
+        cityjson = {
+            'type': 'CityJSON',
+            'version': '2.0',
+            'transform': {'scale': [0.001, 0.001, 0.001], 'translate': [0.0, 0.0, 0.0]},
+            'metadata': {'title': f'Synthetic city of {self.cityobjects} CityObjects (seed {self.seed})'},
+            'CityObjects': cityobjects,
+            'vertices': vertices,
+        }
+        if trees > 0:
+            cityjson['geometry-templates'] = self.__geometry_templates()
+        return cityjson
@@ -0,0 +1,128 @@
+"""
+Times the main stages of pycityjson on a synthetic city and reports their time and peak memory.
+    python -m benchmarks.run --cityobjects 10000 --repeat 3
+Only the standard library is used: the time is the best of the repeats (time.perf_counter),
+the peak memory is measured in one more run traced with tracemalloc (numpy arrays are traced).
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from pycityjson import io, model
+
+from .generator import CityGenerator
+
+
+class Benchmark:
+    """
+    Runs the stages of the benchmark on the CityJSON file generated in a temporary directory
+    """
+
+    def __init__(self, generator: CityGenerator, repeat: int = 3, packed: bool = False):
+        """
+        :param generator: generator of the synthetic CityJSON
+        :param repeat: number of timed runs of each stage (the best is reported)
+        :param packed: if True, the City is read with packed geometries
+        """
+        self.__generator = generator
+        self.__repeat = repeat
+        self.__packed = packed
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__file_path = os.path.join(self.__directory.name, 'synthetic.city.json')
+        self.__results: list[dict] = []
+
+    def __measure(self, stage: str, function: Callable[..., object], setup: Callable[[], object] = None) -> None:
+        """
+        :param stage: name of the stage
+        :param function: function running the stage once. Receives the result of setup if there is one
+        :param setup: function called before each run (not timed) to give the stage fresh data when it modifies it
+        """
+        seconds = float('inf')
+        for _ in range(self.__repeat):
+            arguments = () if setup is None else (setup(),)
+            start = time.perf_counter()
+            function(*arguments)
+            seconds = min(seconds, time.perf_counter() - start)
+
+        arguments = () if setup is None else (setup(),)
+        tracemalloc.start()
+        function(*arguments)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.__results.append({'stage': stage, 'seconds': seconds, 'peak_mib': peak / 2**20})
+
+    def run(self) -> list[dict]:
+        """
+        :return: the time in seconds and the peak memory in MiB of each stage
+        """
+        cityjson = self.__generator.generate()
+        io.write_json(cityjson, self.__file_path)
+        uuids = list(cityjson['CityObjects'].keys())
+        del cityjson
+        output_path = os.path.join(self.__directory.name, 'output')
+
+        self.__measure('read_cityjson', lambda: io.read_cityjson(self.__file_path, packed=self.__packed))
+        city = io.read_cityjson(self.__file_path, packed=self.__packed)
+
+        self.__measure('write_as_cityjson (purge)', lambda: io.write_as_cityjson(city, output_path, purge_vertices=True))
+        self.__measure('write_as_cityjson (no purge)', lambda: io.write_as_cityjson(city, output_path, purge_vertices=False))
+        self.__measure('write_as_wavefront', lambda: io.write_as_wavefront(city, output_path))
+
+        # each run transforms a City read again: the runs measure the same data
+        matrix = model.TransformationMatrix().rotate_z(1.0).translate([1.0, 2.0, 0.0])
+        self.__measure(
+            'CityObject.transform',
+            lambda cityobjects: [cityobject.transform(matrix) for cityobject in cityobjects],
+            setup=lambda: io.read_cityjson(self.__file_path, packed=self.__packed).cityobjects.tolist(),
+        )
+        self.__measure('CityObjects.get_by_uuid', lambda: [city.cityobjects.get_by_uuid(uuid) for uuid in uuids])
+
+        self.__directory.cleanup()
+        return self.__results
+
+
+def print_results(results: list[dict]) -> None:
+    """
+    :param results: results of Benchmark.run()
+    """
+    width = max(len(result['stage']) for result in results)
+    print(f'{"stage":<{width}}  {"time (s)":>10}  {"peak (MiB)":>10}')
+    for result in results:
+        print(f'{result["stage"]:<{width}}  {result["seconds"]:>10.4f}  {result["peak_mib"]:>10.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Times read, write, transform and lookup on a synthetic CityJSON')
+    parser.add_argument('--cityobjects', type=int, default=1000, help='number of CityObjects')
+    parser.add_argument('--lod', default='2', choices=['1', '2'], help='level of detail of the buildings')
+    parser.add_argument('--semantics-density', type=float, default=1.0, help='ratio of the buildings with semantic surfaces')
+    parser.add_argument('--instance-ratio', type=float, default=0.1, help='ratio of the CityObjects that are GeometryInstance')
+    parser.add_argument('--hierarchy-depth', type=int, default=1, help='levels of BuildingPart under each Building')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the generator')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs of each stage')
+    parser.add_argument('--packed', action='store_true', help='read the geometries as PackedPrimitive')
+    parser.add_argument('--json', help='also writes the results in this JSON file (to compare runs)')
+    args = parser.parse_args()
+
+    generator = CityGenerator(
+        args.cityobjects,
+        lod=args.lod,
+        semantics_density=args.semantics_density,
+        instance_ratio=args.instance_ratio,
+        hierarchy_depth=args.hierarchy_depth,
+        seed=args.seed,
+    )
+    results = Benchmark(generator, args.repeat, args.packed).run()
+    print_results(results)
+    if args.json is not None:
+        with open(args.json, 'w') as json_file:
+            json.dump({'parameters': vars(args), 'results': results}, json_file, indent=1)
+
+
+if __name__ == '__main__':
+    main()
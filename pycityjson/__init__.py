@@ -1,3 +1,11 @@
+import importlib.metadata
+
+try:
+    __version__ = importlib.metadata.version('pycityjson')  # keys the parse cache (see pycityjson.io.ParseCache)
+except importlib.metadata.PackageNotFoundError:
+    # not installed (ex.: run from the sources)
+    __version__ = 'unknown'
+
 from .io import read_cityjson, write_as_cityjson
 
 __all__ = [
@@ -1,86 +1,248 @@
-import json
+from collections.abc import Callable
+from typing import Iterator
 
-from pycityjson.model import City
+from pycityjson.model import City, CityObject, GeometryTemplates, Vertices
 
-from .cityjson_input import CityParser
-from .cityjson_output import CitySerializer
+from .cache import ParseCache
+from .cityjson_input import CityJSONFeatureParser, CityObjectsFilter, CityParser, RawGeometries
+from .cityjson_output import CityJSONSeqWriter, CitySerializer
+from .json_backend import JsonBackend, get_json_backend
+from .profiler import NullProfiler, Profiler, get_profiler
+from .snapshot import SnapshotParser, SnapshotSerializer
 from .wavefront_output import WavefrontSerializer
 
 
-def read_json(file_path: str) -> dict:
+def read_json(file_path: str, json_backend: str | JsonBackend = None) -> dict:
     """
     Reads a JSON file and returns it as a dictionary
     :param file_path: path to the JSON file
+    :param json_backend: name of the JSON library to use - see get_json_backend(). The fastest installed one by default
     """
+    backend = get_json_backend(json_backend)
     try:
-        with open(file_path, 'r') as json_file:
-            str_json = json.load(json_file)
+        str_json = backend.load(file_path)
     except Exception as e:
         print(f'Error reading JSON file: {e}')
         return None
     return str_json
 
 
-def write_json(str_json: dict, file_path: str, indent=0):
+def write_json(str_json: dict, file_path: str, indent=0, json_backend: str | JsonBackend = None):
     """
     Writes a dictionary as a JSON file
-    :param str_json: dictionary to be written
+    :param str_json: dictionary to be written. May contain numpy arrays
     :param file_path: path to the JSON file
     :param indent: indentation level. If 0, no indentation is used
+    :param json_backend: name of the JSON library to use - see get_json_backend(). The fastest installed one by default
     """
+    backend = get_json_backend(json_backend)
     try:
-        with open(file_path, 'w') as json_file:
-            if indent > 0:
-                json.dump(str_json, json_file, indent=indent)
-            else:
-                json.dump(str_json, json_file)
+        backend.dump(str_json, file_path, indent)
     except Exception as e:
         print(f'Error writing JSON file: {e}')
 
 
-def read_cityjson(file_path: str) -> City:
+def read_cityjson(
+    file_path: str,
+    *,
+    packed=False,
+    json_backend: str | JsonBackend = None,
+    types: list[str] = None,
+    uuids: list[str] = None,
+    predicate: Callable[[dict], bool] = None,
+    lods: list[str] = None,
+    include_related=False,
+    geometry='full',
+    workers: int = None,
+    profiler: Profiler = None,
+    cache_dir: str = None,
+    cache_size: int = None,
+) -> City:
     """
     Reads a CityJSON and parses it into a City object
+    The filters are applied before parsing the geometries: the CityObjects that are not selected are never parsed.
     :param file_path: path to the CityJSON file
+    :param packed: if True, the geometries are stored as PackedPrimitive (arrays) instead of Point objects to use less memory
+    :param json_backend: 'orjson', 'simdjson', 'ujson' or 'json' (standard library). The fastest installed one by default
+    :param types: types of the CityObjects to keep (ex.: ['Building']). All the types if None
+    :param uuids: uuids of the CityObjects to keep. All the CityObjects if None
+    :param predicate: function receiving the attributes of a CityObject and returning True to keep it
+    :param lods: level of details of the geometries to keep (ex.: ['1', '2.2']). All the geometries if None
+    :param include_related: if True, the parents and the children (recursively) of the selected CityObjects are also kept
+    :param geometry: 'full' to parse the geometries,
+        'lazy' to keep them as raw data until the first access to CityObject.geometries (they are parsed when the City is written),
+        'skip' to only load the attributes, the types and the hierarchy of the CityObjects
+    :param workers: number of processes parsing the CityObjects (only with geometry='full'). The City is the same as with one process.
+        Parsed in this process if None. Faster for large files only: the CityObjects are copied between the processes.
+    :param profiler: records the time of the decoding of the JSON and of each stage of the parsing - see Profiler. Nothing is recorded if None
+    :param cache_dir: directory caching the parsed City as a snapshot (see ParseCache). The next reads of the unchanged file load the snapshot.
+        The entry is invalidated when the file or the version of pycityjson changes. Not used with a predicate (it can't be compared).
+    :param cache_size: maximum size of the cache in bytes. The least recently used entries are removed. No limit if None
     """
-    cityjson = read_json(file_path)
-    city_parser = CityParser(cityjson)
-    return city_parser.parse()
+    profiler = get_profiler(profiler)
+    cityobjects_filter = CityObjectsFilter(types, uuids, predicate, lods, include_related)
 
+    def parse(geometry: str) -> City:
+        with profiler.stage('read_json'):
+            cityjson = read_json(file_path, json_backend)
+        city_parser = CityParser(cityjson, packed, cityobjects_filter, geometry, workers, profiler)
+        return city_parser.parse()
 
-def write_as_cityjson(city: City, file_path, *, purge_vertices=True, pretty=False):
+    if cache_dir is None or predicate is not None:
+        return parse(geometry)
+    options = {'packed': packed, 'types': types, 'uuids': uuids, 'lods': lods, 'include_related': include_related}
+    with profiler.stage('ParseCache.read'):
+        return ParseCache(cache_dir, cache_size).read(file_path, options, lambda: parse('full'), packed, geometry)
+
+
+def read_cityjsonseq(file_path: str, *, packed=False, json_backend: str | JsonBackend = None) -> Iterator[CityObject]:
+    """
+    Reads a CityJSONSeq (CityJSON Text Sequences) file one feature at a time
+    The first line is the CityJSON header (transform, metadata, templates). Each following line is a CityJSONFeature.
+    Only one feature is held in memory at a time.
+    :param file_path: path to the CityJSONSeq file
+    :param packed: if True, the geometries are stored as PackedPrimitive (arrays) instead of Point objects
+    :param json_backend: 'orjson', 'simdjson', 'ujson' or 'json' (standard library). The fastest installed one by default
+    :return: generator of the main CityObject of each feature (its children are linked to it)
+    """
+    backend = get_json_backend(json_backend)
+    with open(file_path, 'rb') as jsonl_file:
+        city_parser = None
+        for line in jsonl_file:
+            if line.strip() == b'':
+                continue
+            data = backend.loads(line)
+            if city_parser is None:
+                city_parser = CityParser(data, packed)
+                feature_parser = CityJSONFeatureParser(city_parser.parse(), packed)
+                continue
+            yield feature_parser.parse(data)
+
+
+def write_as_cityjson(
+    city: City,
+    file_path,
+    *,
+    purge_vertices=True,
+    pretty=False,
+    semantic_uuids=True,
+    json_backend: str | JsonBackend = None,
+    workers: int = None,
+    profiler: Profiler = None,
+):
     """
     Writes a City object as a CityJSON file
     :param city: City object to be written
     :param file_path: path to the CityJSON file
     :param purge_vertices: if True, the un-used vertices are removed from the CityJSON. They may be used by unsupported extensions.
-    :param pretty: if True, the JSON is written with one space indentation
+    :param pretty: if True, the JSON is written with one space indentation (two spaces with orjson)
+    :param semantic_uuids: if True, each semantic surface is written with a uuid (generated if missing). If False, only the existing uuids are written.
+    :param json_backend: 'orjson', 'simdjson', 'ujson' or 'json' (standard library). The fastest installed one by default
+    :param workers: number of processes serializing the CityObjects. The CityJSON is the same as with one process.
+        Serialized in this process if None, if the vertices are not purged or if the processes can't be forked (Windows).
+    :param profiler: records the time of each stage of the serialization and of the encoding of the JSON - see Profiler. Nothing is recorded if None
     """
-    city_serializer = CitySerializer(city)
-    city_dict = city_serializer.serialize(purge_vertices)
+    profiler = get_profiler(profiler)
+    backend = get_json_backend(json_backend)
+    city_serializer = CitySerializer(city, profiler)
+    city_dict = city_serializer.serialize(purge_vertices, semantic_uuids, backend.supports_numpy, workers)
     indent = 1 if pretty else 0
-    write_json(city_dict, file_path, indent)
+    with profiler.stage('write_json'):
+        write_json(city_dict, file_path, indent, backend)
+
+
+def write_as_cityjsonseq(city: City, file_path, *, semantic_uuids=True, json_backend: str | JsonBackend = None):
+    """
+    Writes a City object as a CityJSONSeq (CityJSON Text Sequences) file.
+    Each CityObject without parents is written as one CityJSONFeature with its children and its own list of vertices.
+    The features are written one at a time so the whole CityJSON is never held in memory.
+    :param city: City object to be written
+    :param file_path: path to the CityJSONSeq file
+    :param semantic_uuids: if True, each semantic surface is written with a uuid (generated if missing). If False, only the existing uuids are written.
+    :param json_backend: 'orjson', 'simdjson', 'ujson' or 'json' (standard library). The fastest installed one by default
+    """
+    # the templates must be known before writing the header. They are collected apart so the City is not modified
+    geometry_templates = GeometryTemplates([], Vertices(precision=city.precision()))
+    for cityobject in city.cityobjects:
+        loader = cityobject.get_geometries_loader()
+        if isinstance(loader, RawGeometries):
+            for data in loader.data:
+                if 'template' in data:
+                    geometry_templates.add_template(loader.city.geometry_templates[data['template']])
+            continue
+        for geometry in cityobject.geometries:
+            if geometry.is_geometry_instance():
+                geometry_templates.add_template(geometry.geometry)
+
+    with open(file_path, 'wb') as jsonl_file:
+        writer = CityJSONSeqWriter(jsonl_file, city, semantic_uuids, json_backend, geometry_templates)
+        writer.write_header()
+        for cityobject in city.cityobjects:
+            if len(cityobject.parents) == 0:
+                writer.write(cityobject)
 
 
-def write_as_wavefront(city: City, file_path, *, as_one_geometry=False, swap_yz=False):
+def write_as_wavefront(city: City, file_path, *, as_one_geometry=False, swap_yz=False, profiler: Profiler = None):
     """
     Writes a City object as a Wavefront OBJ file. Some CityJSON features are not supported in Wavefront OBJ.
     :param city: City object to be written
     :param file_path: path to the Wavefront OBJ file
     :param as_one_geometry: if True, all geometries are written as a single geometry. Otherwise, each object has its own 'o' line with a 'g' line for each geometry
     :param swap_yz: if True, the Y and Z coordinates are swapped for wavefront visualization
+    :param profiler: records the time of each stage of the serialization and of the writing of the file - see Profiler. Nothing is recorded if None
     """
-    wavefront_serializer = WavefrontSerializer(city)
+    profiler = get_profiler(profiler)
+    wavefront_serializer = WavefrontSerializer(city, profiler)
     wavefront_str: list[str] = wavefront_serializer.serialize(as_one_geometry=as_one_geometry, swap_yz=swap_yz)
-    with open(file_path, 'w') as wavefront_file:
-        for line in wavefront_str:
-            wavefront_file.write(f'{line}\n')
+    with profiler.stage('write_as_wavefront:write_file', lines=len(wavefront_str)):
+        with open(file_path, 'w') as wavefront_file:
+            for line in wavefront_str:
+                wavefront_file.write(f'{line}\n')
+
+
+def save_snapshot(city: City, directory: str):
+    """
+    Saves a City as a binary snapshot reloaded much faster than a CityJSON - see load_snapshot()
+    The vertices and the boundaries of the geometries are saved as numpy arrays (.npy), the rest in a JSON file.
+    :param city: City to save. Its lazy geometries are loaded
+    :param directory: directory of the snapshot. Created if it doesn't exist
+    """
+    SnapshotSerializer(city).save(directory)
+
+
+def load_snapshot(directory: str, *, packed=False, geometry='full', mmap_mode: str = None) -> City:
+    """
+    Loads a City saved with save_snapshot(). The City is written as the City that was saved.
+    No boundary is parsed: the geometries are created from slices of the arrays of the snapshot.
+    :param directory: directory of the snapshot
+    :param packed: if True, the geometries are PackedPrimitive viewing the arrays of the snapshot (the fastest)
+    :param geometry: 'full' to create the geometries, 'lazy' to create them on the first access to CityObject.geometries,
+        'skip' to only load the attributes, the types and the hierarchy of the CityObjects
+    :param mmap_mode: None to read the arrays in memory. 'r' or 'c' to memory-map the vertices (and the arrays of the packed geometries):
+        the coordinates are paged in by the OS when they are used. 'r' is read-only: no vertex can be added to City.vertices.
+        'c' is copy-on-write: the snapshot is never modified. The snapshot must not be replaced while the City is used.
+    """
+    return SnapshotParser(directory, packed, geometry, mmap_mode).parse()
 
 
 __all__ = [
+    'CityJSONFeatureParser',
+    'CityJSONSeqWriter',
+    'CityObjectsFilter',
     'CityParser',
     'CitySerializer',
+    'JsonBackend',
+    'NullProfiler',
+    'ParseCache',
+    'Profiler',
+    'SnapshotParser',
+    'SnapshotSerializer',
+    'get_json_backend',
+    'load_snapshot',
     'read_cityjson',
+    'read_cityjsonseq',
+    'save_snapshot',
     'write_as_cityjson',
+    'write_as_cityjsonseq',
     'write_as_wavefront',
 ]
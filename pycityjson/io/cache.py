@@ -0,0 +1,213 @@
+"""
+Cache of the parsed CityJSON files, stored as snapshots (see snapshot.py) in a directory.
+
+Each entry is the snapshot of a City in a sub-directory named by its key: the hash of the content of the file,
+the options changing the parsed City and the versions of pycityjson and of the snapshot format.
+A modified file has a new key and a new version of pycityjson never reads the entries of the previous one.
+The least recently used entries are removed when the cache is larger than its maximum size.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import warnings
+from collections.abc import Callable
+
+from pycityjson import __version__
+from pycityjson.model import City
+
+from .snapshot import SNAPSHOT_VERSION, SnapshotParser, SnapshotSerializer
+
+SOURCES_FILE = 'sources.json'
+TEMPORARY_PREFIX = '.tmp-'
+HASH_CHUNK_SIZE = 2**20
+
+
+class ParseCache:
+    """
+    The hash of a file is only computed when its size or its modification time changed: they are kept in sources.json
+    with the keys of the entries of the file. A file is removed from sources.json when all its entries are removed.
+    Several processes can share the cache: the entries are written in a temporary directory that is renamed when it is complete.
+    """
+
+    def __init__(self, directory: str, max_size: int = None):
+        """
+        :param directory: directory of the cache. Created if it doesn't exist
+        :param max_size: maximum size of the cache in bytes. The least recently used entries are removed to stay below it. No limit if None
+        """
+        self.__directory: str = directory
+        self.__max_size: int | None = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def __load_sources(self) -> dict[str, dict]:
+        """
+        :return: the size, the modification time, the hash and the keys of the entries of the files already read, by their absolute path
+        """
+        try:
+            with open(os.path.join(self.__directory, SOURCES_FILE), 'r') as sources_file:
+                return json.load(sources_file)
+        except (OSError, ValueError):
+            return {}
+
+    def __save_sources(self, sources: dict[str, dict]) -> None:
+        """
+        The file is replaced at once so the other processes never read a partial file
+        :param sources: see self.__load_sources()
+        """
+        file_descriptor, temporary_path = tempfile.mkstemp(prefix=TEMPORARY_PREFIX, dir=self.__directory)
+        with os.fdopen(file_descriptor, 'w') as sources_file:
+            json.dump(sources, sources_file)
+        os.replace(temporary_path, os.path.join(self.__directory, SOURCES_FILE))
+
+    @staticmethod
+    def __hash_file(file_path: str) -> str:
+        """
+        :param file_path: path to the file
+        :return: sha256 of the content of the file
+        """
+        file_hash = hashlib.sha256()
+        with open(file_path, 'rb') as source_file:
+            for chunk in iter(lambda: source_file.read(HASH_CHUNK_SIZE), b''):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    def get_key(self, file_path: str, options: dict) -> str:
+        """
+        :param file_path: path to the CityJSON file
+        :param options: options changing the parsed City (must be JSON serializable)
+        :return: the key of the entry of the file parsed with the options
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        sources = self.__load_sources()
+        source = sources.get(path)
+        if source is None or source['size'] != stat.st_size or source['mtime_ns'] != stat.st_mtime_ns:
+            source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': self.__hash_file(path), 'keys': []}
+            sources[path] = source
+
+        key = {'hash': source['hash'], 'size': source['size'], 'pycityjson': __version__, 'snapshot': SNAPSHOT_VERSION, 'options': options}
+        key = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+        if key not in source.setdefault('keys', []):
+            source['keys'].append(key)
+            self.__save_sources(sources)
+        return key
+
+    def load(self, key: str, packed: bool = False, geometry: str = 'full') -> City | None:
+        """
+        :param key: key of the entry - see self.get_key()
+        :param packed: if True, the geometries are PackedPrimitive - see load_snapshot()
+        :param geometry: 'full', 'lazy' or 'skip' - see load_snapshot()
+        :return: the City of the entry or None if the entry doesn't exist
+        """
+        entry = os.path.join(self.__directory, key)
+        if not os.path.isdir(entry):
+            return None
+        os.utime(entry)  # most recently used
+        return SnapshotParser(entry, packed, geometry).parse()
+
+    def save(self, key: str, city: City) -> None:
+        """
+        Adds an entry, then removes the least recently used entries if the cache is too large
+        :param key: key of the entry - see self.get_key()
+        :param city: City to save. Its lazy geometries are loaded
+        """
+        entry = os.path.join(self.__directory, key)
+        temporary_entry = tempfile.mkdtemp(prefix=TEMPORARY_PREFIX, dir=self.__directory)
+        try:
+            SnapshotSerializer(city).save(temporary_entry)
+            os.replace(temporary_entry, entry)
+        except OSError:
+            shutil.rmtree(temporary_entry, ignore_errors=True)
+            # the same entry was added by another process in the meantime
+            if not os.path.isdir(entry):
+                raise
+        self.evict(keep=key)
+
+    def read(self, file_path: str, options: dict, parse: Callable[[], City], packed: bool = False, geometry: str = 'full') -> City:
+        """
+        :param file_path: path to the CityJSON file
+        :param options: options changing the parsed City - see self.get_key()
+        :param parse: parses the file with the options, packed and geometry='full' when the entry doesn't exist
+        :param packed: if True, the geometries are PackedPrimitive
+        :param geometry: 'full', 'lazy' or 'skip' - see read_cityjson()
+        :return: the City of the file. When the entry doesn't exist, the parsed City is returned with geometry='full'
+            and loaded from the new entry otherwise. The parsed City is returned if the entry can't be written (a warning is emitted)
+        """
+        key = self.get_key(file_path, options)
+        city = self.load(key, packed, geometry)
+        if city is not None:
+            self.evict(keep=key)
+            return city
+
+        city = parse()
+        try:
+            self.save(key, city)
+        except OSError as error:
+            warnings.warn(f'The parsed City could not be added to the cache {self.__directory}: {error}', stacklevel=2)
+            return city
+        if geometry == 'full':
+            return city
+        return self.load(key, packed, geometry)
+
+    def __get_entries(self) -> list[tuple[float, int, str]]:
+        """
+        :return: the last use, the size in bytes and the path of each entry
+        """
+        entries = []
+        for item in os.scandir(self.__directory):
+            if not item.is_dir() or item.name.startswith(TEMPORARY_PREFIX):
+                continue
+            size = sum(file.stat().st_size for file in os.scandir(item.path) if file.is_file())
+            entries.append((item.stat().st_mtime, size, item.path))
+        return entries
+
+    def get_size(self) -> int:
+        """
+        :return: total size of the entries in bytes
+        """
+        return sum(size for _, size, _ in self.__get_entries())
+
+    def evict(self, keep: str = None) -> None:
+        """
+        Removes the least recently used entries until the cache is smaller than its maximum size
+        :param keep: key of an entry that is never removed (ex.: the entry just added)
+        """
+        if self.__max_size is None:
+            return
+        entries = sorted(self.__get_entries())
+        total = sum(size for _, size, _ in entries)
+        evicted = False
+        for _, size, path in entries:
+            if total <= self.__max_size:
+                break
+            if os.path.basename(path) == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            evicted = True
+        if evicted:
+            self.__prune_sources()
+
+    def __prune_sources(self) -> None:
+        """
+        Removes the keys of the removed entries from sources.json and the files without any entry
+        """
+        keys = {os.path.basename(path) for _, _, path in self.__get_entries()}
+        sources = {}
+        for path, source in self.__load_sources().items():
+            source['keys'] = [key for key in source.get('keys', []) if key in keys]
+            if len(source['keys']) > 0:
+                sources[path] = source
+        self.__save_sources(sources)
+
+    def clear(self) -> None:
+        """
+        Removes all the entries and the known sources
+        """
+        for item in os.scandir(self.__directory):
+            if item.is_dir():
+                shutil.rmtree(item.path, ignore_errors=True)
+            else:
+                os.remove(item.path)
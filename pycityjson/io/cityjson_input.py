@@ -1,3 +1,9 @@
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from itertools import chain
+from multiprocessing.shared_memory import SharedMemory
+
 import numpy as np
 
 from pycityjson.guid import guid
@@ -15,6 +21,7 @@ from pycityjson.model import (
     MultiPoint,
     MultiSolid,
     MultiSurface,
+    PackedPrimitive,
     Point,
     Primitive,
     Semantic,
@@ -24,6 +31,8 @@ from pycityjson.model import (
     Vertices,
 )
 
+from .profiler import Profiler, get_profiler
+
 
 def get_attribute(data: dict, key: str, *, default=None):
     """
@@ -36,6 +45,16 @@ def get_attribute(data: dict, key: str, *, default=None):
     return default
 
 
+def flatten_boundaries(boundaries: list) -> list[int]:
+    """
+    :param boundaries: nested lists of the indexes of the vertices (any depth)
+    :return: flat list of the indexes in the order of the boundaries
+    """
+    while len(boundaries) > 0 and isinstance(boundaries[0], list):
+        boundaries = list(chain.from_iterable(boundaries))
+    return boundaries
+
+
 def get_nested_attribute(data: dict, key_a: str, key_b: str, *, default=None):
     """
     :param data: dictionary to search for the key
@@ -212,6 +231,19 @@ class MultiSolidParser(PrimitiveParser):
         return super()._parse(self.__primitive, self.__child_parser, boundary, semantics, values)
 
 
+class PackedPrimitiveParser(PrimitiveParser):
+    def parse(self, data: dict) -> PackedPrimitive:
+        """
+        Used to parse any primitive geometry directly into arrays without creating the Points
+        data contains cityjson['CityObjects'][uuid]['geometry'][index]
+        :param data: dictionary containing the geometry data at a specific index
+        """
+        semantics_surface = get_nested_attribute(data, 'semantics', 'surfaces', default=None)
+        semantics_values = get_nested_attribute(data, 'semantics', 'values', default=None)
+        semantics = SemanticParser(self.city).parse(semantics_surface) if semantics_surface is not None else None
+        return PackedPrimitive.from_boundaries(data['type'], data['boundaries'], self.city.vertices.toarray(), semantics, semantics_values)
+
+
 ALT_PRIMITIVE = ['CompositeSolid', 'CompositeSurface']
 
 GEOMETRY_PARSERS = {
@@ -226,8 +258,13 @@ GEOMETRY_PARSERS = {
 
 
 class CityGeometryParser:
-    def __init__(self, city: City):
+    def __init__(self, city: City, packed: bool = False):
+        """
+        :param city: City containing the vertices and the geometry templates
+        :param packed: if True, the primitives are parsed as PackedPrimitive
+        """
         self.__city: City = city
+        self.__packed: bool = packed
 
     def parse(self, data: dict) -> CityGeometry:
         """
@@ -237,7 +274,7 @@ class CityGeometryParser:
         """
         dtype = data['type']
         if dtype in GEOMETRY_PARSERS:
-            parser = GeometryParser(self.__city)
+            parser = GeometryParser(self.__city, self.__packed)
             return parser.parse(data)
         elif dtype == 'GeometryInstance':
             parser = InstanceParser(self.__city)
@@ -247,8 +284,13 @@ class CityGeometryParser:
 
 
 class GeometryParser:
-    def __init__(self, city: City):
+    def __init__(self, city: City, packed: bool = False):
+        """
+        :param city: City containing the vertices
+        :param packed: if True, the primitives are parsed as PackedPrimitive
+        """
         self.__city: City = city
+        self.__packed: bool = packed
 
     def parse(self, data: dict) -> GeometryPrimitive:
         """
@@ -259,6 +301,8 @@ class GeometryParser:
         dtype = data['type']
         if dtype not in GEOMETRY_PARSERS:
             raise ValueError(f'Unknown geometry type: {dtype}')
+        if self.__packed:
+            return GeometryPrimitive(PackedPrimitiveParser(self.__city).parse(data), lod)
         parser = GEOMETRY_PARSERS[dtype](self.__city)
         primitive = parser.parse(data)
         if dtype in ALT_PRIMITIVE:
@@ -284,8 +328,13 @@ class InstanceParser:
 
 
 class GeometryTemplateParser:
-    def __init__(self, city):
+    def __init__(self, city, packed: bool = False):
+        """
+        :param city: City containing the materials
+        :param packed: if True, the templates are parsed as PackedPrimitive
+        """
         self.__city: City = city
+        self.__packed: bool = packed
         self.__material_parser = GeometryMaterialParser(self.__city)
 
     def parse(self, data: dict) -> GeometryTemplates:
@@ -298,7 +347,7 @@ class GeometryTemplateParser:
         v_parser = VerticesParser([0, 0, 0], [1.0, 1.0, 1.0], self.__city.precision())
         city.vertices = v_parser.parse(get_attribute(data, 'vertices-templates', default=[]))
 
-        gm_parser = GeometryParser(city)
+        gm_parser = GeometryParser(city, self.__packed)
         templates_data = get_attribute(data, 'templates', default=[])
         templates = [gm_parser.parse(template) for template in templates_data]
         self.__material_parser.parse(templates_data, templates)
@@ -327,12 +376,24 @@ class GeometryMaterialParser:
         data contains cityjson['CityObjects'][uuid]['geometry'][i]['material'][theme]
         """
         values = self.__get_values(data, geometry)
+        if geometry.is_geometry_primitive() and isinstance(geometry.primitive, PackedPrimitive):
+            self.__parse_packed_themes(values, theme, geometry.primitive)
+            return
         surfaces = geometry.get_surfaces(flatten=True)
 
         for surface, value in zip(surfaces, values):
             material = self.__city.materials[value]
             surface.set_material(material, theme)
 
+    def __parse_packed_themes(self, values: list, theme: str, primitive: PackedPrimitive):
+        """
+        Sets the materials of all the surfaces of a PackedPrimitive at once
+        :param values: nested list of the indexes of the materials for each surface
+        """
+        while len(values) > 0 and isinstance(values[0], list):
+            values = list(chain.from_iterable(values))
+        primitive.set_materials([self.__city.materials[value] for value in values], theme)
+
     def __parse_geometry(self, data: dict, geometry: CityGeometry):
         """
         data contains cityjson['CityObjects'][uuid]['geometry'][i]
@@ -352,11 +413,49 @@ class GeometryMaterialParser:
             self.__parse_geometry(g_data, geometry)
 
 
+class RawGeometries:
+    """
+    Geometries of a CityObject kept as raw CityJSON data until they are used - see CityObject.set_geometries_loader()
+    """
+
+    def __init__(self, data: list[dict], city: City, geometry_parser: 'CityGeometryParser', material_parser: GeometryMaterialParser):
+        """
+        :param data: cityjson['CityObjects'][uuid]['geometry']
+        :param city: copy of the City with the vertices and the geometry templates referenced by the data
+        :param geometry_parser: parser of the geometries with the vertices, the templates and the materials of the file
+        :param material_parser: parser of the materials of the geometries
+        """
+        self.data: list[dict] = data
+        self.city: City = city
+        self.__geometry_parser = geometry_parser
+        self.__material_parser = material_parser
+
+    def __call__(self) -> list[CityGeometry]:
+        """
+        :return: the parsed geometries
+        """
+        geometries = [self.__geometry_parser.parse(g) for g in self.data]
+        self.__material_parser.parse(self.data, geometries)
+        return geometries
+
+
 class CityObjectParser:
-    def __init__(self, city: City):
+    GEOMETRY_MODES = ['full', 'lazy', 'skip']
+
+    def __init__(self, city: City, packed: bool = False, geometry: str = 'full'):
+        """
+        :param city: City containing the vertices, the geometry templates and the materials
+        :param packed: if True, the primitives are parsed as PackedPrimitive
+        :param geometry: 'full' to parse the geometries, 'lazy' to parse them on first access, 'skip' to ignore them
+        """
+        if geometry not in self.GEOMETRY_MODES:
+            raise ValueError(f'Unknown geometry mode: {geometry}. Must be one of {self.GEOMETRY_MODES}')
         self.__city: City = city
-        self.__geometry_parser = CityGeometryParser(self.__city)
-        self.__material_parser = GeometryMaterialParser(self.__city)
+        self.__geometry: str = geometry
+        # the lazy geometries are parsed with a copy of the City to keep the vertices of the file even if the City is modified
+        self.__parser_city: City = copy(city) if geometry == 'lazy' else city
+        self.__geometry_parser = CityGeometryParser(self.__parser_city, packed)
+        self.__material_parser = GeometryMaterialParser(self.__parser_city)
 
     def _link_children(self, city_object: CityObject, city_objects: CityObjects):
         """
@@ -390,48 +489,233 @@ class CityObjectParser:
         """
         # the attribute is called 'geometry' but it is a list of geometries
         geometry_data = get_attribute(data, 'geometry', default=[])
-        geometries: list[CityGeometry] = [self.__geometry_parser.parse(g) for g in geometry_data]
-        self.__material_parser.parse(geometry_data, geometries)
-
+        geometries: list[CityGeometry] = []
+        if self.__geometry == 'full':
+            geometries = [self.__geometry_parser.parse(g) for g in geometry_data]
+            self.__material_parser.parse(geometry_data, geometries)
+
+        # the uuid is set before creating the CityObject to avoid generating a new one
+        attributes = get_attribute(data, 'attributes', default={})
+        attributes['uuid'] = uuid
         city_object = CityObject(
             cityobjects=self.__city.cityobjects,
             type=get_attribute(data, 'type', default='GenericCityObject'),
-            attributes=get_attribute(data, 'attributes', default={}),
+            attributes=attributes,
             geometries=geometries,
             children=get_attribute(data, 'children', default=[]),
             parents=get_attribute(data, 'parents', default=None),
         )
 
         city_object.geo_extent = get_attribute(data, 'geographicalExtent', default=None)
-        city_object.set_attribute('uuid', uuid)
         if city_object.type == 'CityObjectGroup':
             city_object = city_object.to_cityobjectgroup(get_attribute(data, 'children_roles', default=[]))
+        if self.__geometry == 'lazy' and len(geometry_data) > 0:
+            city_object.set_geometries_loader(RawGeometries(geometry_data, self.__parser_city, self.__geometry_parser, self.__material_parser))
         return city_object
 
 
 class CityObjectsParser:
-    def __init__(self, city: City):
+    CHUNKS_PER_WORKER = 4  # more chunks than workers to balance the load when the CityObjects have different sizes
+
+    def __init__(self, city: City, packed: bool = False, geometry: str = 'full', workers: int = None, profiler: Profiler = None):
+        """
+        :param city: City containing the vertices, the geometry templates and the materials
+        :param packed: if True, the primitives are parsed as PackedPrimitive
+        :param geometry: 'full' to parse the geometries, 'lazy' to parse them on first access, 'skip' to ignore them
+        :param workers: number of processes parsing the CityObjects. They are parsed in this process if None or 1.
+            Only used with the 'full' geometry mode.
+        :param profiler: records the time of the parsing and of the linking of the hierarchy. Nothing is recorded if None
+        """
         self.__city: City = city
+        self.__packed: bool = packed
+        self.__geometry: str = geometry
+        self.__workers: int = 1 if workers is None else workers
+        self.__profiler: Profiler = get_profiler(profiler)
 
     def parse(self, data: dict) -> CityObjects:
         """
         data contains cityjson['CityObjects']
         :param data: dict containing all the CityObjects. the keys are the uuid of the CityObject
         """
+        # the CityObjects are created with a reference to the collection that will contain them
         city_objects = CityObjects()
-        parser = CityObjectParser(self.__city)
-
-        for uuid, data in data.items():
-            cityobject = parser.parse(uuid, data)
-            city_objects.add_cityobject(cityobject)
+        self.__city.cityobjects = city_objects
+        parser = CityObjectParser(self.__city, self.__packed, self.__geometry)
+
+        with self.__profiler.stage('CityObjectsParser.parse:cityobjects', cityobjects=len(data), workers=self.__workers):
+            if self.__workers > 1 and self.__geometry == 'full' and len(data) > 1:
+                for cityobject in self.__parse_parallel(data):
+                    cityobject.cityobjects = city_objects
+                    city_objects.add_cityobject(cityobject)
+            else:
+                for uuid, data in data.items():
+                    cityobject = parser.parse(uuid, data)
+                    city_objects.add_cityobject(cityobject)
 
         # to be called after all the cityobjects are parsed
-        for city_object in city_objects:
-            parser._link_parents(city_object, city_objects)
-            parser._link_children(city_object, city_objects)
+        with self.__profiler.stage('CityObjectsParser.parse:link_hierarchy', cityobjects=len(city_objects)):
+            for city_object in city_objects:
+                parser._link_parents(city_object, city_objects)
+                parser._link_children(city_object, city_objects)
 
         return city_objects
 
+    def __parse_parallel(self, data: dict) -> list[CityObject]:
+        """
+        Parses the CityObjects by chunks in a pool of processes - see parse_cityobjects_chunk()
+        The vertices are shared with the processes without being copied.
+        :param data: dict containing all the CityObjects. the keys are the uuid of the CityObject
+        :return: the parsed CityObjects in the order of the data
+        """
+        items = list(data.items())
+        chunk_size = -(-len(items) // (self.__workers * self.CHUNKS_PER_WORKER))
+        chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+        vertices = self.__city.vertices.toarray()
+        shared_memory = SharedMemory(create=True, size=max(vertices.nbytes, 1))
+        try:
+            np.ndarray(vertices.shape, vertices.dtype, buffer=shared_memory.buf)[:] = vertices
+            initargs = (
+                shared_memory.name,
+                vertices.shape,
+                vertices.dtype.str,
+                self.__city.scale,
+                self.__city.materials,
+                self.__city.geometry_templates,
+                self.__packed,
+            )
+            with ProcessPoolExecutor(self.__workers, initializer=init_cityobjects_worker, initargs=initargs) as executor:
+                results = list(executor.map(parse_cityobjects_chunk, chunks))
+        finally:
+            shared_memory.close()
+            shared_memory.unlink()
+
+        cityobjects = []
+        for chunk_cityobjects, template_indexes, material_indexes in results:
+            self.__link_appearances(chunk_cityobjects, template_indexes, material_indexes)
+            cityobjects += chunk_cityobjects
+        return cityobjects
+
+    def __link_appearances(self, cityobjects: list[CityObject], template_indexes: list[int], material_indexes: list[dict[str, list[int | None]]]) -> None:
+        """
+        The CityObjects parsed in another process have copies of the geometry templates and of the materials.
+        They are replaced by the ones of the City and the primitives are unpacked if the City is not packed.
+        :param cityobjects: CityObjects returned by parse_cityobjects_chunk()
+        :param template_indexes: index of the template of each GeometryInstance, in the order of the CityObjects
+        :param material_indexes: index in the materials of the City of the material of each surface by theme, for each GeometryPrimitive
+        """
+        template_indexes = iter(template_indexes)
+        material_indexes = iter(material_indexes)
+        materials = self.__city.materials
+        for cityobject in cityobjects:
+            for geometry in cityobject.geometries:
+                if isinstance(geometry, GeometryInstance):
+                    geometry.geometry = self.__city.geometry_templates[next(template_indexes)]
+                    continue
+                primitive: PackedPrimitive = geometry.primitive
+                for theme, indexes in next(material_indexes).items():
+                    primitive.set_materials([materials.get_by_index(index) if index is not None else None for index in indexes], theme)
+                if not self.__packed:
+                    geometry.primitive = primitive.unpack()
+
+
+# state of the process when the CityObjects are parsed in a pool of processes - see CityObjectsParser
+worker_city: City | None = None
+worker_parser: CityObjectParser | None = None
+worker_shared_memory: SharedMemory | None = None
+worker_material_indexes: dict[int, int] = {}  # index of each material (by id) in the materials of the City
+
+
+def init_cityobjects_worker(
+    vertices_name: str,
+    shape: tuple[int, int],
+    dtype: str,
+    scale: list[float],
+    materials: Materials,
+    geometry_templates: GeometryTemplates,
+    packed: bool,
+) -> None:
+    """
+    Initializes a process of the pool parsing the CityObjects
+    :param vertices_name: name of the shared memory containing the vertices of the City
+    :param shape: shape of the vertices array
+    :param dtype: dtype of the vertices array
+    :param scale: scale of the City
+    :param materials: materials of the City
+    :param geometry_templates: geometry templates of the City
+    :param packed: if True, the primitives are parsed as PackedPrimitive
+    """
+    global worker_city, worker_parser, worker_shared_memory, worker_material_indexes
+    # the shared memory is unlinked by the parent process. It stays open while the process is alive
+    worker_shared_memory = SharedMemory(name=vertices_name)
+    vertices = np.ndarray(shape, np.dtype(dtype), buffer=worker_shared_memory.buf)
+    vertices.flags.writeable = False
+
+    worker_city = City()
+    worker_city.scale = scale
+    worker_city.vertices = Vertices.from_array(vertices, precision=worker_city.precision(), rounded=True)
+    worker_city.materials = materials
+    # the names of the materials are not unique: they are sent back by index
+    worker_material_indexes = {id(material): index for index, material in enumerate(materials)}
+    worker_city.geometry_templates = geometry_templates
+    worker_city.cityobjects = CityObjects()
+    worker_parser = CityObjectParser(worker_city, packed)
+
+
+def parse_cityobjects_chunk(items: list[tuple[str, dict]]) -> tuple[list[CityObject], list[int], list[dict[str, list[int | None]]]]:
+    """
+    Parses a chunk of CityObjects in a process initialized by init_cityobjects_worker()
+    The parents and the children are not linked. The templates and the materials are returned as indexes to find the ones of the City.
+    The primitives are returned as PackedPrimitive: the arrays are faster to copy between the processes than the Point objects.
+    :param items: (uuid, cityjson['CityObjects'][uuid]) of the CityObjects to parse
+    :return: the CityObjects, the index of the template of each GeometryInstance
+        and the indexes of the materials of each GeometryPrimitive by theme
+    """
+    cityobjects = [worker_parser.parse(uuid, data) for uuid, data in items]
+
+    template_indexes = []
+    material_indexes = []
+    for cityobject in cityobjects:
+        cityobject.cityobjects = None
+        for geometry in cityobject.geometries:
+            if isinstance(geometry, GeometryInstance):
+                template_indexes.append(worker_city.geometry_templates.get_index(geometry.geometry))
+                geometry.geometry = None
+                continue
+            if not isinstance(geometry.primitive, PackedPrimitive):
+                geometry.primitive = PackedPrimitive.pack(geometry.primitive)
+            primitive = geometry.primitive
+            themes = primitive.get_material_themes()
+            material_indexes.append({theme: [worker_material_indexes[id(m)] if m is not None else None for m in primitive.get_materials(theme)] for theme in themes})
+    return cityobjects, template_indexes, material_indexes
+
+
+class CityJSONFeatureParser:
+    def __init__(self, city: City, packed: bool = False):
+        """
+        :param city: City parsed from the first line of a CityJSONSeq (transform, metadata, templates and materials)
+        :param packed: if True, the primitives are parsed as PackedPrimitive
+        """
+        self.__city: City = city
+        self.__packed: bool = packed
+
+    def parse(self, data: dict) -> CityObject | None:
+        """
+        data contains one line of a CityJSONSeq (a CityJSONFeature) with its own list of vertices
+        The vertices are only used to parse the feature and are not added to the City
+        :param data: dict containing the CityJSONFeature
+        :return: the main CityObject of the feature with its children and parents linked
+        """
+        v_parser = VerticesParser(self.__city.origin, self.__city.scale, self.__city.precision())
+        self.__city.vertices = v_parser.parse(get_attribute(data, 'vertices', default=[]))
+
+        co_parser = CityObjectsParser(self.__city, self.__packed)
+        city_objects = co_parser.parse(get_attribute(data, 'CityObjects', default={}))
+        self.__city.vertices = Vertices(precision=self.__city.precision())
+
+        uuid = get_attribute(data, 'id', default=None)
+        return city_objects[uuid] if uuid is not None else city_objects[0]
+
 
 class VerticesParser:
     def __init__(self, origin: Vertex, scale: Vertex, precision: int = None):
@@ -446,11 +730,10 @@ class VerticesParser:
         """
         if len(data) == 0:
             return Vertices(precision=self.__precision)
-        else:
-            vertices = (np.array(data) * np.array(self.__scale)) + np.array(self.__translate)
-            if self.__precision is not None:
-                vertices = np.round(vertices, self.__precision)
-            return Vertices(vertices.tolist(), precision=self.__precision)
+        # the vertices are already indexed by the boundaries: they are not deduplicated
+        vertices = np.asarray(data)
+        vertices = vertices * np.array(self.__scale) + np.array(self.__translate)
+        return Vertices.from_array(vertices, precision=self.__precision)
 
 
 class MaterialsParser:
@@ -477,33 +760,188 @@ class MaterialsParser:
         return materials
 
 
+class CityObjectsFilter:
+    """
+    Selects the CityObjects to parse from the raw CityJSON data, before their geometries are parsed.
+    The CityObjects that are not selected are never parsed.
+    """
+
+    def __init__(
+        self,
+        types: list[str] = None,
+        uuids: list[str] = None,
+        predicate: Callable[[dict], bool] = None,
+        lods: list[str] = None,
+        include_related: bool = False,
+    ):
+        """
+        :param types: types of the CityObjects to keep (ex.: ['Building']). All the types if None
+        :param uuids: uuids of the CityObjects to keep. All the CityObjects if None
+        :param predicate: function receiving the attributes of a CityObject and returning True to keep it
+        :param lods: level of details of the geometries to keep (ex.: ['1', '2.2']). The other geometries are not parsed
+        :param include_related: if True, the parents and the children (recursively) of the selected CityObjects are also kept
+        """
+        self.types: set[str] | None = None if types is None else set(types)
+        self.uuids: set[str] | None = None if uuids is None else set(uuids)
+        self.predicate: Callable[[dict], bool] | None = predicate
+        self.lods: set[str] | None = None if lods is None else {str(lod) for lod in lods}
+        self.include_related: bool = include_related
+
+    def is_empty(self) -> bool:
+        """
+        :return: True if the filter keeps everything
+        """
+        return self.types is None and self.uuids is None and self.predicate is None and self.lods is None
+
+    def __is_selected(self, uuid: str, data: dict) -> bool:
+        """
+        :param uuid: uuid of the CityObject
+        :param data: dict containing the CityObject - cityjson['CityObjects'][uuid]
+        """
+        if self.uuids is not None and uuid not in self.uuids:
+            return False
+        if self.types is not None and get_attribute(data, 'type', default='GenericCityObject') not in self.types:
+            return False
+        if self.predicate is not None and not self.predicate(get_attribute(data, 'attributes', default={})):
+            return False
+        return True
+
+    def __add_related(self, selected: set[str], data: dict) -> None:
+        """
+        Adds the ancestors and the descendants of the selected CityObjects
+        The ancestors and the descendants are both searched from the selection so the siblings are not added
+        :param selected: uuids of the selected CityObjects
+        :param data: dict containing all the CityObjects - cityjson['CityObjects']
+        """
+        related = set()
+        for key in ('parents', 'children'):
+            found = set(selected)
+            stack = list(selected)
+            while len(stack) > 0:
+                for uuid in get_attribute(data[stack.pop()], key, default=[]):
+                    if uuid in data and uuid not in found:
+                        found.add(uuid)
+                        stack.append(uuid)
+            related |= found
+        selected |= related
+
+    def __filter_geometries(self, data: dict, templates_data: list[dict]) -> dict:
+        """
+        :param data: dict containing the CityObject - cityjson['CityObjects'][uuid]
+        :param templates_data: cityjson['geometry-templates']['templates'] to get the lod of the GeometryInstances
+        :return: a copy of the CityObject data with only the geometries of the selected lods
+        """
+        geometries = []
+        for geometry in get_attribute(data, 'geometry', default=[]):
+            lod = templates_data[geometry['template']].get('lod') if geometry['type'] == 'GeometryInstance' else geometry.get('lod')
+            if str(lod) in self.lods:
+                geometries.append(geometry)
+        return {**data, 'geometry': geometries}
+
+    def select(self, data: dict, templates_data: list[dict] = None) -> dict:
+        """
+        :param data: dict containing all the CityObjects - cityjson['CityObjects']
+        :param templates_data: cityjson['geometry-templates']['templates'] to get the lod of the GeometryInstances
+        :return: dict with the selected CityObjects in the same order
+        """
+        if self.is_empty():
+            return data
+        selected = {uuid for uuid, cityobject in data.items() if self.__is_selected(uuid, cityobject)}
+        if self.include_related:
+            self.__add_related(selected, data)
+
+        cityobjects = {}
+        for uuid, cityobject in data.items():
+            if uuid in selected:
+                cityobjects[uuid] = cityobject if self.lods is None else self.__filter_geometries(cityobject, templates_data or [])
+        return cityobjects
+
+    @staticmethod
+    def get_vertex_indexes(data: dict) -> np.ndarray:
+        """
+        :param data: dict containing the CityObjects - cityjson['CityObjects']
+        :return: sorted indexes of the vertices used by the boundaries of the CityObjects
+        """
+        indexes = []
+        for cityobject in data.values():
+            for geometry in get_attribute(cityobject, 'geometry', default=[]):
+                indexes += flatten_boundaries(geometry['boundaries'])
+        return np.unique(np.array(indexes, dtype=np.int64))
+
+
 class CityParser:
-    def __init__(self, cityjson: dict):
+    def __init__(
+        self,
+        cityjson: dict,
+        packed: bool = False,
+        cityobjects_filter: CityObjectsFilter = None,
+        geometry: str = 'full',
+        workers: int = None,
+        profiler: Profiler = None,
+    ):
         """
         :param cityjson: dictionary containing the whole cityjson data
+        :param packed: if True, the primitives are parsed as PackedPrimitive (arrays instead of Point objects)
+        :param cityobjects_filter: selects the CityObjects to parse. All the CityObjects are parsed if None
+        :param geometry: 'full' to parse the geometries,
+            'lazy' to keep them as raw data until the first access to CityObject.geometries,
+            'skip' to ignore them (and the vertices and the geometry templates)
+        :param workers: number of processes parsing the CityObjects - see CityObjectsParser
+        :param profiler: records the time of each stage of the parsing. Nothing is recorded if None
         """
         self.__data: dict = cityjson
         self.__city: City = City()
+        self.__packed: bool = packed
+        self.__filter: CityObjectsFilter = CityObjectsFilter() if cityobjects_filter is None else cityobjects_filter
+        self.__geometry: str = geometry
+        self.__workers: int = workers
+        self.__profiler: Profiler = get_profiler(profiler)
 
     def parse(self):
+        with self.__profiler.stage('CityParser.parse'):
+            return self.__parse()
+
+    def __parse(self):
         self.__city.type = get_attribute(self.__data, 'type', default='CityJSON')
         self.__city.version = get_attribute(self.__data, 'version', default='2.0')
         self.__city.metadata = get_attribute(self.__data, 'metadata', default={})
         self.__city.scale = get_nested_attribute(self.__data, 'transform', 'scale', default=[0.001, 0.001, 0.001])
         self.__city.origin = get_nested_attribute(self.__data, 'transform', 'translate', default=[0, 0, 0])
 
+        skip_geometry = self.__geometry == 'skip'
+
         # Done First to avoid issues with the geometry
-        v_parser = VerticesParser(self.__city.origin, self.__city.scale, self.__city.precision())
-        self.__city.vertices = v_parser.parse(get_attribute(self.__data, 'vertices', default=[]))
+        if not skip_geometry:
+            with self.__profiler.stage('VerticesParser.parse') as stage:
+                v_parser = VerticesParser(self.__city.origin, self.__city.scale, self.__city.precision())
+                self.__city.vertices = v_parser.parse(get_attribute(self.__data, 'vertices', default=[]))
+                stage.count(vertices=len(self.__city.vertices))
 
         # Done Second to avoid issues with the geometry
-        m_parser = MaterialsParser()
-        self.__city.materials = m_parser.parse(get_nested_attribute(self.__data, 'appearance', 'materials', default=[]))
-
-        gt_parser = GeometryTemplateParser(self.__city)
-        self.__city.geometry_templates = gt_parser.parse(get_attribute(self.__data, 'geometry-templates', default={}))
-
-        co_parser = CityObjectsParser(self.__city)
-        self.__city.cityobjects = co_parser.parse(get_attribute(self.__data, 'CityObjects', default=[]))
+        with self.__profiler.stage('MaterialsParser.parse') as stage:
+            m_parser = MaterialsParser()
+            self.__city.materials = m_parser.parse(get_nested_attribute(self.__data, 'appearance', 'materials', default=[]))
+            stage.count(materials=len(self.__city.materials))
+
+        if not skip_geometry:
+            with self.__profiler.stage('GeometryTemplateParser.parse') as stage:
+                gt_parser = GeometryTemplateParser(self.__city, self.__packed)
+                self.__city.geometry_templates = gt_parser.parse(get_attribute(self.__data, 'geometry-templates', default={}))
+                stage.count(templates=len(self.__city.geometry_templates.geometries))
+
+        with self.__profiler.stage('CityObjectsFilter.select') as stage:
+            templates_data = get_nested_attribute(self.__data, 'geometry-templates', 'templates', default=[])
+            cityobjects_data = self.__filter.select(get_attribute(self.__data, 'CityObjects', default={}), templates_data)
+            stage.count(cityobjects=len(cityobjects_data))
+
+        co_parser = CityObjectsParser(self.__city, self.__packed, self.__geometry, self.__workers, self.__profiler)
+        self.__city.cityobjects = co_parser.parse(cityobjects_data)
+
+        # only the vertices of the selected CityObjects are kept
+        if not self.__filter.is_empty() and not skip_geometry:
+            with self.__profiler.stage('CityParser.parse:filter_vertices') as stage:
+                indexes = CityObjectsFilter.get_vertex_indexes(cityobjects_data)
+                self.__city.vertices = Vertices.from_array(self.__city.vertices.toarray()[indexes], precision=self.__city.precision())
+                stage.count(vertices=len(self.__city.vertices))
 
         return self.__city
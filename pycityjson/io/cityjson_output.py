@@ -1,5 +1,9 @@
+import multiprocessing
+from typing import BinaryIO
+
 import numpy as np
 
+from pycityjson.guid import guid
 from pycityjson.model import (
     City,
     CityGeometry,
@@ -9,12 +13,22 @@ from pycityjson.model import (
     GeometryInstance,
     GeometryPrimitive,
     GeometryTemplates,
+    MultiLineString,
+    MultiSolid,
+    MultiSurface,
+    PackedPrimitive,
     Primitive,
+    Semantic,
+    Solid,
     TransformationMatrix,
     Vertex,
     Vertices,
 )
 
+from .cityjson_input import RawGeometries, flatten_boundaries
+from .json_backend import JsonBackend, get_json_backend
+from .profiler import Profiler, get_profiler
+
 
 class TransformationMatrixSerializer:
     def serialize(self, matrix: TransformationMatrix) -> list[float | int]:
@@ -27,8 +41,8 @@ class TransformationMatrixSerializer:
 
 
 class CityGeometrySerializer:
-    def __init__(self, vertices: Vertices, geometry_templates: GeometryTemplates):
-        self.__primitive_serializer = GeometryPrimitiveSerializer(vertices)
+    def __init__(self, vertices: Vertices, geometry_templates: GeometryTemplates, semantic_uuids: bool = True):
+        self.__primitive_serializer = GeometryPrimitiveSerializer(vertices, semantic_uuids)
         self.__instance_serializer = GeometryInstanceSerializer(vertices, geometry_templates)
 
     def serialize(self, city_geometry: CityGeometry) -> dict:
@@ -42,8 +56,13 @@ class CityGeometrySerializer:
 
 
 class GeometryPrimitiveSerializer:
-    def __init__(self, vertices: Vertices):
+    def __init__(self, vertices: Vertices, semantic_uuids: bool = True):
+        """
+        :param vertices: Vertices used to index the vertices of the geometries
+        :param semantic_uuids: if True, the semantic surfaces are written with a uuid (generated if missing)
+        """
         self.__vertices = vertices
+        self.__semantic_uuids = semantic_uuids
 
     def serialize(self, geometry_primitive: GeometryPrimitive) -> dict:
         """
@@ -55,14 +74,58 @@ class GeometryPrimitiveSerializer:
             'lod': geometry_primitive.lod,
             'boundaries': primitive.index_vertices(self.__vertices),
         }
-        semantics = primitive.get_semantic_surfaces()
+        semantics = self.serialize_semantics(primitive)
         if semantics is not None:
-            citygeometry['semantics'] = {
-                'surfaces': semantics,
-                'values': primitive.get_semantic_values(semantics),
-            }
+            citygeometry['semantics'] = semantics
         return citygeometry
 
+    def serialize_semantics(self, primitive: Primitive) -> dict | None:
+        """
+        Builds the semantic surfaces and the values in a single pass over the surfaces of the primitive
+        The semantics are deduplicated by their key (uuid or internal id) - see Semantic.key()
+        :param primitive: Primitive to get the semantics from
+        :return: dict with the surfaces and the values. None if a surface doesn't have a semantic
+        """
+        if isinstance(primitive, PackedPrimitive):
+            if len(primitive.offsets) < 2:
+                return None
+            surfaces = primitive.get_surface_semantics()
+        elif isinstance(primitive, (MultiSurface, Solid, MultiSolid)):
+            surfaces = primitive.get_surfaces(flatten=False)
+        else:
+            return None
+
+        indexes: dict[str | int, int] = {}
+        semantics: list[Semantic] = []
+
+        def index_surfaces(surfaces: list) -> list | None:
+            values = []
+            for surface in surfaces:
+                if isinstance(surface, list):
+                    value = index_surfaces(surface)
+                else:
+                    semantic = surface.semantic if isinstance(surface, MultiLineString) else surface
+                    if semantic is None:
+                        return None
+                    value = indexes.setdefault(semantic.key(), len(semantics))
+                    if value == len(semantics):
+                        semantics.append(semantic)
+                    else:
+                        # the last semantic with the same key is written, in the position of the first one
+                        semantics[value] = semantic
+                if value is None:
+                    return None
+                values.append(value)
+            return values
+
+        values = index_surfaces(surfaces)
+        if values is None:
+            return None
+        return {
+            'surfaces': [semantic.to_dict(self.__semantic_uuids) for semantic in semantics],
+            'values': values,
+        }
+
 
 class GeometryInstanceSerializer:
     def __init__(self, vertices: Vertices, geometry_templates: GeometryTemplates):
@@ -87,19 +150,97 @@ class GeometryInstanceSerializer:
         return cityinstance
 
 
+class RawGeometrySerializer:
+    """
+    Writes the geometries that were never parsed (see RawGeometries) from their raw CityJSON data.
+    Only the indexes of the vertices and of the geometry templates are remapped and the missing semantic uuids are added.
+    The materials and the textures are not written (same as the parsed geometries).
+    """
+
+    def __init__(self, vertices: Vertices, geometry_templates: GeometryTemplates, semantic_uuids: bool = True):
+        """
+        :param vertices: Vertices used to index the vertices of the geometries
+        :param geometry_templates: GeometryTemplates used to index the templates of the geometry instances
+        :param semantic_uuids: if True, the semantic surfaces are written with a uuid (generated if missing)
+        """
+        self.__vertices = vertices
+        self.__geometry_templates = geometry_templates
+        self.__semantic_uuids = semantic_uuids
+
+    def __serialize_boundaries(self, data: dict, raw_geometries: RawGeometries) -> list:
+        """
+        The old indexes are remapped to the new vertices all at once
+        :param data: raw data of the geometry - cityjson['CityObjects'][uuid]['geometry'][i]
+        :param raw_geometries: RawGeometries containing the geometry
+        """
+        vertices = raw_geometries.city.vertices.toarray()
+        if data['type'] == 'GeometryInstance':
+            return [self.__vertices.add(vertices[data['boundaries'][0]].tolist())]
+        indexes = self.__vertices.add_many(vertices[flatten_boundaries(data['boundaries'])])
+        boundaries, _ = self.__nest(data['boundaries'], indexes.tolist(), 0)
+        return boundaries
+
+    @staticmethod
+    def __nest(boundaries: list, indexes: list[int], start: int) -> tuple[list, int]:
+        """
+        :param boundaries: nested lists of the old indexes
+        :param indexes: new indexes in the order of the boundaries
+        :param start: position in indexes of the first index of the boundaries
+        :return: the new indexes with the nested structure of the boundaries and the position after the last one
+        """
+        if len(boundaries) == 0 or not isinstance(boundaries[0], list):
+            end = start + len(boundaries)
+            return indexes[start:end], end
+        nested = []
+        for boundary in boundaries:
+            item, start = RawGeometrySerializer.__nest(boundary, indexes, start)
+            nested.append(item)
+        return nested, start
+
+    @staticmethod
+    def serialize_semantics(semantics: dict) -> dict:
+        """
+        Generates the uuid of the semantic surfaces without one, as for the parsed geometries (see Semantic).
+        The uuids are kept in the raw data: the geometry is written with the same uuids each time and keeps them when it is parsed.
+        :param semantics: raw semantics of the geometry - cityjson['CityObjects'][uuid]['geometry'][i]['semantics']
+        """
+        for surface in semantics.get('surfaces', []):
+            if 'uuid' not in surface:
+                surface['uuid'] = guid()
+        return semantics
+
+    def serialize(self, data: dict, raw_geometries: RawGeometries) -> dict:
+        """
+        :param data: raw data of the geometry - cityjson['CityObjects'][uuid]['geometry'][i]
+        :param raw_geometries: RawGeometries containing the geometry
+        """
+        citygeometry = {}
+        for key, value in data.items():
+            if key == 'boundaries':
+                citygeometry[key] = self.__serialize_boundaries(data, raw_geometries)
+            elif key == 'template':
+                citygeometry[key] = self.__geometry_templates.add_template(raw_geometries.city.geometry_templates[value])
+            elif key == 'semantics' and self.__semantic_uuids:
+                citygeometry[key] = self.serialize_semantics(value)
+            elif key not in ('material', 'texture'):
+                citygeometry[key] = value
+        return citygeometry
+
+
 class GeometryTemplateSerializer:
-    def __init__(self, geometry_template: GeometryTemplates, precision: int):
+    def __init__(self, geometry_template: GeometryTemplates, precision: int, semantic_uuids: bool = True):
         """
         :param geometry_template: GeometryTemplates to be serialized
         :param precision: the number of decimal places to round the vertices. Must be a positive integer [0, infinity]
+        :param semantic_uuids: if True, the semantic surfaces are written with a uuid (generated if missing)
         """
         self.__geometry_template = geometry_template
-        self.__serializer = GeometryPrimitiveSerializer(geometry_template.vertices)
+        self.__serializer = GeometryPrimitiveSerializer(geometry_template.vertices, semantic_uuids)
         self.__precision = precision
 
     def serialize(self) -> dict:
         templates = [self.__serializer.serialize(geometry) for geometry in self.__geometry_template.geometries]
-        vertices = np.array(self.__geometry_template.vertices.tolist())
+        vertices = self.__geometry_template.vertices.toarray()
         vertices = np.round(vertices, self.__precision)
 
         return {'templates': templates, 'vertices-templates': vertices.tolist()}
@@ -111,9 +252,11 @@ class CityObjectsSerializer:
         cityobjects: CityObjects,
         vertices: Vertices,
         geometry_templates: GeometryTemplates,
+        semantic_uuids: bool = True,
     ):
         self.cityobjects = cityobjects
-        self.serializer = CityGeometrySerializer(vertices, geometry_templates)
+        self.serializer = CityGeometrySerializer(vertices, geometry_templates, semantic_uuids)
+        self.raw_serializer = RawGeometrySerializer(vertices, geometry_templates, semantic_uuids)
 
     def __serialize_cityobject(self, cityobject: CityObject) -> dict:
         """
@@ -124,7 +267,11 @@ class CityObjectsSerializer:
             cj['geographicalExtent'] = cityobject.geo_extent
         if cityobject.attributes != {}:
             cj['attributes'] = cityobject.attributes
-        if len(cityobject.geometries) > 0:
+        loader = cityobject.get_geometries_loader()
+        if isinstance(loader, RawGeometries):
+            # the geometries were never used: they are written from the raw data without parsing them
+            cj['geometry'] = [self.raw_serializer.serialize(g, loader) for g in loader.data]
+        elif len(cityobject.geometries) > 0:
             cj['geometry'] = [self.serializer.serialize(g) for g in cityobject.geometries]
         if cityobject.children != []:
             cj['children'] = [child.uuid() for child in cityobject.children]
@@ -162,33 +309,281 @@ class VerticesSerializer:
         self.origin = [0, 0, 0] if origin is None else origin
         self.scale = [0.001, 0.001, 0.001] if scale is None else scale
 
-    def serialize(self) -> list[list[int]]:
+    def serialize(self, as_array=False) -> list[list[int]] | np.ndarray:
         """
         Returns the vertices as a list of lists of integers.
         The vertices are scaled and translated according to the origin and scale.
+        :param as_array: if True, the vertices are returned as an int64 array of shape (N, 3) instead of a list
         """
-        vertices = np.array(self.vertices.tolist())
+        vertices = self.vertices.toarray()
         vertices = (vertices - np.array(self.origin)) / np.array(self.scale)
-        vertices = np.round(vertices).astype(int)
-        return vertices.tolist()
+        vertices = np.round(vertices).astype(np.int64)
+        return vertices if as_array else vertices.tolist()
+
+
+class VerticesIndexes:
+    """
+    Gives back precomputed vertex indexes in the order of the serialization.
+    Used in place of a Vertices object by the serializers - see VerticesPurger.
+    """
+
+    def __init__(self, indexes: np.ndarray):
+        """
+        :param indexes: index of each vertex in the order they are added by the serializers
+        """
+        self.__indexes = indexes
+        self.__position = 0
+
+    def add(self, vertex: Vertex) -> int:
+        """
+        :param vertex: not used - the index is the next precomputed one
+        :return: index of the vertex
+        """
+        index = int(self.__indexes[self.__position])
+        self.__position += 1
+        return index
+
+    def add_many(self, vertices: np.ndarray) -> np.ndarray:
+        """
+        :param vertices: array of vertices of shape (N, 3) - only the count is used
+        :return: array of shape (N,) with the index of each vertex
+        """
+        start = self.__position
+        self.__position += len(vertices)
+        return self.__indexes[start : self.__position]
+
+    def remap(self, mapping: np.ndarray) -> 'VerticesIndexes':
+        """
+        :param mapping: new index of each old index
+        :return: new VerticesIndexes giving back the new indexes in the same order
+        """
+        return VerticesIndexes(mapping[self.__indexes])
+
+
+class VerticesPurger:
+    """
+    Rebuilds the vertices with only the vertices used by the CityObjects.
+    All the coordinates are gathered in the order of the serialization and deduplicated at once with numpy
+    instead of adding the vertices one by one. The result is the same as serializing with an empty Vertices.
+    """
+
+    def __init__(self, cityobjects: CityObjects, precision: int):
+        """
+        :param cityobjects: CityObjects to be serialized
+        :param precision: the number of decimal places to round the vertices. Must be a positive integer [0, infinity]
+        """
+        self.__cityobjects = cityobjects
+        self.__precision = precision
+
+    def __gather(self) -> np.ndarray:
+        """
+        :return: array (N, 3) of the coordinates of all the vertices in the order of the serialization
+        """
+        chunks: list[np.ndarray] = []
+        pending: list[Vertex] = []
+        for cityobject in self.__cityobjects:
+            loader = cityobject.get_geometries_loader()
+            if isinstance(loader, RawGeometries):
+                if len(pending) > 0:
+                    chunks.append(np.array(pending))
+                    pending = []
+                vertices = loader.city.vertices.toarray()
+                chunks += [vertices[flatten_boundaries(g['boundaries'])] for g in loader.data]
+                continue
+            for geometry in cityobject.geometries:
+                if geometry.is_geometry_instance():
+                    pending.append(geometry.matrix.get_origin())
+                elif isinstance(geometry.primitive, PackedPrimitive):
+                    if len(pending) > 0:
+                        chunks.append(np.array(pending))
+                        pending = []
+                    chunks.append(geometry.primitive.vertices[geometry.primitive.indices])
+                else:
+                    pending += [point.to_list() for point in geometry.get_points()]
+        if len(pending) > 0:
+            chunks.append(np.array(pending))
+        if len(chunks) == 0:
+            return np.empty((0, 3), dtype=np.int64)
+        return np.concatenate([chunk.reshape(-1, 3) for chunk in chunks])
+
+    def purge(self) -> tuple[Vertices, VerticesIndexes]:
+        """
+        :return: the new Vertices and the indexes to give to the serializers in place of the Vertices
+        """
+        vertices = Vertices(precision=self.__precision)
+        indexes = vertices.add_many(self.__gather())
+        return vertices, VerticesIndexes(indexes)
+
+
+class ParallelCityObjectsSerializer:
+    """
+    Serializes the CityObjects by chunks in a pool of forked processes. The vertices are always purged.
+    Each process gathers the vertices of its chunk in a local Vertices. The local vertices are merged in the order of the chunks
+    and the local indexes are remapped to the merged vertices with numpy before the chunks are serialized.
+    The vertices are in the order of their first use, so the result is the same as with CityObjectsSerializer and VerticesPurger.
+    """
+
+    CHUNKS_PER_WORKER = 4  # more chunks than workers to balance the load when the CityObjects have different sizes
+
+    def __init__(self, city: City, workers: int, semantic_uuids: bool = True):
+        """
+        :param city: City to be serialized. Its geometry templates must already have empty vertices (see CitySerializer.serialize)
+        :param workers: number of processes
+        :param semantic_uuids: if True, the semantic surfaces are written with a uuid (generated if missing)
+        """
+        self.__city: City = city
+        self.__workers: int = workers
+        self.__semantic_uuids: bool = semantic_uuids
+
+    @staticmethod
+    def is_available() -> bool:
+        """
+        The processes use the CityObjects of the parent process without copying them: the 'fork' start method is required
+        :return: True if the processes can be forked
+        """
+        return 'fork' in multiprocessing.get_all_start_methods()
+
+    def __prepare(self, cityobjects: list[CityObject]) -> None:
+        """
+        The processes only modify their own copy of the City: what the serialization modifies in the City is done beforehand.
+        The templates are added (in the order of the serialization) and the missing uuids of the written semantics are generated.
+        :param cityobjects: CityObjects to be serialized
+        """
+        semantics_serializer = GeometryPrimitiveSerializer(None, self.__semantic_uuids)
+        for cityobject in cityobjects:
+            loader = cityobject.get_geometries_loader()
+            if isinstance(loader, RawGeometries):
+                for data in loader.data:
+                    if 'template' in data:
+                        self.__city.geometry_templates.add_template(loader.city.geometry_templates[data['template']])
+                    elif 'semantics' in data and self.__semantic_uuids:
+                        RawGeometrySerializer.serialize_semantics(data['semantics'])
+                continue
+            for geometry in cityobject.geometries:
+                if geometry.is_geometry_instance():
+                    self.__city.geometry_templates.add_template(geometry.geometry)
+                elif self.__semantic_uuids:
+                    semantics_serializer.serialize_semantics(geometry.primitive)
+
+    def serialize(self) -> tuple[dict, Vertices]:
+        """
+        :return: the serialized CityObjects and the purged vertices
+        """
+        global serialized_cityobjects, serialized_precision, serialized_templates, serialized_semantic_uuids
+        cityobjects = list(self.__city.cityobjects)
+        self.__prepare(cityobjects)
+        chunk_size = -(-len(cityobjects) // (self.__workers * self.CHUNKS_PER_WORKER))
+        chunks = [(start, min(start + chunk_size, len(cityobjects))) for start in range(0, len(cityobjects), chunk_size)]
+
+        serialized_cityobjects = cityobjects
+        serialized_precision = self.__city.precision()
+        serialized_templates = self.__city.geometry_templates
+        serialized_semantic_uuids = self.__semantic_uuids
+        try:
+            context = multiprocessing.get_context('fork')
+            with context.Pool(self.__workers) as pool:
+                gathered = pool.map(gather_cityobjects_chunk, chunks)
+
+                # the local vertices are merged at once: the order of the first use is kept
+                vertices = Vertices(precision=serialized_precision)
+                mapping = vertices.add_many(np.concatenate([local_vertices for local_vertices, _ in gathered]))
+                offsets = np.cumsum([0] + [len(local_vertices) for local_vertices, _ in gathered])
+                indexes = [local_indexes.remap(mapping[offsets[i] : offsets[i + 1]]) for i, (_, local_indexes) in enumerate(gathered)]
+
+                serialized_chunks = pool.starmap(serialize_cityobjects_chunk, zip(chunks, indexes))
+        finally:
+            serialized_cityobjects, serialized_templates = None, None
+
+        city_objects = {}
+        for serialized_chunk in serialized_chunks:
+            city_objects.update(serialized_chunk)
+        return city_objects, vertices
+
+
+# state shared with the forked processes of ParallelCityObjectsSerializer
+serialized_cityobjects: list[CityObject] | None = None
+serialized_precision: int = 3
+serialized_templates: GeometryTemplates | None = None
+serialized_semantic_uuids: bool = True
+
+
+def gather_cityobjects_chunk(chunk: tuple[int, int]) -> tuple[np.ndarray, VerticesIndexes]:
+    """
+    :param chunk: start and stop of the CityObjects of the chunk in serialized_cityobjects
+    :return: the local vertices of the chunk and the local index of each vertex in the order of the serialization
+    """
+    start, stop = chunk
+    vertices, indexes = VerticesPurger(serialized_cityobjects[start:stop], serialized_precision).purge()
+    return vertices.toarray(), indexes
+
+
+def serialize_cityobjects_chunk(chunk: tuple[int, int], indexes: VerticesIndexes) -> dict:
+    """
+    :param chunk: start and stop of the CityObjects of the chunk in serialized_cityobjects
+    :param indexes: index of each vertex of the chunk in the merged vertices
+    :return: the serialized CityObjects of the chunk
+    """
+    start, stop = chunk
+    serializer = CityObjectsSerializer(serialized_cityobjects[start:stop], indexes, serialized_templates, serialized_semantic_uuids)
+    return serializer.serialize()
 
 
 class CitySerializer:
-    def __init__(self, city: City):
+    def __init__(self, city: City, profiler: Profiler = None):
+        """
+        :param city: City to serialize
+        :param profiler: records the time of each stage of serialize(). Nothing is recorded if None
+        """
         self.__city: City = city
+        self.__profiler: Profiler = get_profiler(profiler)
 
-    def serialize(self, purge_vertices=True) -> dict:
+    def serialize_header(self, semantic_uuids=True, geometry_templates: GeometryTemplates = None) -> dict:
+        """
+        Converts the City into a CityJSON dictionary without any CityObject or vertex.
+        Used as the first line of a CityJSONSeq.
+        :param semantic_uuids: if True, the semantic surfaces are written with a uuid (generated if missing)
+        :param geometry_templates: templates written in the header. The geometry templates of the City if None
+        """
+        geometry_templates = self.__city.geometry_templates if geometry_templates is None else geometry_templates
+        city_dict = {
+            'type': self.__city.type,
+            'version': self.__city.version,
+            'transform': {'scale': self.__city.scale, 'translate': self.__city.origin},
+            'CityObjects': {},
+            'vertices': [],
+        }
+        if not geometry_templates.is_empty():
+            geometry_template_serializer = GeometryTemplateSerializer(geometry_templates, self.__city.precision(), semantic_uuids)
+            city_dict['geometry-templates'] = geometry_template_serializer.serialize()
+        city_dict['metadata'] = self.__city.metadata
+        return city_dict
+
+    def serialize(self, purge_vertices=True, semantic_uuids=True, vertices_as_array=False, workers: int = None) -> dict:
         """
         Converts the City into a CityJSON dictionary.
         :param purge_vertices: if True, the un-used vertices are removed from the CityJSON. They may be used by unsupported extensions.
+        :param semantic_uuids: if True, the semantic surfaces are written with a uuid (generated if missing)
+        :param vertices_as_array: if True, the vertices are kept as a numpy array (for the JSON backends supporting numpy)
+        :param workers: number of processes serializing the CityObjects - see ParallelCityObjectsSerializer.
+            Only used if the vertices are purged and the processes can be forked. Serialized in this process if None or 1.
         """
+        with self.__profiler.stage('CitySerializer.serialize', cityobjects=len(self.__city.cityobjects)):
+            return self.__serialize(purge_vertices, semantic_uuids, vertices_as_array, workers)
+
+    def __serialize(self, purge_vertices: bool, semantic_uuids: bool, vertices_as_array: bool, workers: int | None) -> dict:
+        parallel = workers is not None and workers > 1 and purge_vertices and len(self.__city.cityobjects) > 1
+        parallel = parallel and ParallelCityObjectsSerializer.is_available()
+        indexer = self.__city.vertices
         if purge_vertices:
-            self.__city.vertices = Vertices(precision=self.__city.precision())
             self.__city.geometry_templates.vertices = Vertices(precision=self.__city.precision())
+        if purge_vertices and not parallel:
+            with self.__profiler.stage('VerticesPurger.purge') as stage:
+                self.__city.vertices, indexer = VerticesPurger(self.__city.cityobjects, self.__city.precision()).purge()
+                stage.count(vertices=len(self.__city.vertices))
 
-        cityobjects_serializer = CityObjectsSerializer(self.__city.cityobjects, self.__city.vertices, self.__city.geometry_templates)
+        cityobjects_serializer = CityObjectsSerializer(self.__city.cityobjects, indexer, self.__city.geometry_templates, semantic_uuids)
         vertices_serializer = VerticesSerializer(self.__city.vertices, self.__city.origin, self.__city.scale)
-        geometry_template_serializer = GeometryTemplateSerializer(self.__city.geometry_templates, self.__city.precision())
+        geometry_template_serializer = GeometryTemplateSerializer(self.__city.geometry_templates, self.__city.precision(), semantic_uuids)
 
         city_dict = {
             'type': self.__city.type,
@@ -197,12 +592,117 @@ class CitySerializer:
         }
 
         # WARNING: Serialization order matters
-        city_dict['CityObjects'] = cityobjects_serializer.serialize()
-        city_dict['vertices'] = vertices_serializer.serialize()
+        if parallel:
+            with self.__profiler.stage('ParallelCityObjectsSerializer.serialize', cityobjects=len(self.__city.cityobjects), workers=workers):
+                city_dict['CityObjects'], self.__city.vertices = ParallelCityObjectsSerializer(self.__city, workers, semantic_uuids).serialize()
+            vertices_serializer = VerticesSerializer(self.__city.vertices, self.__city.origin, self.__city.scale)
+        else:
+            with self.__profiler.stage('CityObjectsSerializer.serialize', cityobjects=len(self.__city.cityobjects)):
+                city_dict['CityObjects'] = cityobjects_serializer.serialize()
+        with self.__profiler.stage('VerticesSerializer.serialize', vertices=len(self.__city.vertices)):
+            city_dict['vertices'] = vertices_serializer.serialize(vertices_as_array)
 
         if not self.__city.geometry_templates.is_empty():
-            city_dict['geometry-templates'] = geometry_template_serializer.serialize()
+            with self.__profiler.stage('GeometryTemplateSerializer.serialize', templates=len(self.__city.geometry_templates.geometries)):
+                city_dict['geometry-templates'] = geometry_template_serializer.serialize()
 
         city_dict['metadata'] = self.__city.metadata
 
         return city_dict
+
+
+class CityJSONFeatureSerializer:
+    def __init__(self, city: City, semantic_uuids: bool = True, geometry_templates: GeometryTemplates = None):
+        """
+        :param city: City containing the transform and the geometry templates used by the features
+        :param semantic_uuids: if True, the semantic surfaces are written with a uuid (generated if missing)
+        :param geometry_templates: templates indexed by the GeometryInstance. The geometry templates of the City if None
+        """
+        self.__city: City = city
+        self.__semantic_uuids = semantic_uuids
+        self.__geometry_templates: GeometryTemplates = city.geometry_templates if geometry_templates is None else geometry_templates
+
+    def __get_feature_cityobjects(self, cityobject: CityObject, cityobjects: CityObjects) -> None:
+        """
+        Adds the CityObject and all its children (recursively) to the collection
+        :param cityobject: CityObject to add
+        :param cityobjects: CityObjects of the feature
+        """
+        if cityobject in cityobjects:
+            return
+        cityobjects.add_cityobject(cityobject)
+        for child in cityobject.children:
+            self.__get_feature_cityobjects(child, cityobjects)
+
+    def serialize(self, cityobject: CityObject) -> dict:
+        """
+        Converts a CityObject and its children into a CityJSONFeature with its own list of vertices.
+        :param cityobject: main CityObject of the feature
+        """
+        cityobjects = CityObjects()
+        self.__get_feature_cityobjects(cityobject, cityobjects)
+
+        vertices, indexer = VerticesPurger(cityobjects, self.__city.precision()).purge()
+        cityobjects_serializer = CityObjectsSerializer(cityobjects, indexer, self.__geometry_templates, self.__semantic_uuids)
+        vertices_serializer = VerticesSerializer(vertices, self.__city.origin, self.__city.scale)
+
+        # WARNING: Serialization order matters
+        feature = {'type': 'CityJSONFeature', 'id': cityobject.uuid()}
+        feature['CityObjects'] = cityobjects_serializer.serialize()
+        feature['vertices'] = vertices_serializer.serialize()
+        return feature
+
+
+class CityJSONSeqWriter:
+    """
+    Writes a City as a CityJSONSeq (CityJSON Text Sequences) one line at a time.
+    The first line is the header, each following line is a CityJSONFeature.
+    The geometry templates are written in the header: every template used by a GeometryInstance
+    must be in the geometry templates before calling .write_header().
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        city: City,
+        semantic_uuids: bool = True,
+        json_backend: str | JsonBackend = None,
+        geometry_templates: GeometryTemplates = None,
+    ):
+        """
+        :param file: binary file opened in write mode
+        :param city: City containing the transform, the metadata and the geometry templates
+        :param semantic_uuids: if True, the semantic surfaces are written with a uuid (generated if missing)
+        :param json_backend: name of the JSON library to use - see get_json_backend(). The fastest installed one by default
+        :param geometry_templates: templates written in the header and used by the features. The geometry templates of the City if None
+        """
+        self.__file: BinaryIO = file
+        self.__city: City = city
+        self.__semantic_uuids = semantic_uuids
+        self.__backend: JsonBackend = get_json_backend(json_backend)
+        self.__geometry_templates: GeometryTemplates = city.geometry_templates if geometry_templates is None else geometry_templates
+        self.__feature_serializer = CityJSONFeatureSerializer(city, semantic_uuids, self.__geometry_templates)
+        self.__template_count: int | None = None
+
+    def __write_line(self, data: dict) -> None:
+        self.__file.write(self.__backend.dumps(data))
+        self.__file.write(b'\n')
+
+    def write_header(self) -> None:
+        """
+        Writes the first line of the CityJSONSeq.
+        """
+        self.__write_line(CitySerializer(self.__city).serialize_header(self.__semantic_uuids, self.__geometry_templates))
+        self.__template_count = len(self.__geometry_templates.geometries)
+
+    def write(self, cityobject: CityObject) -> None:
+        """
+        Writes a CityObject and its children as one CityJSONFeature.
+        :param cityobject: main CityObject of the feature
+        """
+        if self.__template_count is None:
+            self.write_header()
+        feature = self.__feature_serializer.serialize(cityobject)
+        if len(self.__geometry_templates.geometries) != self.__template_count:
+            raise ValueError(f'CityObject {cityobject.uuid()} uses a geometry template that is not in the header')
+        self.__write_line(feature)
@@ -0,0 +1,171 @@
+"""
+JSON libraries used to read and write the CityJSON files.
+orjson, simdjson and ujson are optional: they are only used if they are installed.
+The standard library json module is always available and is used as the fallback.
+"""
+
+import importlib
+import importlib.util
+import json
+
+import numpy as np
+
+
+class JsonBackend:
+    """
+    Super class of the JSON backends
+    """
+
+    name = 'json'  # name of the module used by the backend
+    supports_numpy = False  # True if numpy arrays can be written without converting them to lists
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        :return: True if the module of the backend is installed
+        """
+        return importlib.util.find_spec(cls.name) is not None
+
+    def loads(self, data: bytes | str) -> dict:
+        """
+        :param data: JSON document
+        :return: the decoded JSON
+        """
+        return json.loads(data)
+
+    def load(self, file_path: str) -> dict:
+        """
+        :param file_path: path to the JSON file
+        :return: the decoded JSON
+        """
+        with open(file_path, 'rb') as json_file:
+            return self.loads(json_file.read())
+
+    def dumps(self, data: dict, indent: int = 0) -> bytes:
+        """
+        :param data: dictionary to encode. May contain numpy arrays and numpy scalars
+        :param indent: indentation level. If 0, no indentation is used
+        :return: the JSON document encoded in utf-8
+        """
+        if indent > 0:
+            return json.dumps(data, indent=indent, default=to_builtin).encode()
+        return json.dumps(data, default=to_builtin).encode()
+
+    def dump(self, data: dict, file_path: str, indent: int = 0) -> None:
+        """
+        :param data: dictionary to write. May contain numpy arrays and numpy scalars
+        :param file_path: path to the JSON file
+        :param indent: indentation level. If 0, no indentation is used
+        """
+        with open(file_path, 'wb') as json_file:
+            json_file.write(self.dumps(data, indent))
+
+
+class StdlibJsonBackend(JsonBackend):
+    """
+    Standard library json module. Always available
+    """
+
+    name = 'json'
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+
+class OrjsonBackend(JsonBackend):
+    """
+    https://github.com/ijl/orjson
+    Writes the numpy arrays natively. The indentation is always 2 spaces when indent > 0.
+    The keys that are not str (ex.: int keys of the attributes) are converted as with the standard library.
+    """
+
+    name = 'orjson'
+    supports_numpy = True
+
+    def __init__(self):
+        self.__orjson = importlib.import_module(self.name)
+
+    def loads(self, data: bytes | str) -> dict:
+        return self.__orjson.loads(data)
+
+    def dumps(self, data: dict, indent: int = 0) -> bytes:
+        option = self.__orjson.OPT_SERIALIZE_NUMPY
+        if indent > 0:
+            option |= self.__orjson.OPT_INDENT_2
+        try:
+            return self.__orjson.dumps(data, option=option, default=to_builtin)
+        except TypeError:
+            # the option converting the keys that are not str slows down the encoding: it is only used when needed
+            return self.__orjson.dumps(data, option=option | self.__orjson.OPT_NON_STR_KEYS, default=to_builtin)
+
+
+class UjsonBackend(JsonBackend):
+    """
+    https://github.com/ultrajson/ultrajson
+    """
+
+    name = 'ujson'
+
+    def __init__(self):
+        self.__ujson = importlib.import_module(self.name)
+
+    def loads(self, data: bytes | str) -> dict:
+        return self.__ujson.loads(data)
+
+    def dumps(self, data: dict, indent: int = 0) -> bytes:
+        return self.__ujson.dumps(data, indent=indent, default=to_builtin).encode()
+
+
+class SimdjsonBackend(JsonBackend):
+    """
+    https://github.com/TkTech/pysimdjson
+    Only used to read: the files are written with the standard library json module.
+    """
+
+    name = 'simdjson'
+
+    def __init__(self):
+        self.__simdjson = importlib.import_module(self.name)
+
+    def loads(self, data: bytes | str) -> dict:
+        return self.__simdjson.loads(data)
+
+
+# ordered from the fastest to the slowest
+JSON_BACKENDS: dict[str, type[JsonBackend]] = {
+    'orjson': OrjsonBackend,
+    'simdjson': SimdjsonBackend,
+    'ujson': UjsonBackend,
+    'json': StdlibJsonBackend,
+}
+
+
+def get_json_backend(name: str | JsonBackend = None) -> JsonBackend:
+    """
+    :param name: name of the backend ('orjson', 'simdjson', 'ujson', 'json'). If None or 'auto', the fastest installed backend is used.
+    :return: the JSON backend
+    """
+    if isinstance(name, JsonBackend):
+        return name
+    if name is None or name == 'auto':
+        name = next(key for key, backend in JSON_BACKENDS.items() if backend.is_available())
+    if name not in JSON_BACKENDS:
+        raise ValueError(f'Unknown JSON backend: {name}. Available backends are {list(JSON_BACKENDS.keys())}')
+    backend = JSON_BACKENDS[name]
+    if not backend.is_available():
+        raise ImportError(f'The JSON backend {name} is not installed')
+    return backend()
+
+
+def to_builtin(value):
+    """
+    Converts the numpy values that the JSON libraries can't encode
+    :param value: numpy array or numpy scalar
+    :return: the value as a list or a python scalar
+    """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
@@ -0,0 +1,183 @@
+"""
+Records the wall time, the object counts and the allocated memory of the stages of the parsers and the serializers.
+The NullProfiler is used when no profiler is given: its stages do nothing.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+class ProfilerStage:
+    """
+    Context manager timing one stage - see Profiler.stage()
+    """
+
+    def __init__(self, profiler: 'Profiler', record: dict):
+        """
+        :param profiler: profiler receiving the record
+        :param record: record of the stage, completed when the stage exits
+        """
+        self.__profiler: Profiler = profiler
+        self.__record: dict = record
+        self.__start: float = 0.0
+        self.__memory: int = 0
+
+    def count(self, **counts: int) -> None:
+        """
+        Sets the number of objects handled by the stage (ex.: stage.count(cityobjects=12))
+        :param counts: number of objects by name
+        """
+        self.__record['counts'].update(counts)
+
+    def __enter__(self) -> 'ProfilerStage':
+        self.__memory = self.__profiler._enter(self.__record)
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        seconds = time.perf_counter() - self.__start
+        self.__profiler._exit(self.__record, seconds, self.__memory)
+
+
+class Profiler:
+    """
+    Records the stages of CityParser, CitySerializer and WavefrontSerializer. The stages can be nested.
+    Each stage records its start and its duration in seconds, the counts of objects it handled
+    and the bytes it allocated (allocated - freed, only if the memory is traced).
+    """
+
+    enabled = True
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        :param trace_memory: if True, the memory allocated by each stage is measured with tracemalloc. Slows down the stages.
+        """
+        self.__trace_memory: bool = trace_memory
+        self.__started_tracing: bool = False
+        self.__origin: float = time.perf_counter()
+        self.__depth: int = 0
+        self.__records: list[dict] = []
+
+    def stage(self, name: str, **counts: int) -> ProfilerStage:
+        """
+        with profiler.stage('VerticesParser.parse') as stage:
+            stage.count(vertices=len(vertices))
+        :param name: name of the stage: 'Class.method' or 'function' timed by the stage, followed by ':step' for a part of it
+            (ex.: 'CityParser.parse', 'read_json', 'CityObjectsParser.parse:link_hierarchy')
+        :param counts: number of objects handled by the stage, if known before the stage
+        """
+        record = {'name': name, 'depth': 0, 'start': 0.0, 'seconds': 0.0, 'counts': dict(counts)}
+        return ProfilerStage(self, record)
+
+    def _enter(self, record: dict) -> int:
+        """
+        :param record: record of the stage starting
+        :return: the traced memory when the stage starts
+        """
+        if self.__trace_memory and self.__depth == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracing = True
+        record['depth'] = self.__depth
+        record['start'] = time.perf_counter() - self.__origin
+        self.__depth += 1
+        # the records are kept in the order of the start of the stages
+        self.__records.append(record)
+        return tracemalloc.get_traced_memory()[0] if self.__trace_memory else 0
+
+    def _exit(self, record: dict, seconds: float, memory: int) -> None:
+        """
+        :param record: record of the stage ending
+        :param seconds: duration of the stage
+        :param memory: traced memory when the stage started
+        """
+        record['seconds'] = seconds
+        if self.__trace_memory:
+            record['allocated_bytes'] = tracemalloc.get_traced_memory()[0] - memory
+        self.__depth -= 1
+        if self.__depth == 0 and self.__started_tracing:
+            tracemalloc.stop()
+            self.__started_tracing = False
+
+    def to_dict(self) -> dict:
+        """
+        :return: {'stages': [records]} with the records in the order of the start of the stages
+        """
+        return {'stages': [dict(record, counts=dict(record['counts'])) for record in self.__records]}
+
+    def to_chrome_trace(self) -> dict:
+        """
+        The trace can be opened in chrome://tracing or https://ui.perfetto.dev
+        :return: the stages as complete events of the Trace Event Format
+        """
+        pid, tid = os.getpid(), threading.get_ident()
+        events = []
+        for record in self.__records:
+            args = dict(record['counts'])
+            if 'allocated_bytes' in record:
+                args['allocated_bytes'] = record['allocated_bytes']
+            events.append(
+                {
+                    'name': record['name'],
+                    'cat': 'pycityjson',
+                    'ph': 'X',
+                    'ts': record['start'] * 1e6,
+                    'dur': record['seconds'] * 1e6,
+                    'pid': pid,
+                    'tid': tid,
+                    'args': args,
+                },
+            )
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save_chrome_trace(self, file_path: str) -> None:
+        """
+        :param file_path: path to the trace JSON file
+        """
+        with open(file_path, 'w') as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file)
+
+    def clear(self) -> None:
+        """
+        Removes the recorded stages
+        """
+        self.__records = []
+
+
+class NullStage:
+    """
+    Stage of the NullProfiler: does nothing
+    """
+
+    def count(self, **counts: int) -> None:
+        pass
+
+    def __enter__(self) -> 'NullStage':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+
+NULL_STAGE = NullStage()
+
+
+class NullProfiler(Profiler):
+    """
+    Profiler used when profiling is disabled: nothing is measured nor recorded
+    """
+
+    enabled = False
+
+    def stage(self, name: str, **counts: int) -> NullStage:
+        return NULL_STAGE
+
+
+def get_profiler(profiler: Profiler | None) -> Profiler:
+    """
+    :param profiler: profiler given by the user
+    :return: the profiler or a NullProfiler if None
+    """
+    return NullProfiler() if profiler is None else profiler
@@ -0,0 +1,294 @@
+"""
+Binary snapshot of a parsed City, reloaded without parsing any JSON boundary.
+
+A snapshot is a directory containing:
+- vertices.npy: the vertices of the City
+- geometry_vertices.npy, indices.npy, offsets_0.npy ... offsets_3.npy, semantic_values.npy:
+    the arrays of the PackedPrimitive of all the geometries (see PackedPrimitive), concatenated
+- geometries.npy: (G + 1, 7) start of the slices of each geometry in the arrays above - the stop is the start of the next geometry
+- snapshot.json: the header of the City, the materials, the geometry templates and the CityObjects
+    with their attributes, their hierarchy and the semantics and materials of their geometries
+"""
+
+import os
+
+import numpy as np
+
+from pycityjson.model import (
+    City,
+    CityGeometry,
+    CityObject,
+    GeometryInstance,
+    GeometryPrimitive,
+    Material,
+    PackedPrimitive,
+    TransformationMatrix,
+    Vertices,
+)
+
+from .cityjson_input import CityObjectsParser, GeometryTemplateParser, MaterialsParser, SemanticParser
+from .cityjson_output import GeometryTemplateSerializer
+from .json_backend import get_json_backend
+
+SNAPSHOT_VERSION = 1
+HEADER_FILE = 'snapshot.json'
+MAX_LEVELS = 4  # rings, surfaces, shells and solids - see PackedPrimitive.offsets
+ARRAYS = ['geometry_vertices', 'indices'] + [f'offsets_{level}' for level in range(MAX_LEVELS)] + ['semantic_values']
+
+
+class SnapshotSerializer:
+    """
+    Writes a City as a snapshot - see load_snapshot()
+    """
+
+    def __init__(self, city: City):
+        """
+        :param city: City to save. The lazy geometries are loaded. The templates and the materials used by the geometries are added to the City
+        """
+        self.__city: City = city
+        self.__arrays: dict[str, list[np.ndarray]] = {name: [] for name in ARRAYS}
+        self.__sizes: dict[str, int] = {name: 0 for name in ARRAYS}
+        self.__starts: list[list[int]] = []
+
+    def __add_array(self, name: str, array: np.ndarray) -> None:
+        """
+        :param name: name of the concatenated array
+        :param array: array added at the end of the concatenated array
+        """
+        self.__arrays[name].append(array)
+        self.__sizes[name] += len(array)
+
+    def __serialize_primitive(self, geometry: GeometryPrimitive) -> dict:
+        """
+        The primitive is packed and its arrays are added to the concatenated arrays
+        :param geometry: GeometryPrimitive to save
+        :return: the header of the geometry
+        """
+        primitive = geometry.primitive
+        packed = primitive if isinstance(primitive, PackedPrimitive) else PackedPrimitive.pack(primitive)
+        self.__starts.append([self.__sizes[name] for name in ARRAYS])
+        self.__add_array('geometry_vertices', packed.vertices)
+        self.__add_array('indices', packed.indices)
+        for level, offsets in enumerate(packed.offsets):
+            self.__add_array(f'offsets_{level}', offsets)
+
+        data = {'type': packed.get_type(), 'lod': geometry.lod}
+        if packed.semantics is not None and packed.semantic_values is not None:
+            self.__add_array('semantic_values', packed.semantic_values)
+            # the uuids already generated are saved, the missing ones stay lazy
+            data['semantics'] = [semantic.to_dict(uuid=False) for semantic in packed.semantics]
+        themes = packed.get_material_themes()
+        if len(themes) > 0:
+            materials = self.__city.materials
+            data['materials'] = {theme: [None if m is None else materials.add(m) for m in packed.get_materials(theme)] for theme in themes}
+        return data
+
+    def __serialize_geometry(self, geometry: CityGeometry) -> dict:
+        """
+        :param geometry: GeometryPrimitive or GeometryInstance to save
+        :return: the header of the geometry
+        """
+        if isinstance(geometry, GeometryInstance):
+            template = self.__city.geometry_templates.add_template(geometry.geometry)
+            return {'type': 'GeometryInstance', 'template': template, 'transformationMatrix': geometry.matrix.tolist()}
+        return self.__serialize_primitive(geometry)
+
+    def __serialize_cityobject(self, cityobject: CityObject) -> dict:
+        """
+        Same keys as a CityJSON CityObject (read by CityObjectsParser), without the boundaries
+        :param cityobject: CityObject to save
+        """
+        data = {'type': cityobject.type, 'attributes': cityobject.attributes}
+        if cityobject.geo_extent is not None:
+            data['geographicalExtent'] = cityobject.geo_extent
+        if len(cityobject.geometries) > 0:
+            data['geometry'] = [self.__serialize_geometry(geometry) for geometry in cityobject.geometries]
+        data['children'] = [child.uuid() for child in cityobject.children]
+        data['parents'] = [parent.uuid() for parent in cityobject.parents]
+        if cityobject.type == 'CityObjectGroup':
+            data['children_roles'] = cityobject.children_roles
+        return data
+
+    @staticmethod
+    def __serialize_material(material: Material) -> dict:
+        """
+        :param material: Material of the City
+        :return: the material as in cityjson['appearance']['materials']
+        """
+        return {key: value.to_list() if hasattr(value, 'to_list') else value for key, value in vars(material).items() if value is not None}
+
+    def __serialize_templates(self) -> dict:
+        """
+        The vertices and the boundaries of the templates are saved as they are (not purged) so they are reloaded in the same order
+        :return: the geometry templates as in cityjson['geometry-templates']
+        """
+        return GeometryTemplateSerializer(self.__city.geometry_templates, self.__city.precision(), semantic_uuids=False).serialize()
+
+    def save(self, directory: str) -> None:
+        """
+        :param directory: directory of the snapshot. Created if it doesn't exist, the files of a previous snapshot are replaced
+        """
+        cityobjects = {cityobject.uuid(): self.__serialize_cityobject(cityobject) for cityobject in self.__city.cityobjects}
+        self.__starts.append([self.__sizes[name] for name in ARRAYS])
+        header = {
+            'snapshot': SNAPSHOT_VERSION,
+            'type': self.__city.type,
+            'version': self.__city.version,
+            'metadata': self.__city.metadata,
+            'transform': {'scale': self.__city.scale, 'translate': self.__city.origin},
+            'geometry-templates': self.__serialize_templates(),
+            'materials': [self.__serialize_material(material) for material in self.__city.materials],
+            'CityObjects': cityobjects,
+        }
+
+        os.makedirs(directory, exist_ok=True)
+        self.__city.vertices.save(os.path.join(directory, 'vertices.npy'))
+        np.save(os.path.join(directory, 'geometries.npy'), np.array(self.__starts, dtype=np.int64).reshape(-1, len(ARRAYS)))
+        vertices = self.__arrays['geometry_vertices']
+        np.save(os.path.join(directory, 'geometry_vertices.npy'), np.concatenate(vertices) if len(vertices) > 0 else np.empty((0, 3)))
+        for name in ARRAYS[1:]:
+            arrays = self.__arrays[name]
+            np.save(os.path.join(directory, f'{name}.npy'), np.concatenate(arrays) if len(arrays) > 0 else np.empty(0, dtype=np.int32))
+        get_json_backend().dump(header, os.path.join(directory, HEADER_FILE))
+
+
+class SnapshotGeometries:
+    """
+    Geometries of a CityObject kept as slices of the arrays of a snapshot until they are used - see CityObject.set_geometries_loader()
+    """
+
+    def __init__(self, parser: 'SnapshotParser', data: list[dict], row: int):
+        """
+        :param parser: parser of the snapshot containing the arrays
+        :param data: headers of the geometries - snapshot['CityObjects'][uuid]['geometry']
+        :param row: row in geometries.npy of the first GeometryPrimitive of the data
+        """
+        self.__parser = parser
+        self.data: list[dict] = data
+        self.row: int = row
+
+    def __call__(self) -> list[CityGeometry]:
+        """
+        :return: the geometries
+        """
+        return self.__parser.parse_geometries(self.data, self.row)
+
+
+class SnapshotParser:
+    """
+    Reads a snapshot written by SnapshotSerializer
+    """
+
+    def __init__(self, directory: str, packed: bool = False, geometry: str = 'full', mmap_mode: str = None):
+        """
+        :param directory: directory of the snapshot
+        :param packed: if True, the geometries are PackedPrimitive using slices of the arrays of the snapshot (nothing is copied)
+        :param geometry: 'full' to create the geometries, 'lazy' to create them on the first access to CityObject.geometries,
+            'skip' to only load the attributes, the types and the hierarchy of the CityObjects
+        :param mmap_mode: None to read the arrays in memory, 'r' (read-only) or 'c' (copy-on-write) to memory-map them - see Vertices.from_file()
+        """
+        if geometry not in ('full', 'lazy', 'skip'):
+            raise ValueError(f"Unknown geometry mode: {geometry}. Must be one of ['full', 'lazy', 'skip']")
+        if mmap_mode not in (None, 'r', 'c'):
+            raise ValueError(f"Unknown mmap mode: {mmap_mode}. Must be None, 'r' or 'c'")
+        self.__directory: str = directory
+        self.__packed: bool = packed
+        self.__geometry: str = geometry
+        self.__mmap_mode: str | None = mmap_mode
+        self.__city: City = City()
+        self.__arrays: dict[str, np.ndarray] = {}
+        self.__starts: np.ndarray = np.empty((0, len(ARRAYS)), dtype=np.int64)
+
+    def __load(self, name: str) -> np.ndarray:
+        """
+        :param name: name of the array
+        """
+        return np.load(os.path.join(self.__directory, f'{name}.npy'), mmap_mode=self.__mmap_mode)
+
+    def __parse_primitive(self, data: dict, row: int) -> GeometryPrimitive:
+        """
+        :param data: header of the geometry
+        :param row: row of the geometry in geometries.npy
+        """
+        start, stop = self.__starts[row], self.__starts[row + 1]
+        offsets = []
+        for level in range(MAX_LEVELS):
+            if start[2 + level] < stop[2 + level]:
+                offsets.append(self.__arrays[f'offsets_{level}'][start[2 + level] : stop[2 + level]])
+
+        semantics, semantic_values = None, None
+        if 'semantics' in data:
+            semantics = SemanticParser(self.__city).parse(data['semantics'])
+            semantic_values = self.__arrays['semantic_values'][start[6] : stop[6]]
+        materials = None
+        if 'materials' in data:
+            city_materials = self.__city.materials
+            materials = {theme: [None if m is None else city_materials[m] for m in values] for theme, values in data['materials'].items()}
+
+        primitive = PackedPrimitive(
+            data['type'],
+            self.__arrays['geometry_vertices'][start[0] : stop[0]],
+            self.__arrays['indices'][start[1] : stop[1]],
+            offsets,
+            semantics,
+            semantic_values,
+            materials,
+        )
+        return GeometryPrimitive(primitive if self.__packed else primitive.unpack(), data['lod'])
+
+    def parse_geometries(self, data: list[dict], row: int) -> list[CityGeometry]:
+        """
+        :param data: headers of the geometries of a CityObject
+        :param row: row in geometries.npy of the first GeometryPrimitive of the data
+        """
+        geometries = []
+        for geometry_data in data:
+            if geometry_data['type'] == 'GeometryInstance':
+                template = self.__city.geometry_templates[geometry_data['template']]
+                geometries.append(GeometryInstance(template, TransformationMatrix(geometry_data['transformationMatrix'])))
+                continue
+            geometries.append(self.__parse_primitive(geometry_data, row))
+            row += 1
+        return geometries
+
+    def parse(self) -> City:
+        header = get_json_backend().load(os.path.join(self.__directory, HEADER_FILE))
+        if header.get('snapshot') != SNAPSHOT_VERSION:
+            raise ValueError(f'Unsupported snapshot version: {header.get("snapshot")}. Must be {SNAPSHOT_VERSION}')
+
+        self.__city.type = header['type']
+        self.__city.version = header['version']
+        self.__city.metadata = header['metadata']
+        self.__city.scale = header['transform']['scale']
+        self.__city.origin = header['transform']['translate']
+        self.__city.materials = MaterialsParser().parse(header['materials'])
+
+        skip_geometry = self.__geometry == 'skip'
+        if not skip_geometry:
+            vertices_path = os.path.join(self.__directory, 'vertices.npy')
+            if self.__mmap_mode is None:
+                self.__city.vertices = Vertices.from_array(np.load(vertices_path), precision=self.__city.precision(), rounded=True)
+            else:
+                self.__city.vertices = Vertices.from_file(vertices_path, self.__city.precision(), mmap_mode=self.__mmap_mode)
+            self.__city.geometry_templates = GeometryTemplateParser(self.__city, self.__packed).parse(header['geometry-templates'])
+            self.__arrays = {name: self.__load(name) for name in ARRAYS}
+            self.__starts = self.__load('geometries')
+
+        # the geometries are not in the data: the CityObjects and their hierarchy are parsed as without geometries
+        cityobjects_data = header['CityObjects']
+        self.__city.cityobjects = CityObjectsParser(self.__city, geometry='skip').parse(cityobjects_data)
+        if skip_geometry:
+            return self.__city
+
+        row = 0
+        for uuid, data in cityobjects_data.items():
+            geometry_data = data.get('geometry', [])
+            if len(geometry_data) == 0:
+                continue
+            cityobject = self.__city.cityobjects.get_by_uuid(uuid)
+            if self.__geometry == 'lazy':
+                cityobject.set_geometries_loader(SnapshotGeometries(self, geometry_data, row))
+            else:
+                cityobject.geometries = self.parse_geometries(geometry_data, row)
+            row += sum(1 for g in geometry_data if g['type'] != 'GeometryInstance')
+        return self.__city
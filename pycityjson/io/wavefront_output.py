@@ -1,11 +1,18 @@
 import numpy as np
 
-from pycityjson.model import City, CityGeometry, CityObject, MultiLineString, MultiSolid, MultiSurface, Primitive, Solid, TransformationMatrix, Vertices
+from pycityjson.model import City, CityGeometry, CityObject, MultiLineString, MultiSolid, MultiSurface, PackedPrimitive, Primitive, Solid, TransformationMatrix, Vertices
+
+from .profiler import Profiler, get_profiler
 
 
 class WavefrontSerializer:
-    def __init__(self, city: City):
+    def __init__(self, city: City, profiler: Profiler = None):
+        """
+        :param city: City to serialize
+        :param profiler: records the time of each stage of serialize(). Nothing is recorded if None
+        """
         self.__city: City = city
+        self.__profiler: Profiler = get_profiler(profiler)
         self.__vertices = Vertices(precision=city.precision())
         self.__vertices.start_index = 1  # Wavefront obj indexes start at 1
         self.__wavefront: list[str] = []
@@ -15,10 +22,11 @@ class WavefrontSerializer:
         self.__swap_yz = False
 
     def __vertices_to_wavefront(self):
-        vertices = self.__vertices.tolist()
+        vertices = self.__vertices.toarray()
         if self.__swap_yz:
             matrix = TransformationMatrix().rotate_x(90)
             vertices = matrix.reproject_vertices(vertices)
+        vertices = vertices.tolist()
         return [f'v {x} {y} {z}' for x, y, z in vertices]
 
     def __serialize_multi_line_string(self, multi_line_string: MultiLineString):
@@ -44,6 +52,8 @@ class WavefrontSerializer:
 
     def __serialize_primitive(self, primitive: Primitive):
         # todo : I hate this
+        if isinstance(primitive, PackedPrimitive):
+            primitive = primitive.unpack()
         if isinstance(primitive, MultiLineString):
             self.__serialize_multi_line_string(primitive)
         if isinstance(primitive, MultiSurface):
@@ -70,14 +80,17 @@ class WavefrontSerializer:
             self.__serialize_geometry(geometry)
 
     def __serialize_city(self):
-        for city_object in self.__city.cityobjects:
-            if city_object.type == 'CityObjectGroup':
-                pass
-            self.__wavefront.append('')
-            self.__serialize_cityobject(city_object)
+        with self.__profiler.stage('WavefrontSerializer.serialize:cityobjects', cityobjects=len(self.__city.cityobjects)):
+            for city_object in self.__city.cityobjects:
+                if city_object.type == 'CityObjectGroup':
+                    pass
+                self.__wavefront.append('')
+                self.__serialize_cityobject(city_object)
 
         material = ['mtllib cityjson.mtl']  # todo use material in the cityjson file
-        vertices = self.__vertices_to_wavefront()
+        with self.__profiler.stage('WavefrontSerializer.serialize:vertices') as stage:
+            vertices = self.__vertices_to_wavefront()
+            stage.count(vertices=len(vertices))
         return material + [''] + vertices + self.__wavefront
 
     def serialize(self, *, as_one_geometry=False, swap_yz=False) -> list[str]:
@@ -97,4 +110,5 @@ class WavefrontSerializer:
         if as_one_geometry:
             self.__wavefront.append('')
             self.__wavefront.append('g cityjson')
-        return self.__serialize_city()
+        with self.__profiler.stage('WavefrontSerializer.serialize'):
+            return self.__serialize_city()
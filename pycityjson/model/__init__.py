@@ -8,11 +8,13 @@ from .primitive import (
     MultiPoint,
     MultiSolid,
     MultiSurface,
+    PackedPrimitive,
     Point,
     Primitive,
     Solid,
 )
 from .semantic import Semantic
+from .spatial import SpatialIndex
 from .template import GeometryTemplates
 from .vertices import Vertex, Vertices
 
@@ -36,7 +38,9 @@ __all__ = [
     'MultiSurface',
     'Solid',
     'MultiSolid',
+    'PackedPrimitive',
     'Semantic',
     'Materials',
     'Material',
+    'SpatialIndex',
 ]
@@ -94,11 +94,22 @@ class City:
     def set_geographical_extent(self) -> None:
         """
         Set minimum and maximum coordinates of the city model
-        Will only use the vertices of the city objects that were loaded from a file
-        Save and reopen the file to update the geographical extent with new city objects
+        Aggregates the cached bounding boxes of the geometries of the city objects (see CityObject.get_min_max())
+        The geometries that are not loaded yet (see CityObject.set_geometries_loader()) use the extent of the CityObject if it exists
         """
-        min_x, min_y, min_z = self.vertices.get_min()
-        max_x, max_y, max_z = self.vertices.get_max()
+        boxes = []
+        for cityobject in self.cityobjects:
+            if cityobject.get_geometries_loader() is not None and cityobject.geo_extent is not None:
+                boxes.append((cityobject.geo_extent[:3], cityobject.geo_extent[3:]))
+                continue
+            min_max = cityobject.get_min_max()
+            if min_max is not None:
+                boxes.append(min_max)
+        if len(boxes) == 0:
+            return
+
+        min_x, min_y, min_z = [min(v_min[i] for v_min, _ in boxes) for i in range(3)]
+        max_x, max_y, max_z = [max(v_max[i] for _, v_max in boxes) for i in range(3)]
         self.metadata['geographicalExtent'] = [
             min_x,
             min_y,
@@ -1,9 +1,13 @@
+import weakref
+from collections.abc import Callable
+
 import numpy as np
 
 from pycityjson.guid import guid, is_guid
 
 from .geometry import CityGeometry
 from .matrix import TransformationMatrix
+from .primitive import PackedPrimitive, Point
 from .vertices import Vertex
 
 
@@ -20,6 +24,7 @@ class CityObject:
         self.cityobjects: 'CityObjects' = cityobjects
 
         self.attributes = {} if attributes is None else attributes
+        self.__geometries_loader: Callable[[], list[CityGeometry]] | None = None  # see self.set_geometries_loader()
         self.geometries: list[CityGeometry] = [] if geometries is None else geometries  # todo verify that it is a list of geometries
 
         self.children: list[CityObject] | list[str] = [] if children is None else children
@@ -38,12 +43,66 @@ class CityObject:
     def __iter__(self):
         return iter(self.geometries)
 
+    @property
+    def geometries(self) -> list[CityGeometry]:
+        """
+        The geometries are loaded on first access if a loader is set - see self.set_geometries_loader()
+        """
+        if self.__geometries_loader is not None:
+            loader = self.__geometries_loader
+            self.__geometries_loader = None
+            self.__geometries = loader()
+        return self.__geometries
+
+    @geometries.setter
+    def geometries(self, geometries: list[CityGeometry]) -> None:
+        self.__geometries = geometries
+        self.__geometries_loader = None
+
+    def set_geometries_loader(self, loader: Callable[[], list[CityGeometry]]) -> None:
+        """
+        Defers the creation of the geometries until they are used (ex.: to only parse the geometries that are needed)
+        :param loader: function returning the geometries. Called once on the first access to self.geometries
+        """
+        self.__geometries_loader = loader
+
+    def get_geometries_loader(self) -> Callable[[], list[CityGeometry]] | None:
+        """
+        :return: the loader of the geometries or None if the geometries are loaded
+        """
+        return self.__geometries_loader
+
+    @property
+    def children(self) -> list['CityObject'] | list[str]:
+        """
+        Use self.add_child() to add a child or replace the whole list: the list must not be modified in place
+        """
+        return self.__children
+
+    @children.setter
+    def children(self, children: list['CityObject'] | list[str]) -> None:
+        self.__children = children
+        self.__children_set: set['CityObject | str'] = set(children)  # same items as the list for performance reasons
+
+    @property
+    def parents(self) -> list['CityObject'] | list[str]:
+        """
+        Use self.add_parent() to add a parent or replace the whole list: the list must not be modified in place
+        """
+        return self.__parents
+
+    @parents.setter
+    def parents(self, parents: list['CityObject'] | list[str]) -> None:
+        self.__parents = parents
+        self.__parents_set: set['CityObject | str'] = set(parents)  # same items as the list for performance reasons
+
     def add_parent(self, parent: 'CityObject') -> None:
         """
         :param parent: one of the parents of the CityObject
         """
-        if parent not in self.parents:
-            self.parents.append(parent)
+        if parent not in self.__parents_set:
+            self.__parents.append(parent)
+            self.__parents_set.add(parent)
             parent.add_child(self)
         self.cityobjects.add_cityobject(parent)
 
@@ -51,8 +110,9 @@ class CityObject:
         """
         :param child: one of the children of the CityObject
         """
-        if child not in self.children:
-            self.children.append(child)
+        if child not in self.__children_set:
+            self.__children.append(child)
+            self.__children_set.add(child)
             child.add_parent(self)
         self.cityobjects.add_cityobject(child)
 
@@ -69,13 +129,15 @@ class CityObject:
         """
         The value of the attribute is stored in a dictionary.
         If the key already exists, the value is overwritten.
-        The key 'uuid' is reserved for the uuid of the CityObject and can be changed.
+        The key 'uuid' is reserved for the uuid of the CityObject and can be changed if no other CityObject of the collection has it (ValueError).
         :param key: the key of the attribute
         :param value: the value of the attribute
         """
-        self.attributes[str(key)] = value
-        if key == 'uuid':
+        if key == 'uuid' and value != self.__uuid:
+            # raises ValueError before any change if another CityObject of the collection has this uuid
+            self.cityobjects.reindex_cityobject(self, value)
             self.__uuid = value
+        self.attributes[str(key)] = value
 
     def uuid(self) -> str:
         """
@@ -146,6 +208,18 @@ class CityObject:
                 vertices.append(g.get_vertices(flatten))
         return vertices
 
+    def get_min_max(self) -> tuple[Vertex, Vertex] | None:
+        """
+        Aggregates the bounding boxes of the geometries. They are cached until the geometries are modified.
+        :return: Tuple of two vertex with the minimum and maximum coordinates. None if the CityObject has no geometries
+        """
+        boxes = [geometry.get_min_max() for geometry in self.geometries]
+        if len(boxes) == 0:
+            return None
+        o_min = [min(v_min[i] for v_min, _ in boxes) for i in range(3)]
+        o_max = [max(v_max[i] for _, v_max in boxes) for i in range(3)]
+        return o_min, o_max
+
     def set_geographical_extent(self, overwrite=True) -> Vertex | None:
         """
         Sets the minimum and maximum coordinates of the CityObject.
@@ -154,13 +228,15 @@ class CityObject:
         """
         if overwrite is False and self.geo_extent is not None:
             return self.geo_extent
-        if len(self.geometries) == 0:
+        min_max = self.get_min_max()
+        if min_max is None:
             return None
 
-        vertices = np.array(self.get_vertices(flatten=True))
-        o_min = np.min(vertices, axis=0)
-        o_max = np.max(vertices, axis=0)
-        self.geo_extent = [o_min[0], o_min[1], o_min[2], o_max[0], o_max[1], o_max[2]]
+        o_min, o_max = min_max
+        geo_extent = [o_min[0], o_min[1], o_min[2], o_max[0], o_max[1], o_max[2]]
+        if geo_extent != self.geo_extent:
+            self.geo_extent = geo_extent
+            self.cityobjects.update_extent(self)
         return self.geo_extent
 
     def is_uuid_valid(self):
@@ -224,8 +300,15 @@ class CityObject:
                     center = geometry.get_origin()
                     break
 
+        # the points of all the GeometryPrimitive are transformed at once
+        points = []
         for geometry in self.geometries:
-            geometry.transform(matrix, center)
+            if geometry.is_geometry_primitive() and not isinstance(geometry.primitive, PackedPrimitive):
+                points += geometry.get_points()
+                geometry.invalidate()
+            else:
+                geometry.transform(matrix, center)
+        Point.transform_points(points, matrix, center)
         _ = self.set_geographical_extent()
 
     def to_geometry_primitive(self) -> None:
@@ -275,16 +358,37 @@ class CityObjectGroup(CityObject):
 
 class CityObjects:
     def __init__(self, cityobjects: list[CityObject] = None):
-        self.__cityobjects: list[CityObject] = [] if cityobjects is None else cityobjects
+        # CityObjects in insertion order. A removed CityObject leaves None until the list is compacted - see self.__get_cityobjects()
+        self.__cityobjects: list[CityObject | None] = []
+        # Dict to find the position of a CityObject in the list by uuid for performance reasons
+        self.__positions: dict[str, int] = {}
+        # indexes updated when the extent of a CityObject changes - see SpatialIndex. An index that is no longer used is removed
+        self.__spatial_indexes: weakref.WeakSet['SpatialIndex'] = weakref.WeakSet()
+
+        cityobjects = cityobjects if cityobjects is not None else []
+
+        for cityobject in cityobjects:
+            self.add_cityobject(cityobject)
 
     def __len__(self) -> int:
         """
         returns the number of CityObject
         """
-        return len(self.__cityobjects)
+        return len(self.__positions)
 
     def __repr__(self):
-        return f'{self.__cityobjects}'
+        return f'{self.__get_cityobjects()}'
+
+    def __get_cityobjects(self) -> list[CityObject]:
+        """
+        Removes the None left by the removed CityObjects so each removal is in constant time
+        :return: the list of the CityObjects in insertion order
+        """
+        if len(self.__cityobjects) > len(self.__positions):
+            # a new list: the iterators over the previous one are not affected
+            self.__cityobjects = [cityobject for cityobject in self.__cityobjects if cityobject is not None]
+            self.__positions = {cityobject.uuid(): position for position, cityobject in enumerate(self.__cityobjects)}
+        return self.__cityobjects
 
     def __getitem__(self, key: int | str) -> CityObject | None:
         """
@@ -293,16 +397,25 @@ class CityObjects:
         :return: the CityObject or None if it does not exist
         """
         if isinstance(key, int):
-            if key < len(self.__cityobjects) and key >= 0:
-                return self.__cityobjects[key]
+            cityobjects = self.__get_cityobjects()
+            if key < len(cityobjects) and key >= 0:
+                return cityobjects[key]
             return None
         return self.get_by_uuid(key)
 
     def __iter__(self):
         """
-        Iterates over the CityObjects
+        Iterates over the CityObjects. The CityObjects removed during the iteration are skipped
+        """
+        return (cityobject for cityobject in self.__get_cityobjects() if cityobject is not None)
+
+    def __contains__(self, item: CityObject | str) -> bool:
+        """
+        :param item: the CityObject or the uuid of the CityObject
+        :return: True if a CityObject with the same uuid is in the collection, False otherwise
         """
-        return iter(self.__cityobjects)
+        uuid = item.uuid() if isinstance(item, CityObject) else item
+        return uuid in self.__positions
 
     def get_by_type(self, citytype: str) -> list[CityObject]:
         """
@@ -310,7 +423,7 @@ class CityObjects:
         :return: a list of CityObject of the specified type. Empty list if none are found.
         """
         city_objects = []
-        for cityobject in self.__cityobjects:
+        for cityobject in self.__get_cityobjects():
             if cityobject['type'] == citytype:
                 city_objects.append(cityobject)
         return city_objects
@@ -321,7 +434,7 @@ class CityObjects:
         :param attribute: the key of the attribute
         :param decimals: the number of decimals to round the attribute to. If 0, the attribute is rounded and converted to an integer
         """
-        for cityobject in self.__cityobjects:
+        for cityobject in self.__get_cityobjects():
             if attribute in cityobject.attributes:
                 cityobject.round_attribute(attribute, decimals)
 
@@ -330,28 +443,65 @@ class CityObjects:
         :param uuid: the uuid of the CityObject
         :return: the CityObject with the specified uuid or None if it does not exist
         """
-        for city_object in self.__cityobjects:
-            if city_object.uuid() == uuid:
-                return city_object
-        return None
+        position = self.__positions.get(uuid)
+        return None if position is None else self.__cityobjects[position]
 
     def add_cityobject(self, cityobject: CityObject) -> None:
         """
         Adds a CityObject to the collection if it does not already exist.
         :param cityobject: the CityObject to add
         """
-        city_object = self.get_by_uuid(cityobject.uuid())
-        if city_object is None:
+        if cityobject.uuid() not in self.__positions:
+            self.__positions[cityobject.uuid()] = len(self.__cityobjects)
             self.__cityobjects.append(cityobject)
 
     def remove_cityobject(self, uuid: str) -> None:
         """
         Removes a CityObject from the collection if it exists.
-        :param cityobject: the CityObject to remove
+        :param uuid: the uuid of the CityObject to remove
+        """
+        position = self.__positions.pop(uuid, None)
+        if position is not None:
+            city_object = self.__cityobjects[position]
+            self.__cityobjects[position] = None
+            for spatial_index in self.__spatial_indexes:
+                spatial_index.remove(city_object)
+
+    def reindex_cityobject(self, cityobject: CityObject, uuid: str) -> None:
+        """
+        Updates the uuid index before the uuid of a CityObject changes. The CityObject keeps its position.
+        Called by CityObject.set_attribute('uuid', ...). Nothing happens if the CityObject is not in the collection.
+        :param cityobject: the CityObject with its current uuid
+        :param uuid: the new uuid of the CityObject
+        """
+        position = self.__positions.get(cityobject.uuid())
+        if position is None or self.__cityobjects[position] is not cityobject:
+            return
+        if uuid in self.__positions:
+            raise ValueError(f'A CityObject with the uuid {uuid} already exists')
+        self.__positions[uuid] = self.__positions.pop(cityobject.uuid())
+
+    def add_spatial_index(self, spatial_index: 'SpatialIndex') -> None:
+        """
+        Called by the SpatialIndex built over the collection
+        :param spatial_index: index to update when the extent of a CityObject changes or when a CityObject is removed
+        """
+        self.__spatial_indexes.add(spatial_index)
+
+    def remove_spatial_index(self, spatial_index: 'SpatialIndex') -> None:
+        """
+        :param spatial_index: index to stop updating
+        """
+        self.__spatial_indexes.discard(spatial_index)
+
+    def update_extent(self, cityobject: CityObject) -> None:
+        """
+        Updates the spatial indexes after the extent of a CityObject has changed.
+        Called by CityObject.set_geographical_extent(). Call it after setting CityObject.geo_extent directly.
+        :param cityobject: the CityObject with its new extent
         """
-        city_object = self.get_by_uuid(uuid)
-        if city_object is not None:
-            self.__cityobjects.remove(city_object)
+        for spatial_index in self.__spatial_indexes:
+            spatial_index.update(cityobject)
 
     def get_by_attribute(self, attribute: str, value) -> list[CityObject]:
         """
@@ -360,7 +510,7 @@ class CityObjects:
         :return: a list of CityObject with the attribute which has the specified value. Empty list if none are found.
         """
         city_objects = []
-        for city_object in self.__cityobjects:
+        for city_object in self.__get_cityobjects():
             if attribute in city_object.attributes and city_object.attributes[attribute] == value:
                 city_objects.append(city_object)
         return city_objects
@@ -369,4 +519,4 @@ class CityObjects:
         """
         :return: a list of all the CityObjects
         """
-        return [cityobject for cityobject in self.__cityobjects]
+        return [cityobject for cityobject in self.__get_cityobjects()]
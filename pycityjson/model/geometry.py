@@ -1,7 +1,9 @@
+import hashlib
+
 import numpy as np
 
 from .matrix import TransformationMatrix
-from .primitive import MultiLineString, Primitive
+from .primitive import MultiLineString, PackedPrimitive, Point, Primitive
 from .vertices import Vertex
 
 
@@ -95,9 +97,14 @@ class GeometryPrimitive(CityGeometry):
     Contains MultiSolid, Solid, MultiSurface, MultiLineString...
     """
 
+    __modifications: int = 0  # incremented each time any geometry is modified - see GeometryPrimitive.get_modifications()
+
     def __init__(self, primitive: Primitive, lod: str = '1'):
-        self.primitive: Primitive = primitive
-        self.lod: str = lod  # level of detail (1, 2, 3, ...)
+        self.__primitive: Primitive = primitive
+        self.__lod: str = lod  # level of detail (1, 2, 3, ...)
+        self.__content_hash: str | None = None  # computed on demand - see self.content_hash()
+        self.__version: int = 0  # incremented each time the geometry is modified - see self.invalidate()
+        primitive._set_parent(self)
 
     def __str__(self) -> str:
         return f'Geometry{self.primitive.get_type()}(lod={self.lod})'
@@ -108,7 +115,86 @@ class GeometryPrimitive(CityGeometry):
     def __eq__(self, value: object) -> bool:
         if not isinstance(value, GeometryPrimitive):
             return False
-        return self.__repr__() == repr(value)
+        return self.content_hash() == value.content_hash()
+
+    @property
+    def primitive(self) -> Primitive:
+        return self.__primitive
+
+    @primitive.setter
+    def primitive(self, primitive: Primitive) -> None:
+        self.__primitive = primitive
+        primitive._set_parent(self)
+        self.invalidate()
+
+    @property
+    def lod(self) -> str:
+        return self.__lod
+
+    @lod.setter
+    def lod(self, lod: str) -> None:
+        self.__lod = lod
+        self.invalidate()
+
+    @property
+    def version(self) -> int:
+        """
+        Changes each time the geometry is modified. Used to know if a value computed from the geometry is outdated.
+        """
+        return self.__version
+
+    @staticmethod
+    def get_modifications() -> int:
+        """
+        :return: number of modifications of all the geometries. Used to know if any geometry was modified since a value was computed.
+        """
+        return GeometryPrimitive.__modifications
+
+    def invalidate(self) -> None:
+        """
+        Clears the cached values computed from the primitive (content hash, bounding boxes)
+        Called by the methods modifying the geometry. Must be called after modifying the points in place.
+        The methods modifying the primitive (add_child, transform...) notify the geometry themselves (see self._modified())
+        """
+        self._modified()
+        self.__primitive.invalidate(parents=False)
+
+    def _modified(self) -> None:
+        """
+        Clears the content hash and changes the version - called by the primitive when it is modified
+        """
+        self.__content_hash = None
+        self.__version += 1
+        GeometryPrimitive.__modifications += 1
+
+    def content_hash(self) -> str:
+        """
+        Hash of the content of the geometry computed once and cached until the geometry is modified.
+        Two geometries with the same coordinates, structure, lod, semantics and materials have the same hash
+        whatever their representation (Primitive tree or PackedPrimitive).
+        The uuids of the semantics that are not generated yet are not part of the hash.
+        :return: the hash as an hexadecimal string
+        """
+        if self.__content_hash is not None:
+            return self.__content_hash
+
+        primitive = self.primitive
+        packed = primitive if isinstance(primitive, PackedPrimitive) else PackedPrimitive.pack(primitive)
+        content = hashlib.blake2b(digest_size=16)
+        content.update(f'{self.lod}|{primitive.get_type()}|'.encode())
+        content.update(np.ascontiguousarray(packed.vertices[packed.indices], dtype=np.float64).tobytes())
+        for offsets in packed.offsets:
+            content.update(b'|')
+            content.update(np.ascontiguousarray(offsets, dtype=np.int64).tobytes())
+        if packed.semantic_values is not None:
+            semantics = [packed.semantics[value].to_dict(uuid=False) if value >= 0 else None for value in packed.semantic_values.tolist()]
+            content.update(repr(semantics).encode())
+        for theme in sorted(packed.get_material_themes()):
+            names = [material.name if material is not None else None for material in packed.get_materials(theme)]
+            content.update(repr((theme, names)).encode())
+
+        self.__content_hash = content.hexdigest()
+        return self.__content_hash
 
     def transform(self, matrix: TransformationMatrix, center=None) -> None:
         """
@@ -134,12 +220,26 @@ class GeometryPrimitive(CityGeometry):
         """
         return self.primitive.get_vertices(flatten)
 
+    def get_points(self) -> list[Point]:
+        """
+        The points are not copied, modifying them modifies the geometry
+        :return: flat list of all the points of the primitive
+        """
+        return self.primitive.get_points()
+
     def duplicate(self) -> CityGeometry:
         """
         :return: A new GeometryPrimitive with a deep copy of the primitive
         """
         return GeometryPrimitive(self.primitive.copy(), self.lod)
 
+    def get_min_max(self) -> tuple[Vertex, Vertex]:
+        """
+        The bounding box is cached by the primitive until the geometry is modified
+        :return: Tuple of two vertex with the minimum and maximum coordinates as [min_x, min_y, min_z] and [max_x, max_y, max_z]
+        """
+        return self.primitive.get_min_max()
+
     def get_origin(self) -> Vertex:
         """
         Note : use .get_min_max() if you need the corner of the bounding box
@@ -169,6 +269,9 @@ class GeometryInstance(CityGeometry):
     def __init__(self, geometry: GeometryPrimitive, matrix: TransformationMatrix):
         self.geometry: GeometryPrimitive = geometry
         self.matrix: TransformationMatrix = matrix
+        # bounding box and the matrix, template and version of the template it was computed with - see self.get_min_max()
+        self.__min_max: tuple[Vertex, Vertex] | None = None
+        self.__min_max_of: tuple[TransformationMatrix, GeometryPrimitive, int] | None = None
 
     def transform(self, matrix: TransformationMatrix, center=None) -> None:
         """
@@ -193,6 +296,23 @@ class GeometryInstance(CityGeometry):
         vertices = self.geometry.get_vertices(flatten)
         return self.matrix.reproject_vertices(vertices)
 
+    def get_min_max(self) -> tuple[Vertex, Vertex]:
+        """
+        The bounding box is cached until the matrix is replaced (ex.: by self.transform()) or the template is modified
+        :return: Tuple of two vertex with the minimum and maximum coordinates as [min_x, min_y, min_z] and [max_x, max_y, max_z]
+        """
+        if self.__min_max_of is None or not self.__is_computed_with(*self.__min_max_of):
+            self.__min_max = super().get_min_max()
+            self.__min_max_of = (self.matrix, self.geometry, self.geometry.version)
+        v_min, v_max = self.__min_max
+        return list(v_min), list(v_max)
+
+    def __is_computed_with(self, matrix: TransformationMatrix, geometry: GeometryPrimitive, version: int) -> bool:
+        """
+        :return: True if the instance still has this matrix and this template in this version
+        """
+        return matrix is self.matrix and geometry is self.geometry and version == self.geometry.version
+
     def duplicate(self) -> CityGeometry:
         """
         Keep the same reference to the geometry and create a new transformation matrix
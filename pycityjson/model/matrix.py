@@ -28,6 +28,8 @@ class TransformationMatrix:
 
     # The transformation matrix as a flat list of 16 elements (default identity matrix)
     __matrix: list[float | int] = field(default_factory=lambda: [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1])
+    # Cached read-only numpy copy of the matrix of shape (4, 4) - computed once in __post_init__
+    __np_matrix: np.ndarray = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """
@@ -40,6 +42,13 @@ class TransformationMatrix:
             '_TransformationMatrix__matrix',
             matrix,
         )
+        np_matrix = self.__list_to_numpy(matrix)
+        np_matrix.flags.writeable = False
+        object.__setattr__(
+            self,
+            '_TransformationMatrix__np_matrix',
+            np_matrix,
+        )
 
     def __str__(self) -> str:
         return str(self.get_np_matrix().tolist())
@@ -58,9 +67,9 @@ class TransformationMatrix:
 
     def get_np_matrix(self) -> np.ndarray:
         """
-        :return: the transformation matrix as a numpy array of shape (4, 4)
+        :return: a copy of the transformation matrix as a numpy array of shape (4, 4)
         """
-        return self.__list_to_numpy(self.__matrix)
+        return self.__np_matrix.copy()
 
     def get_origin(self) -> Vertex:
         """
@@ -150,30 +159,64 @@ class TransformationMatrix:
         """
         return self.__rotate(angle_degree, from_origin, self.__rotate_z)
 
-    def __reproject(self, vertices: list) -> list:
+    def __flatten(self, vertices: list, flat: list[Vertex]) -> None:
         """
-        Used recursively to reproject a list of vertices or nested lists of vertices
+        Used recursively to gather the vertices of nested lists of vertices in one flat list
         :param vertices: a list of vertices or nested lists of vertices
-        :return: the reprojected list
+        :param flat: the list where the vertices are appended
+        """
+        for item in vertices:
+            # for nested lists
+            if len(item) == 0 or isinstance(item[0], list):
+                self.__flatten(item, flat)
+            # for vertex
+            else:
+                flat.append(item)
+
+    def __nest(self, vertices: list, flat) -> list:
+        """
+        Used recursively to rebuild the nested structure of a list of vertices
+        :param vertices: the original list of vertices or nested lists of vertices
+        :param flat: iterator over the reprojected vertices in the order of __flatten
+        :return: the reprojected list with the same nested structure
         """
         result = []
         for item in vertices:
             # for nested lists
-            if isinstance(item[0], list):
-                result.append(self.__reproject(item))
+            if len(item) == 0 or isinstance(item[0], list):
+                result.append(self.__nest(item, flat))
             # for vertex
             else:
-                result.append(self.reproject_vertex(item))
+                result.append(next(flat))
         return result
 
-    def reproject_vertices(self, vertices: list) -> list:
+    def __reproject_array(self, vertices: np.ndarray) -> np.ndarray:
+        """
+        Reprojects all the vertices with a single homogeneous matrix product
+        :param vertices: array of vertices of shape (N, 3)
+        :return: the reprojected array of shape (N, 3)
+        """
+        homogeneous = np.ones((len(vertices), 4))
+        homogeneous[:, :3] = vertices
+        return (homogeneous @ self.__np_matrix.T)[:, :3]
+
+    def reproject_vertices(self, vertices: list | np.ndarray) -> list | np.ndarray:
         """
         Reprojects a list of vertices or nested lists of vertices
         Returns the list with the same nested structure
-        :param vertices: a list of vertices or nested lists of vertices
-        :return: the reprojected list
+        All the vertices are reprojected at once
+        :param vertices: a list of vertices or nested lists of vertices, or an array of shape (N, 3)
+        :return: the reprojected list (or array if an array is given)
         """
-        return self.__reproject(vertices)
+        if isinstance(vertices, np.ndarray):
+            return self.__reproject_array(vertices.reshape(-1, 3)).reshape(vertices.shape)
+
+        flat = []
+        self.__flatten(vertices, flat)
+        if len(flat) == 0:
+            return self.__nest(vertices, iter([]))
+        reprojected = self.__reproject_array(np.array(flat, dtype=float))
+        return self.__nest(vertices, iter(reprojected.tolist()))
 
     def reproject_vertex(self, vertex: Vertex | Vector) -> Vertex:
         """
@@ -182,9 +225,8 @@ class TransformationMatrix:
         :return: the reprojected vertex
         """
         vertex = self.__vector_to_vertex(vertex)
-        matrix = self.get_np_matrix()
         vertex = np.array([vertex[0], vertex[1], vertex[2], 1])
-        vertex = np.dot(matrix, vertex)
+        vertex = np.dot(self.__np_matrix, vertex)
         vertex = vertex[:-1]
         return vertex.tolist()
 
@@ -2,6 +2,7 @@
 
 
 from copy import copy
+from itertools import chain
 
 import numpy as np
 
@@ -15,8 +16,14 @@ class Primitive:
     """
     A Primitive is a basic element of the geometry.
     It is store in a GeometryPrimitive
+
+    The bounding box is cached until the primitive is modified (see self.invalidate()).
+    The modifications are propagated to the parents up to the GeometryPrimitive (see self._modified()).
     """
 
+    __min_max: tuple[Vertex, Vertex] | None = None  # bounding box computed on demand - see self.get_min_max()
+    __parent = None  # Primitive or GeometryPrimitive containing the primitive - see self._set_parent()
+
     def get_children(self) -> list['Primitive'] | list['Point']:
         """
         List of Primitive for all class except for MultiPoint which can have Point as children
@@ -39,12 +46,49 @@ class Primitive:
 
     def transform(self, matrix: TransformationMatrix, center=[0, 0, 0]) -> None:
         """
-        Applies a transformation matrix to all the children of the primitive (recursively)
+        Applies a transformation matrix to all the points of the primitive
+        The points of the whole tree are transformed at once (see Point.transform_points)
         :param matrix: TransformationMatrix to apply to the geometry
         :param center: The center of the transformation (default is the origin (0, 0, 0))
         """
+        Point.transform_points(self.get_points(), matrix, center)
+        self.invalidate()
+
+    def invalidate(self, parents: bool = True) -> None:
+        """
+        Clears the cached bounding box of the primitive and of its children
+        Called by the methods modifying the primitive. Must be called after modifying the points in place.
+        :param parents: If True, the parents are also invalidated up to the GeometryPrimitive (see self._modified())
+        """
+        self.__min_max = None
+        if len(self.children) > 0 and isinstance(self.children[0], Primitive):
+            for child in self.children:
+                child.invalidate(parents=False)
+        if parents and self.__parent is not None:
+            self.__parent._modified()
+
+    def _set_parent(self, parent) -> None:
+        """
+        :param parent: Primitive or GeometryPrimitive containing the primitive - notified when the primitive is modified
+        """
+        self.__parent = parent
+
+    def _adopt_children(self) -> None:
+        """
+        Sets the primitive as the parent of its children (the Point of a MultiPoint have no parent)
+        """
         for child in self.children:
-            child.transform(matrix, center)
+            if isinstance(child, Primitive):
+                child.__parent = self
+
+    def _modified(self) -> None:
+        """
+        Clears the cached bounding box of the primitive and of its parents
+        Called when a descendant of the primitive is modified - the GeometryPrimitive clears its content hash
+        """
+        self.__min_max = None
+        if self.__parent is not None:
+            self.__parent._modified()
 
     def get_type(self) -> str:
         """
@@ -66,6 +110,12 @@ class Primitive:
         :param child: Primitive to add to the children (Point for MultiPoint)
         """
         self.children.append(child)
+        if isinstance(child, Primitive):
+            child.__parent = self
+        # same as self._modified() without the call: the primitives are built one child at a time when they are parsed
+        self.__min_max = None
+        if self.__parent is not None:
+            self.__parent._modified()
 
     def index_vertices(self, vertices: Vertices) -> list:
         """
@@ -90,17 +140,28 @@ class Primitive:
                 vertices.append(child.get_vertices(flatten))
         return vertices
 
+    def get_points(self) -> list['Point']:
+        """
+        Returns all the points of the primitive (recursively) in the order of the boundaries
+        The points are not copied, modifying them modifies the primitive
+        :return: flat list of Point
+        """
+        points = []
+        for child in self.children:
+            points += child.get_points()
+        return points
+
     def get_min_max(self) -> tuple[Vertex, Vertex]:
         """
         Returns the minimum and maximum vertices of the primitive
-        Represents the bounding box of the primitive
+        Represents the bounding box of the primitive. Computed once and cached until the primitive is modified.
         :return: Tuple of two vertex with the minimum and maximum coordinates as [min_x, min_y, min_z] and [max_x, max_y, max_z]
         """
-        vertices = self.get_vertices(flatten=True)
-        vertices = np.array(vertices)
-        v_min = np.min(vertices, axis=0)
-        v_max = np.max(vertices, axis=0)
-        return v_min.tolist(), v_max.tolist()
+        if self.__min_max is None:
+            vertices = np.array([[point.x, point.y, point.z] for point in self.get_points()])
+            self.__min_max = np.min(vertices, axis=0).tolist(), np.max(vertices, axis=0).tolist()
+        v_min, v_max = self.__min_max
+        return list(v_min), list(v_max)
 
     def normalize(self, centered=False) -> None:
         """
@@ -243,6 +304,26 @@ class Point:
         self.y = vertex[1] + center[1]
         self.z = vertex[2] + center[2]
 
+    @staticmethod
+    def transform_points(points: list['Point'], matrix: TransformationMatrix, center=[0, 0, 0]) -> None:
+        """
+        Applies a transformation matrix to many points at once
+        The coordinates are gathered in one array, transformed with a single matrix product and written back to the points
+        :param points: list of Point to transform
+        :param matrix: TransformationMatrix to apply to the points
+        :param center: The center of the transformation (default is the origin (0, 0, 0))
+        :return: None - the points are modified
+        """
+        if len(points) == 0:
+            return
+        center = np.array(center, dtype=float)
+        vertices = np.array([[point.x, point.y, point.z] for point in points]) - center
+        vertices = matrix.reproject_vertices(vertices) + center
+        for point, (x, y, z) in zip(points, vertices.tolist()):
+            point.x = x
+            point.y = y
+            point.z = z
+
     def to_list(self) -> Vertex:
         """
         :return: List of the coordinates of the point (x, y, z)
@@ -276,6 +357,7 @@ class MultiPoint(Primitive):
     def __init__(self, points: list[Point] = None):
         self.type = self.__ptype
         self.children = [] if points is None else points
+        self._adopt_children()
 
     def get_vertices(self, flatten=False) -> list[Vertex]:
         """
@@ -284,6 +366,12 @@ class MultiPoint(Primitive):
         """
         return [point.to_list() for point in self.children]
 
+    def get_points(self) -> list[Point]:
+        """
+        :return: list of the points of the MultiPoint
+        """
+        return list(self.children)
+
     def get_semantic_values(self, semantics):
         """
         MultiPoint doesn't have a semantic
@@ -295,7 +383,7 @@ class MultiPoint(Primitive):
         Same as super.add_child() but with a Point as a child
         :param child: Point to add to the children
         """
-        return self.children.append(child)
+        super().add_child(child)
 
     def remove_interior_holes(self):
         """
@@ -331,6 +419,7 @@ class MultiLineString(Primitive):
     def __init__(self, faces: list[MultiPoint] = None, semantic: Semantic = None, materials: dict = None):
         self.type = self.__ptype
         self.children = [] if faces is None else faces
+        self._adopt_children()
 
         self.semantic: Semantic = semantic
         self.__materials: dict[str, Material] = {} if materials is None else materials
@@ -352,6 +441,8 @@ class MultiLineString(Primitive):
             self.children.append(exterior)
         else:
             self.children[0] = exterior
+        exterior._set_parent(self)
+        self.invalidate()
 
     def remove_interior_holes(self):
         """
@@ -359,6 +450,7 @@ class MultiLineString(Primitive):
         """
         if len(self.children) > 1:
             self.children = self.children[:1]
+            self.invalidate()
 
     def set_material(self, material: Material | None, theme: str = 'visual'):
         """
@@ -369,6 +461,7 @@ class MultiLineString(Primitive):
         if material is None and theme not in self.__materials:
             pass
         self.__materials[theme] = material
+        self._modified()
 
     def get_material(self, theme: str = 'visual') -> Material | None:
         """
@@ -441,6 +534,7 @@ class MultiSurface(Primitive):
     def __init__(self, surfaces: list[MultiLineString] = None):
         self.type = self.__ptype
         self.children = [] if surfaces is None else surfaces
+        self._adopt_children()
 
     def get_semantic_surfaces(self) -> list[dict]:
         """
@@ -451,7 +545,7 @@ class MultiSurface(Primitive):
             semantic = surface.get_semantic_dict()
             if semantic is None:
                 return None
-            semantics[surface.semantic['uuid']] = semantic
+            semantics[surface.semantic.key()] = semantic
         return list(semantics.values())
 
     def get_surfaces(self, flatten=True) -> list['MultiLineString']:
@@ -475,6 +569,7 @@ class Solid(Primitive):
     def __init__(self, multi_surfaces: list[MultiSurface] = None):
         self.type = self.__ptype
         self.children = [] if multi_surfaces is None else multi_surfaces
+        self._adopt_children()
 
     def get_semantic_surfaces(self) -> list[dict]:
         """
@@ -486,7 +581,7 @@ class Solid(Primitive):
                 semantic = surface.get_semantic_dict()
                 if semantic is None:
                     return None
-                semantics[surface.semantic['uuid']] = semantic
+                semantics[surface.semantic.key()] = semantic
         return list(semantics.values())
 
     def get_surfaces(self, flatten=True) -> list['MultiLineString']:
@@ -518,6 +613,7 @@ class MultiSolid(Primitive):
     def __init__(self, solids: list[Solid] = None):
         self.type = self.__ptype
         self.children = [] if solids is None else solids
+        self._adopt_children()
 
     def get_semantic_surfaces(self) -> list[dict]:
         """
@@ -530,7 +626,7 @@ class MultiSolid(Primitive):
                     semantic = surface.get_semantic_dict()
                     if semantic is None:
                         return None
-                    semantics[surface.semantic['uuid']] = semantic
+                    semantics[surface.semantic.key()] = semantic
         return list(semantics.values())
 
     def get_surfaces(self, flatten=True) -> list['MultiLineString']:
@@ -545,3 +641,423 @@ class MultiSolid(Primitive):
             else:
                 surfaces.append(solid.get_surfaces(flatten))
         return surfaces
+
+
+class PackedPrimitive(Primitive):
+    """
+    A PackedPrimitive is a compact representation of a MultiPoint, MultiLineString, MultiSurface, Solid or MultiSolid.
+    There is no Point, MultiPoint or MultiLineString object: the boundaries are stored as arrays (Arrow-style).
+
+    - vertices: array (V, 3) of the coordinates used by the geometry
+    - indices: flat int32 array of the indexes in vertices of the points of all the rings
+    - offsets: one int32 array for each level of nesting (ring, surface, shell, solid)
+        offsets[0][i]:offsets[0][i + 1] are the points of the ring i in indices
+        offsets[1][i]:offsets[1][i + 1] are the rings of the surface i (and so on for the shells and the solids)
+
+    The semantics and the materials are stored as parallel arrays with one value per surface (MultiLineString).
+    Use .unpack() to get the equivalent Primitive tree.
+    """
+
+    __depths = {
+        'MultiPoint': 1,
+        'MultiLineString': 2,
+        'MultiSurface': 3,
+        'CompositeSurface': 3,
+        'Solid': 4,
+        'MultiSolid': 5,
+        'CompositeSolid': 5,
+    }
+
+    def __init__(
+        self,
+        ptype: str,
+        vertices: np.ndarray,
+        indices: np.ndarray,
+        offsets: list[np.ndarray] = None,
+        semantics: list[Semantic] = None,
+        semantic_values: np.ndarray = None,
+        materials: dict[str, list[Material | None]] = None,
+    ):
+        """
+        :param ptype: type of the primitive (MultiSurface, Solid, CompositeSolid, ...)
+        :param vertices: array (V, 3) of the coordinates used by the geometry
+        :param indices: flat array of the indexes in vertices of the points of all the rings
+        :param offsets: offsets of the rings, surfaces, shells and solids (depending on the type)
+        :param semantics: list of the semantics used by the surfaces
+        :param semantic_values: index in semantics of the semantic of each surface (-1 if the surface has no semantic)
+        :param materials: list of the Material of each surface for each theme
+        """
+        self.type = ptype
+        self.vertices: np.ndarray = np.asarray(vertices, dtype=float).reshape(-1, 3)
+        self.indices: np.ndarray = np.asarray(indices, dtype=np.int32)
+        self.offsets: list[np.ndarray] = [] if offsets is None else [np.asarray(o, dtype=np.int32) for o in offsets]
+        self.semantics: list[Semantic] | None = semantics
+        self.semantic_values: np.ndarray | None = None if semantic_values is None else np.asarray(semantic_values, dtype=np.int32)
+        self.__materials: dict[str, list[Material | None]] = {} if materials is None else materials
+
+    def __len__(self) -> int:
+        """
+        :return: the number of children of the primitive
+        """
+        if len(self.offsets) == 0:
+            return len(self.indices)
+        return len(self.offsets[-1]) - 1
+
+    def __str__(self):
+        return f'{self.get_type()}(len={len(self)})'
+
+    def __repr__(self) -> str:
+        return repr(self.unpack())
+
+    @classmethod
+    def from_boundaries(cls, ptype: str, boundaries: list, vertices: np.ndarray, semantics: list[Semantic] = None, values: list = None) -> 'PackedPrimitive':
+        """
+        Creates the PackedPrimitive directly from CityJSON boundaries without creating any Point
+        :param ptype: type of the geometry (MultiSurface, Solid, CompositeSolid, ...)
+        :param boundaries: nested lists of the indexes of the vertices
+        :param vertices: array (N, 3) of all the vertices referenced by the boundaries
+        :param semantics: list of the semantics of the geometry
+        :param values: nested lists of the indexes of the semantics for each surface
+        """
+        if ptype not in cls.__depths:
+            raise ValueError(f'Unknown geometry type: {ptype}')
+        depth = cls.__depths[ptype]
+        offsets, flat = cls.__flatten(boundaries, depth)
+        used, indices = np.unique(np.asarray(flat, dtype=np.int64), return_inverse=True)
+
+        semantic_values = None
+        if semantics is not None and values is not None and depth >= 3:
+            values = cls.__flatten_values(values, offsets, depth)
+            semantic_values = [-1 if value is None else value for value in values]
+
+        return cls(ptype, np.asarray(vertices)[used], indices, offsets, semantics, semantic_values)
+
+    @classmethod
+    def pack(cls, primitive: Primitive) -> 'PackedPrimitive':
+        """
+        Converts a Primitive tree into a PackedPrimitive
+        :param primitive: MultiPoint, MultiLineString, MultiSurface, Solid or MultiSolid
+        """
+        if isinstance(primitive, PackedPrimitive):
+            return primitive.copy()
+        depth = cls.__depths[primitive.get_type()]
+        offsets, flat = cls.__flatten(primitive.get_vertices(flatten=False), depth)
+        vertices, indices = np.unique(np.asarray(flat, dtype=float).reshape(-1, 3), axis=0, return_inverse=True)
+
+        semantics, semantic_values, materials = None, None, {}
+        surfaces = primitive.get_surfaces(flatten=True) if depth >= 2 else None
+        if surfaces is not None:
+            semantics_index: dict[int, int] = {}
+            semantics, semantic_values = [], []
+            for surface in surfaces:
+                if surface.semantic is None:
+                    semantic_values.append(-1)
+                    continue
+                if id(surface.semantic) not in semantics_index:
+                    semantics_index[id(surface.semantic)] = len(semantics)
+                    semantics.append(surface.semantic)
+                semantic_values.append(semantics_index[id(surface.semantic)])
+            themes = primitive.get_material_themes()
+            materials = {theme: [surface.get_material(theme) for surface in surfaces] for theme in themes}
+            if len(semantics) == 0:
+                semantics, semantic_values = None, None
+
+        return cls(primitive.get_type(), vertices, indices.reshape(-1), offsets, semantics, semantic_values, materials)
+
+    def unpack(self) -> Primitive:
+        """
+        Converts the PackedPrimitive into the equivalent Primitive tree (MultiPoint, MultiLineString, MultiSurface, Solid or MultiSolid)
+        :return: a new Primitive - modifying it does not modify the PackedPrimitive
+        """
+        depth = len(self.offsets) + 1
+        children = [Point(x, y, z) for x, y, z in self.vertices[self.indices].tolist()]
+        if depth == 1:
+            return MultiPoint(children)
+
+        children = [MultiPoint(points) for points in self.__split(children, self.offsets[0])]
+        surface_offsets = self.offsets[1] if depth >= 3 else np.array([0, len(children)])
+        surfaces = []
+        for i, rings in enumerate(self.__split(children, surface_offsets)):
+            value = self.semantic_values[i] if self.semantic_values is not None else -1
+            semantic = self.semantics[value] if value >= 0 else None
+            materials = {theme: materials[i] for theme, materials in self.__materials.items()}
+            surfaces.append(MultiLineString(rings, semantic, materials))
+        if depth == 2:
+            return surfaces[0]
+
+        children = surfaces
+        for offsets, primitive_class in zip(self.offsets[2:], [MultiSurface, Solid]):
+            children = [primitive_class(items) for items in self.__split(children, offsets)]
+        primitive_class = [MultiSurface, Solid, MultiSolid][depth - 3]
+        primitive = primitive_class(children)
+        primitive.type = self.type
+        return primitive
+
+    def get_children(self) -> list[Primitive] | list[Point]:
+        """
+        :return: the children of the equivalent Primitive tree - modifying them does not modify the PackedPrimitive
+        """
+        return self.unpack().get_children()
+
+    def transform(self, matrix: TransformationMatrix, center=[0, 0, 0]) -> None:
+        """
+        Applies a transformation matrix to the vertices of the primitive in one matrix product
+        :param matrix: TransformationMatrix to apply to the geometry
+        :param center: The center of the transformation (default is the origin (0, 0, 0))
+        """
+        center = np.array(center, dtype=float)
+        self.vertices = matrix.reproject_vertices(self.vertices - center) + center
+        self.invalidate()
+
+    def invalidate(self, parents: bool = True) -> None:
+        """
+        Nothing is cached: the bounding box is computed from the unique vertices without creating any Point
+        :param parents: If True, the GeometryPrimitive containing the primitive is notified (see self._modified())
+        """
+        if parents:
+            self._modified()
+
+    def copy(self) -> 'PackedPrimitive':
+        """
+        Deep copy of the primitive (the semantics and the materials are shared)
+        :return: a new instance of the primitive with a copy of the arrays
+        """
+        return PackedPrimitive(
+            self.type,
+            self.vertices.copy(),
+            self.indices.copy(),
+            [offsets.copy() for offsets in self.offsets],
+            None if self.semantics is None else list(self.semantics),
+            None if self.semantic_values is None else self.semantic_values.copy(),
+            {theme: list(materials) for theme, materials in self.__materials.items()},
+        )
+
+    def add_child(self, child: Primitive) -> None:
+        """
+        A PackedPrimitive cannot be modified, use .unpack() to get a Primitive tree
+        """
+        raise TypeError('PackedPrimitive is immutable: no child can be added. Use .unpack() to get a Primitive tree that can be modified')
+
+    def index_vertices(self, vertices: Vertices) -> list:
+        """
+        Adds all the vertices at once in the Vertices object (in the order of the boundaries)
+        :param vertices: Vertices object to index the vertices
+        :return: list of indexes of the vertices in the Vertices object to be used in the boundaries
+        """
+        indexes = vertices.add_many(self.vertices[self.indices])
+        return self.__nest(indexes.tolist())
+
+    def get_vertices(self, flatten=False) -> list:
+        """
+        :param flatten: If True, the vertices are returned as a list of Vertex, else as the original structure of the geometry
+        :return: list of vertices of the primitive
+        """
+        vertices = self.vertices[self.indices].tolist()
+        return vertices if flatten else self.__nest(vertices)
+
+    def get_points(self) -> list[Point]:
+        """
+        The points are created from the arrays, modifying them does not modify the PackedPrimitive
+        :return: flat list of Point
+        """
+        return [Point(x, y, z) for x, y, z in self.vertices[self.indices].tolist()]
+
+    def get_min_max(self) -> tuple[Vertex, Vertex]:
+        """
+        :return: Tuple of two vertex with the minimum and maximum coordinates as [min_x, min_y, min_z] and [max_x, max_y, max_z]
+        """
+        return np.min(self.vertices, axis=0).tolist(), np.max(self.vertices, axis=0).tolist()
+
+    def get_semantic_surfaces(self) -> list[dict] | None:
+        """
+        :return: list of semantic of the surfaces of the primitive. None if a surface doesn't have a semantic
+        """
+        if len(self.offsets) < 2 or self.semantic_values is None or np.any(self.semantic_values < 0):
+            return None
+        # unique values in the order of the surfaces
+        values, first = np.unique(self.semantic_values, return_index=True)
+        semantics = {}
+        for value in values[np.argsort(first)].tolist():
+            semantic = self.semantics[value]
+            semantics[semantic.key()] = semantic.to_dict()
+        return list(semantics.values())
+
+    def get_surface_semantics(self) -> list | None:
+        """
+        :return: nested list of the Semantic of each surface (None if the surface has no semantic). None for a MultiPoint
+        """
+        if len(self.offsets) == 0:
+            return None
+        values = self.__get_surface_values()
+        return self.__nest_surfaces([None if value is None else self.semantics[value] for value in values])
+
+    def get_semantic_values(self, semantics: list[dict]) -> list | None:
+        """
+        :param semantics: list of semantics to compare - see self.get_semantic_surfaces()
+        :return: nested list of indexes of the semantics of the surfaces in the list of semantics
+        """
+        if len(self.offsets) == 0:
+            return None
+        indexes = {semantic.get('uuid'): i for i, semantic in reversed(list(enumerate(semantics)))}
+        lookup = {}
+        for value in range(len(self.semantics) if self.semantics is not None else 0):
+            i = indexes.get(self.semantics[value].to_dict().get('uuid'))
+            lookup[value] = i if i is not None and semantics[i] == self.semantics[value] else None
+        values = [lookup.get(value) for value in self.__get_surface_values()]
+        return self.__nest_surfaces(values)
+
+    def get_material_themes(self) -> list[str]:
+        """
+        :return: list of themes of the materials of the surfaces
+        """
+        return list(self.__materials.keys())
+
+    def set_materials(self, materials: list[Material | None], theme: str = 'visual') -> None:
+        """
+        Sets the material of every surface for a theme
+        :param materials: one Material (or None) for each surface
+        :param theme: theme of the materials
+        """
+        self.__materials[theme] = list(materials)
+        self._modified()
+
+    def get_materials(self, theme: str = 'visual') -> list[Material | None] | None:
+        """
+        :param theme: theme of the materials
+        :return: the Material (or None) of each surface. None if the theme doesn't exist
+        """
+        if theme not in self.__materials:
+            return None
+        return list(self.__materials[theme])
+
+    def get_theme_values(self, theme: str, materials: Materials) -> list | None:
+        """
+        :param theme: theme of the material to get the index of
+        :param materials: list of all the materials
+        :return: nested list of indexes of the materials of the surfaces in the list of materials
+        """
+        if len(self.offsets) == 0:
+            return None
+        surface_materials = self.__materials.get(theme, [None] * self.surface_count())
+        values = [materials.add(material) if material is not None else None for material in surface_materials]
+        return self.__nest_surfaces(values)
+
+    def get_surfaces(self, flatten=True) -> list[MultiLineString] | None:
+        """
+        The surfaces are created from the arrays, modifying them does not modify the PackedPrimitive
+        :param flatten: to get all the surfaces in one list instead of a nested list
+        :return: list of surfaces (MultiLineString) of the primitive
+        """
+        return self.unpack().get_surfaces(flatten)
+
+    def surface_count(self) -> int | None:
+        """
+        :return: number of surfaces in the primitive
+        """
+        if len(self.offsets) == 0:
+            return None
+        if len(self.offsets) == 1:
+            return 1
+        return len(self.offsets[1]) - 1
+
+    def remove_interior_holes(self) -> None:
+        """
+        Removes all the holes in the surfaces of the primitive (keeps the first ring of each surface)
+        """
+        depth = len(self.offsets) + 1
+        if depth == 1:
+            # MultiPoint: no surface
+            return
+        ring_offsets = self.offsets[0]
+        if depth == 2:
+            # MultiLineString: one surface made of all the rings
+            kept = np.array([0])
+        else:
+            # first ring of each surface
+            kept = self.offsets[1][:-1]
+        starts = ring_offsets[kept]
+        lengths = ring_offsets[kept + 1] - starts
+        new_ring_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int32)
+        positions = np.repeat(starts - new_ring_offsets[:-1], lengths) + np.arange(new_ring_offsets[-1])
+
+        used, indices = np.unique(self.indices[positions], return_inverse=True)
+        self.vertices = self.vertices[used]
+        self.indices = indices.astype(np.int32)
+        self.offsets[0] = new_ring_offsets
+        if depth >= 3:
+            self.offsets[1] = np.arange(len(kept) + 1, dtype=np.int32)
+        self.invalidate()
+
+    def __get_surface_values(self) -> list[int | None]:
+        """
+        :return: the index of the semantic of each surface (None if the surface has no semantic)
+        """
+        if self.semantic_values is None:
+            return [None] * self.surface_count()
+        return [None if value < 0 else value for value in self.semantic_values.tolist()]
+
+    def __nest(self, flat: list) -> list:
+        """
+        :param flat: one value for each point in indices
+        :return: the values with the nested structure of the boundaries
+        """
+        items = flat
+        for offsets in self.offsets:
+            items = self.__split(items, offsets)
+        return items
+
+    def __nest_surfaces(self, values: list):
+        """
+        :param values: one value for each surface
+        :return: the values with the nested structure of the surfaces (int for a MultiLineString)
+        """
+        if len(self.offsets) == 1:
+            return values[0]
+        for offsets in self.offsets[2:]:
+            values = self.__split(values, offsets)
+        return values
+
+    @staticmethod
+    def __split(items: list, offsets: np.ndarray) -> list[list]:
+        """
+        :param items: flat list
+        :param offsets: offsets of each group in items (Arrow-style)
+        :return: list of the groups of items
+        """
+        bounds = offsets.tolist()
+        return [items[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+    @staticmethod
+    def __flatten(boundaries: list, depth: int) -> tuple[list[np.ndarray], list]:
+        """
+        Flattens nested boundaries one level at a time
+        :param boundaries: nested lists of indexes (or vertices)
+        :param depth: depth of the boundaries (1 for a MultiPoint to 5 for a MultiSolid)
+        :return: the offsets of each level (from the rings to the solids) and the flat list of the leaves
+        """
+        offsets = []
+        items = boundaries
+        for _ in range(depth - 1):
+            lengths = [len(item) for item in items]
+            offsets.append(np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)]).astype(np.int32))
+            items = list(chain.from_iterable(items))
+        offsets.reverse()
+        return offsets, items
+
+    @staticmethod
+    def __flatten_values(values: list, offsets: list[np.ndarray], depth: int) -> list:
+        """
+        Flattens nested semantic values one level at a time (from the solids to the shells)
+        A None value of a solid or a shell stands for all its surfaces: it is replaced by None for each of them
+        :param values: nested lists of the indexes of the semantics (None if the item has no semantic)
+        :param offsets: offsets of the boundaries - see self.__flatten()
+        :param depth: depth of the boundaries (3 for a MultiSurface to 5 for a MultiSolid)
+        :return: the flat list of the value of each surface
+        """
+        items = values
+        for level in range(depth - 2, 1, -1):
+            flat = []
+            for item, count in zip(items, np.diff(offsets[level]).tolist()):
+                flat += [None] * count if item is None else item
+            items = flat
+        return items
@@ -1,3 +1,5 @@
+from itertools import count
+
 from pycityjson.guid import guid
 
 # todo : remove
@@ -156,23 +158,31 @@ class Semantic:
     """
     Contains the semantic of a MultiLineString (Surface)
     Can also be used to strore more metadata about the surface.
+
+    The IFC UUID of the semantic is generated lazily: it is only created when it is read
+    (semantic['uuid'], .to_dict() or when the City is written with the semantic uuids).
+    Until then the semantic is identified by an internal id - see self.key()
     """
 
+    __ids = count()  # internal ids of the semantics
+
     def __init__(self, dtype: str, add_uuid: bool = True):
         """
         :param dtype: name of the CityJSON semantic - will be converted to the standard semantic if possible.
-        :param add_uuid: bool, if True, an IFC UUID is added to the semantic to the 'uuid' key.
+        :param add_uuid: bool, if True, an IFC UUID is added to the semantic to the 'uuid' key when it is first needed.
         """
         self.__semantic = {}
         self.__semantic['type'] = self.__get_semantic(dtype)
-        if add_uuid:
-            self.add_uuid()
+        self.__id: int = next(Semantic.__ids)
+        self.__lazy_uuid: bool = add_uuid  # True while the uuid is still to be generated
 
     def __getitem__(self, key: str) -> str:
         """
         :param key: key of the semantic dictionary.
         :return: value of the key.
         """
+        if key == 'uuid':
+            self.__materialize_uuid()
         return self.__semantic[key]
 
     def __setitem__(self, key: str, value: str) -> None:
@@ -181,37 +191,75 @@ class Semantic:
         :param value: value to set.
         """
         self.__semantic[key] = value
+        if key == 'uuid':
+            self.__lazy_uuid = False
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Does not generate the uuid
+        :param key: key of the semantic dictionary.
+        :return: True if the key is in the semantic dictionary (or is a uuid that will be generated).
+        """
+        return key in self.__semantic or (key == 'uuid' and self.__lazy_uuid)
 
     def __repr__(self):
-        return f'Semantic({self.__semantic})'
+        # does not generate the uuid: a repr (ex.: in a debugger or a log) must not modify the semantic
+        return f'Semantic({self.to_dict(uuid=False)})'
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        The internal ids are only unique in one process: a new id is given when the semantic is unpickled
+        :param state: pickled attributes of the semantic
+        """
+        self.__dict__.update(state)
+        self.__id = next(Semantic.__ids)
 
     def __eq__(self, other: object) -> bool:
         """
+        Does not generate the uuids
         :param other: object to compare.
         :return: True if the semantics are the same and have the same UUID if it exists.
         """
         if isinstance(other, Semantic) or isinstance(other, dict):
             if other['type'] == self.__semantic['type']:
-                if 'uuid' in other and 'uuid' in self.__semantic:
-                    return other['uuid'] == self.__semantic['uuid']
-                if 'uuid' in other or 'uuid' in self.__semantic:
+                if 'uuid' in other and 'uuid' in self:
+                    other_key = other.key() if isinstance(other, Semantic) else other['uuid']
+                    return other_key == self.key()
+                if 'uuid' in other or 'uuid' in self:
                     return False
                 return True
         return False
 
+    def key(self) -> str | int:
+        """
+        Identifies the semantic without generating its uuid
+        :return: the uuid of the semantic if it exists, else its internal id
+        """
+        return self.__semantic.get('uuid', self.__id)
+
     def add_uuid(self, uuid: str = None) -> None:
         """
         Adds a UUID to the semantic
         :param uuid: IFC UUID if no uuid is provided. a new one is generated.
         """
-        self.__semantic['uuid'] = guid() if uuid is None else uuid
+        self['uuid'] = guid() if uuid is None else uuid
 
-    def to_dict(self) -> dict:
+    def to_dict(self, uuid: bool = True) -> dict:
         """
+        :param uuid: if True, the uuid is generated if it is still missing. If False, only an existing uuid is kept.
         :return: a copy of the semantic dictionary.
         """
+        if uuid:
+            self.__materialize_uuid()
         return self.__semantic.copy()
 
+    def __materialize_uuid(self) -> None:
+        """
+        Generates the uuid if it was not generated yet
+        """
+        if self.__lazy_uuid:
+            self.add_uuid()
+
     @staticmethod
     def __get_semantic(name: str) -> str | None:
         """
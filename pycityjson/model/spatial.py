@@ -0,0 +1,244 @@
+import heapq
+from itertools import chain
+
+import numpy as np
+
+from .cityobject import CityObject, CityObjects
+from .vertices import Vertex
+
+
+class SpatialIndex:
+    """
+    Packed R-tree (Sort-Tile-Recursive) over the geographical extents of CityObjects.
+
+    The tree is stored as one (N, 6) array of boxes [minx, miny, minz, maxx, maxy, maxz] per level:
+    the children of the node i are the nodes [i * node_size, (i + 1) * node_size) of the level below.
+    The leaves are sorted in tiles by the x then the y of the center of the extents.
+
+    The index follows the changes of the extents made with CityObject.set_geographical_extent() (ex.: CityObject.transform()).
+    The CityObjects added after the index is built are checked one by one: build a new index after adding many CityObjects.
+    The CityObjects only keep a weak reference to the index: the previous index stops following the changes once it is no longer used.
+    """
+
+    def __init__(self, cityobjects: CityObjects, node_size: int = 16):
+        """
+        The extents that are missing are computed - see CityObject.set_geographical_extent()
+        The CityObjects without geometries are only indexed when they get an extent.
+        :param cityobjects: CityObjects to index
+        :param node_size: maximum number of children of a node
+        """
+        self.__cityobjects: CityObjects = cityobjects
+        self.__node_size: int = node_size
+
+        cityobjects_list = cityobjects.tolist()
+        extents = [cityobject.geo_extent for cityobject in cityobjects_list]
+        missing = [position for position, extent in enumerate(extents) if extent is None]
+        for position in missing:
+            extents[position] = cityobjects_list[position].set_geographical_extent(overwrite=False)
+        positions = np.arange(len(extents))
+        if any(extents[position] is None for position in missing):
+            positions = np.array([position for position in positions.tolist() if extents[position] is not None], dtype=np.int64)
+            extents = [extents[position] for position in positions.tolist()]
+
+        boxes = np.fromiter(chain.from_iterable(extents), dtype=np.float64, count=6 * len(extents)).reshape(-1, 6)
+        order = self.__sort_tiles(boxes)
+        self.__items: list[CityObject] = cityobjects_list  # CityObjects in the order of the collection when the index was built
+        self.__positions: np.ndarray = positions[order]  # position in self.__items of each leaf
+        self.__slots: dict[int, int] | None = None  # slot of the items by id - built on the first update
+        self.__levels: list[np.ndarray] = [boxes[order]]
+        while len(self.__levels[-1]) > node_size:
+            self.__levels.append(self.__pack(self.__levels[-1]))
+
+        # CityObjects that got an extent after the index was built - checked one by one
+        self.__extra_items: list[CityObject] = []
+        self.__extra_boxes: np.ndarray = np.empty((0, 6), dtype=np.float64)
+
+        cityobjects.add_spatial_index(self)
+
+    def __len__(self) -> int:
+        """
+        :return: number of indexed CityObjects
+        """
+        return len(self.__positions) + len(self.__extra_items)
+
+    @staticmethod
+    def __get_extent(cityobject: CityObject) -> Vertex | None:
+        """
+        :param cityobject: CityObject to index
+        :return: the geographical extent of the CityObject (computed if missing)
+        """
+        if cityobject.geo_extent is None:
+            return cityobject.set_geographical_extent(overwrite=False)
+        return cityobject.geo_extent
+
+    def __sort_tiles(self, boxes: np.ndarray) -> np.ndarray:
+        """
+        Sort-Tile-Recursive: the boxes are cut in vertical slices by x, then sorted by y in each slice
+        :param boxes: array (N, 6) of the extents
+        :return: the order of the boxes in the leaves
+        """
+        leaves = -(-len(boxes) // self.__node_size)
+        slice_size = max(int(np.ceil(np.sqrt(leaves))), 1) * self.__node_size
+        centers = (boxes[:, :3] + boxes[:, 3:]) / 2
+        order = np.argsort(centers[:, 0])
+        for start in range(0, len(order), slice_size):
+            tile = order[start : start + slice_size]
+            order[start : start + slice_size] = tile[np.argsort(centers[tile, 1])]
+        return order
+
+    def __pack(self, boxes: np.ndarray) -> np.ndarray:
+        """
+        :param boxes: array (N, 6) of the boxes of a level
+        :return: the boxes of the level above - one box for each group of node_size boxes
+        """
+        starts = np.arange(0, len(boxes), self.__node_size)
+        # fmin and fmax ignore the NaN of the removed CityObjects
+        return np.hstack([np.fmin.reduceat(boxes[:, :3], starts), np.fmax.reduceat(boxes[:, 3:], starts)])
+
+    @staticmethod
+    def __to_box(bbox: list[float]) -> np.ndarray:
+        """
+        :param bbox: [minx, miny, maxx, maxy] or [minx, miny, minz, maxx, maxy, maxz]
+        :return: box of 6 values. The z is not limited for a 2D box
+        """
+        if len(bbox) == 4:
+            return np.array([bbox[0], bbox[1], -np.inf, bbox[2], bbox[3], np.inf], dtype=np.float64)
+        if len(bbox) == 6:
+            return np.array(bbox, dtype=np.float64)
+        raise ValueError(f'A bounding box must have 4 or 6 values, not {len(bbox)}')
+
+    @staticmethod
+    def __intersects(boxes: np.ndarray, box: np.ndarray) -> np.ndarray:
+        """
+        :param boxes: array (N, 6) of boxes
+        :param box: box of 6 values
+        :return: mask of the boxes intersecting the box. Always False for a NaN box
+        """
+        return np.all(boxes[:, :3] <= box[3:], axis=1) & np.all(boxes[:, 3:] >= box[:3], axis=1)
+
+    def __children(self, nodes: np.ndarray, level: int) -> np.ndarray:
+        """
+        :param nodes: indexes of nodes of the level
+        :param level: level of the nodes (> 0)
+        :return: indexes of the children of the nodes in the level below
+        """
+        children = (nodes[:, None] * self.__node_size + np.arange(self.__node_size)).reshape(-1)
+        return children[children < len(self.__levels[level - 1])]
+
+    def query_bbox(self, bbox: list[float]) -> list[CityObject]:
+        """
+        :param bbox: [minx, miny, maxx, maxy] or [minx, miny, minz, maxx, maxy, maxz]
+        :return: the CityObjects whose extent intersects the bounding box, in the order of the collection
+            (the CityObjects that got an extent after the index was built are last)
+        """
+        box = self.__to_box(bbox)
+        nodes = np.arange(len(self.__levels[-1]))
+        for level in range(len(self.__levels) - 1, -1, -1):
+            nodes = nodes[self.__intersects(self.__levels[level][nodes], box)]
+            if level > 0:
+                nodes = self.__children(nodes, level)
+        found = [self.__items[position] for position in np.sort(self.__positions[nodes]).tolist()]
+        found += [self.__extra_items[i] for i in np.flatnonzero(self.__intersects(self.__extra_boxes, box))]
+        return found
+
+    def query_point(self, point: Vertex) -> list[CityObject]:
+        """
+        :param point: [x, y] or [x, y, z]
+        :return: the CityObjects whose extent contains the point, in the order of the collection
+        """
+        if len(point) == 2:
+            return self.query_bbox([point[0], point[1], point[0], point[1]])
+        return self.query_bbox([point[0], point[1], point[2], point[0], point[1], point[2]])
+
+    @staticmethod
+    def __distances(boxes: np.ndarray, point: np.ndarray) -> np.ndarray:
+        """
+        :param boxes: array (N, 6) of boxes
+        :param point: [x, y] or [x, y, z]
+        :return: distance from the point to each box (0 inside the box, infinity for a NaN box)
+        """
+        dims = len(point)
+        gaps = np.maximum(np.maximum(boxes[:, :dims] - point, point - boxes[:, 3 : 3 + dims]), 0)
+        distances = np.sqrt(np.sum(gaps * gaps, axis=1))
+        distances[np.isnan(distances)] = np.inf
+        return distances
+
+    def nearest(self, point: Vertex, k: int = 1) -> list[CityObject]:
+        """
+        Best-first search: the nodes are visited in the order of their distance to the point
+        :param point: [x, y] or [x, y, z]. The distance is in 2D for a 2D point
+        :param k: number of CityObjects to find
+        :return: the k CityObjects with the closest extents, from the closest to the farthest
+        """
+        point = np.array(point, dtype=np.float64)
+        top = len(self.__levels) - 1
+        # (distance, level, index): the level -1 is used for the extra items
+        queue = [(d, top, i) for i, d in enumerate(self.__distances(self.__levels[top], point).tolist())]
+        queue += [(d, -1, i) for i, d in enumerate(self.__distances(self.__extra_boxes, point).tolist())]
+        heapq.heapify(queue)
+
+        found = []
+        while len(queue) > 0 and len(found) < k:
+            distance, level, index = heapq.heappop(queue)
+            if distance == np.inf:
+                break
+            if level <= 0:
+                found.append(self.__items[self.__positions[index]] if level == 0 else self.__extra_items[index])
+                continue
+            children = self.__children(np.array([index]), level)
+            for child, d in zip(children.tolist(), self.__distances(self.__levels[level - 1][children], point).tolist()):
+                heapq.heappush(queue, (d, level - 1, child))
+        return found
+
+    def update(self, cityobject: CityObject) -> None:
+        """
+        Updates the extent of a CityObject in the index. Called when the extent of a CityObject of the collection changes.
+        :param cityobject: CityObject with a new geographical extent (or None to remove it from the index)
+        """
+        box = np.full(6, np.nan) if cityobject.geo_extent is None else np.array(cityobject.geo_extent, dtype=np.float64)
+        self.__set_box(cityobject, box)
+
+    def remove(self, cityobject: CityObject) -> None:
+        """
+        Removes a CityObject from the index. Called when a CityObject is removed from the collection.
+        :param cityobject: CityObject to remove
+        """
+        self.__set_box(cityobject, np.full(6, np.nan))
+
+    def __set_box(self, cityobject: CityObject, box: np.ndarray) -> None:
+        """
+        Only the boxes of the nodes containing the CityObject are updated. A NaN box never intersects anything.
+        :param cityobject: CityObject to update
+        :param box: new box of the CityObject
+        """
+        if self.__slots is None:
+            self.__slots = {id(self.__items[position]): slot for slot, position in enumerate(self.__positions.tolist())}
+        slot = self.__slots.get(id(cityobject))
+        if slot is None:
+            self.__set_extra_box(cityobject, box)
+            return
+
+        self.__levels[0][slot] = box
+        for level in range(1, len(self.__levels)):
+            slot //= self.__node_size
+            children = self.__levels[level - 1][slot * self.__node_size : (slot + 1) * self.__node_size]
+            self.__levels[level][slot] = np.concatenate([np.fmin.reduce(children[:, :3]), np.fmax.reduce(children[:, 3:])])
+
+    def __set_extra_box(self, cityobject: CityObject, box: np.ndarray) -> None:
+        """
+        :param cityobject: CityObject that was not in the collection (or had no extent) when the index was built
+        :param box: new box of the CityObject
+        """
+        for i, item in enumerate(self.__extra_items):
+            if item is cityobject:
+                self.__extra_boxes[i] = box
+                return
+        if not np.isnan(box).any():
+            self.__extra_items.append(cityobject)
+            self.__extra_boxes = np.vstack([self.__extra_boxes, box])
+
+    def detach(self) -> None:
+        """
+        Stops following the changes of the collection. The index is not up to date anymore.
+        """
+        self.__cityobjects.remove_spatial_index(self)
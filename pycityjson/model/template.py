@@ -12,6 +12,11 @@ class GeometryTemplates:
     def __init__(self, geometries: list[GeometryPrimitive], vertices: Vertices):
         self.geometries = geometries
         self.vertices = vertices
+        # Dicts to find the index of a GeometryPrimitive by identity or by content hash for performance reasons
+        self.__indexes_by_id: dict[int, int] = {}
+        self.__indexes_by_hash: dict[str, int] = {}
+        self.__indexed_versions: list[int] = []  # version of each indexed geometry when its content hash was indexed
+        self.__indexed_modifications = GeometryPrimitive.get_modifications()
 
     def __getitem__(self, key: int) -> GeometryPrimitive | None:
         """
@@ -30,13 +35,53 @@ class GeometryTemplates:
         """
         return len(self.geometries) == 0
 
+    def get_index(self, city_geometry: GeometryPrimitive) -> int | None:
+        """
+        :param city_geometry: GeometryPrimitive to find
+        :return: Index of the same GeometryPrimitive (or of one with the same content hash). None if it is not a template
+        """
+        self.__index_geometries()
+        index = self.__indexes_by_id.get(id(city_geometry))
+        if index is not None and index < len(self.geometries) and self.geometries[index] is city_geometry:
+            return index
+        return self.__indexes_by_hash.get(city_geometry.content_hash())
+
     def add_template(self, city_geometry: GeometryPrimitive) -> int:
         """
         Adds a GeometryPrimitive to the list of geometries
-        Will not add the same GeometryPrimitive multiple times (based on the __eq__ method)
+        Will not add the same GeometryPrimitive multiple times (based on the content hash)
         :param city_geometry: GeometryPrimitive to add
         :return: Index of the added GeometryPrimitive
         """
-        if city_geometry not in self.geometries:
+        index = self.get_index(city_geometry)
+        if index is None:
             self.geometries.append(city_geometry)
-        return self.geometries.index(city_geometry)
+            self.__index_geometries()
+            index = len(self.geometries) - 1
+        return index
+
+    def __index_geometries(self) -> None:
+        """
+        Adds the geometries appended to the list since the last call to the indexes
+        The indexes are rebuilt when geometries were removed or when an indexed geometry was modified (its content hash changed)
+        """
+        if len(self.__indexed_versions) > len(self.geometries) or self.__is_modified():
+            self.__indexes_by_id.clear()
+            self.__indexes_by_hash.clear()
+            self.__indexed_versions = []
+        for index in range(len(self.__indexed_versions), len(self.geometries)):
+            geometry = self.geometries[index]
+            self.__indexes_by_id.setdefault(id(geometry), index)
+            self.__indexes_by_hash.setdefault(geometry.content_hash(), index)
+            self.__indexed_versions.append(geometry.version)
+
+    def __is_modified(self) -> bool:
+        """
+        The versions of the geometries are only compared when a geometry was modified since the last call
+        :return: True if an indexed geometry was modified since it was indexed
+        """
+        modifications = GeometryPrimitive.get_modifications()
+        if modifications == self.__indexed_modifications:
+            return False
+        self.__indexed_modifications = modifications
+        return any(self.geometries[index].version != version for index, version in enumerate(self.__indexed_versions))
@@ -1,4 +1,3 @@
-from copy import copy
 from typing import TypeAlias
 
 import numpy as np
@@ -10,9 +9,16 @@ class Vertices:
     """
     Container for vertices with a given precision.
     Will round the given vertices.
+
+    The vertices are stored in a growable (N, 3) numpy array (int64 while only integers are added, float64 otherwise).
+    They are deduplicated on their integer coordinates on the grid given by the precision (same grid as City.scale).
+    The coordinates are rounded as with round(coord, precision), half-way values included (see self.__to_keys()).
+    The array can be memory-mapped from a .npy file (see from_file()) so the coordinates are only paged in when they are read.
     """
 
-    def __init__(self, vertices: list[Vertex] = None, precision: int = 3, start_index: int = 0):
+    __half_way: float = 1e-6  # scaled coordinates closer than this to a half-way value are rounded with round(coord, precision)
+
+    def __init__(self, vertices: list[Vertex] | np.ndarray = None, precision: int = 3, start_index: int = 0):
         """
         :param vertices: Initial vertices of the collection
         :param precision: the number of decimal places to round the vertices. Must be a positive integer [0, infinity]
@@ -20,14 +26,71 @@ class Vertices:
         """
         self.start_index = start_index
         self.__precision = precision
-        self.__vertices = []
-        # Dict to store the index of the vertices for performance reasons
-        self.__vertices_dict: dict[str, int] = {}
+        self.__factor = 10**precision
+        # The array has a capacity larger than the number of vertices to allow appending without reallocating
+        self.__vertices: np.ndarray = np.empty((0, 3), dtype=np.int64)
+        self.__size = 0
+        # Dict to store the index of the vertices (by their integer coordinates) for performance reasons
+        self.__vertices_dict: dict[tuple[int, int, int], int] = {}
+        self.__indexed_size = 0  # number of vertices in the dict - the dict is built lazily for the vertices given by from_array()
+        self.__mmap_mode: str | None = None  # mode of the memory-mapped file backing the array - see from_file()
+
+        if vertices is not None and len(vertices) > 0:
+            self.add_many(np.asarray(vertices))
 
-        vertices = vertices if vertices is not None else []
+    @classmethod
+    def from_array(cls, vertices: np.ndarray, precision: int = 3, start_index: int = 0, rounded: bool = False) -> 'Vertices':
+        """
+        Creates the collection from an array of vertices that are already indexed (ex.: the vertices of a CityJSON file)
+        The vertices are not deduplicated: the index of each vertex is its row in the array.
+        The float vertices are rounded to the precision. The array is used as is (not copied) if it doesn't need to be rounded.
+        :param vertices: array of shape (N, 3) of integers or floats
+        :param precision: the number of decimal places to round the vertices. Must be a positive integer [0, infinity]
+        :param start_index: start index for the vertices (zero based by default)
+        :param rounded: if True, the float vertices are already rounded to the precision: they are used without being copied
+        """
+        collection = cls(precision=precision, start_index=start_index)
+        vertices = np.asarray(vertices).reshape(-1, 3)
+        if np.issubdtype(vertices.dtype, np.integer):
+            vertices = vertices.astype(np.int64, copy=False)
+        elif rounded:
+            vertices = vertices.astype(np.float64, copy=False)
+        else:
+            vertices = collection.__to_keys(vertices.astype(np.float64, copy=False)) / collection.__factor
+        collection.__vertices = vertices
+        collection.__size = len(vertices)
+        return collection
 
-        for vertex in vertices:
-            self.add(vertex)
+    @classmethod
+    def from_file(cls, file_path: str, precision: int = 3, start_index: int = 0, mmap_mode: str = 'r') -> 'Vertices':
+        """
+        Creates the collection from a .npy file (see save()) memory-mapped with numpy.memmap: nothing is read until it is used.
+        The vertices must already be rounded to the precision.
+        With 'r' (read-only), adding a vertex that is not in the collection raises a ValueError.
+        With 'c' (copy-on-write), the file is never modified: the new vertices are added to a copy of the vertices in memory.
+        :param file_path: path to the .npy file of an array of shape (N, 3)
+        :param precision: the number of decimal places of the vertices. Must be a positive integer [0, infinity]
+        :param start_index: start index for the vertices (zero based by default)
+        :param mmap_mode: 'r' for read-only or 'c' for copy-on-write
+        """
+        if mmap_mode not in ('r', 'c'):
+            raise ValueError(f"Unknown mmap mode: {mmap_mode}. Must be 'r' or 'c'")
+        collection = cls.from_array(np.load(file_path, mmap_mode=mmap_mode), precision, start_index, rounded=True)
+        collection.__mmap_mode = mmap_mode
+        return collection
+
+    def save(self, file_path: str) -> None:
+        """
+        Writes the vertices as a .npy file - see from_file()
+        :param file_path: path to the .npy file
+        """
+        np.save(file_path, self.toarray())
+
+    def get_mmap_mode(self) -> str | None:
+        """
+        :return: 'r' or 'c' if the vertices are read from a memory-mapped file, None if they are in memory
+        """
+        return self.__mmap_mode
 
     def __getitem__(self, item: Vertex | int) -> Vertex | None:
         """
@@ -35,7 +98,7 @@ class Vertices:
         :param item: Vertex or index
         :return: Vertex if item is an index, index if item is a vertex. None if the item is not in the collection
         """
-        if isinstance(item, int):
+        if isinstance(item, (int, np.integer)):
             return self.get_vertice(item)
         elif isinstance(item, list):
             return self.get_index(item)
@@ -45,13 +108,13 @@ class Vertices:
         """
         Returns the number of vertices in the collection
         """
-        return len(self.__vertices)
+        return self.__size
 
     def __iter__(self):
         """
         Iterator for the vertices
         """
-        return iter(self.__vertices)
+        return iter(self.tolist())
 
     def __contains__(self, item: Vertex) -> bool:
         """
@@ -60,7 +123,8 @@ class Vertices:
         """
         if not isinstance(item, list) and len(item) != 3:
             return False
-        return self.__vertex_to_string(item) in self.__vertices_dict
+        self.__index_vertices()
+        return self.__vertex_to_key(item) in self.__vertices_dict
 
     def get_index(self, vertex: Vertex) -> int | None:
         """
@@ -69,70 +133,206 @@ class Vertices:
         """
         if vertex not in self:
             return None
-        return self.__vertices_dict[self.__vertex_to_string(vertex)] + self.start_index
+        return self.__vertices_dict[self.__vertex_to_key(vertex)] + self.start_index
 
     def get_vertice(self, index: int) -> Vertex | None:
         """
         :param index: Index of the vertex to get
         :return: Vertex at the given index. None if the index is out of bounds
         """
-        if index < 0 or index >= len(self.__vertices):
+        if index < 0 or index >= self.__size:
             return None
-        vertex = self.__vertices[index]
-        return [vertex[0], vertex[1], vertex[2]]
+        return self.__vertices[index].tolist()
 
     def get_min(self) -> list[float]:
         """
         :return: Minimum value of the given axis (x, y, z)
         """
-        vertices = np.array(self.__vertices)
-        return np.min(vertices, axis=0).tolist()
+        return np.min(self.toarray(), axis=0).tolist()
 
-    def get_max(self) -> float:
+    def get_max(self) -> list[float]:
         """
         :return: Maximum value of the given axis (x, y, z)
         """
-        vertices = np.array(self.__vertices)
-        return np.max(vertices, axis=0)
+        return np.max(self.toarray(), axis=0).tolist()
 
     def add(self, vertex: Vertex) -> int:
         """
         Add a vertex to the collection with a given precision. Will round the vertex to the precision given in the
         constructor.
         """
-        vertex = [round(coord, self.__precision) for coord in vertex]
+        self.__index_vertices()
+        key = self.__vertex_to_key(vertex)
+        index = self.__vertices_dict.get(key)
 
-        if vertex not in self:
-            self.__vertices_dict[self.__vertex_to_string(vertex)] = len(self.__vertices)
-            self.__vertices.append(vertex)
+        if index is None:
+            is_integer = all(isinstance(coord, (int, np.integer)) for coord in vertex)
+            self.__reserve(1, is_integer)
+            index = self.__size
+            self.__vertices[index] = vertex if self.__is_integer() else [coord / self.__factor for coord in key]
+            self.__vertices_dict[key] = index
+            self.__size += 1
+            self.__indexed_size = self.__size
+
+        return index + self.start_index
+
+    def add_many(self, vertices: np.ndarray) -> np.ndarray:
+        """
+        Adds an array of vertices to the collection in one pass.
+        The result is the same as calling .add() on each vertex in order.
+        :param vertices: array of vertices of shape (N, 3)
+        :return: array of shape (N,) with the index of each vertex in the collection
+        """
+        vertices = np.asarray(vertices).reshape(-1, 3)
+        if len(vertices) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        self.__index_vertices()
+        is_integer = np.issubdtype(vertices.dtype, np.integer)
+        keys = self.__to_keys(vertices)
+
+        unique_keys, first, inverse = self.__unique_rows(keys)
 
-        return self.get_index(vertex)
+        is_empty = self.__size == 0
+        if is_empty:
+            # all the vertices are new: no need to look them up. The dict is built when needed - see self.__index_vertices()
+            unique_indexes = np.arange(len(unique_keys), dtype=np.int64)
+            new_rows = unique_indexes
+        else:
+            unique_indexes = np.empty(len(unique_keys), dtype=np.int64)
+            new_rows = []
+            new_keys = []
+            for i, key in enumerate(map(tuple, unique_keys.tolist())):
+                index = self.__vertices_dict.get(key)
+                if index is None:
+                    index = self.__size + len(new_rows)
+                    new_keys.append(key)
+                    new_rows.append(i)
+                unique_indexes[i] = index
+
+        if len(new_rows) > 0:
+            self.__reserve(len(new_rows), is_integer)
+            new_vertices = vertices[first[new_rows]] if self.__is_integer() else unique_keys[new_rows] / self.__factor
+            self.__vertices[self.__size : self.__size + len(new_rows)] = new_vertices
+            if not is_empty:
+                # the new keys are only indexed once the vertices are added: the dict is unchanged if the array can't grow
+                self.__vertices_dict.update(zip(new_keys, range(self.__size, self.__size + len(new_rows))))
+                self.__indexed_size = self.__size + len(new_rows)
+            self.__size += len(new_rows)
+
+        return unique_indexes[inverse] + self.start_index
 
     def get_axis(self, axis: int) -> list[float]:
         """
         :param axis: Axis to get the values of (0=x, 1=y, 2=z)
         """
-        v = np.array(self.__vertices)
-        return v[:, axis].tolist()
+        return self.toarray()[:, axis].tolist()
 
     def tolist(self) -> list[Vertex]:
         """
         :return: List of vertices
         """
-        return copy(self.__vertices)
+        return self.toarray().tolist()
 
-    @staticmethod
-    def __vertex_to_string(vertex: Vertex) -> str:
+    def toarray(self) -> np.ndarray:
         """
-        Used to store the vertices in a dictionary for performance reasons
-        :param vertex: Vertex to convert to a string in the format 'x y z'
+        :return: read-only view of the vertices as an array of shape (N, 3)
+        """
+        vertices = self.__vertices[: self.__size]
+        vertices.flags.writeable = False
+        return vertices
+
+    def __is_integer(self) -> bool:
+        """
+        :return: True if the vertices are stored as integers
+        """
+        return np.issubdtype(self.__vertices.dtype, np.integer)
+
+    def __reserve(self, count: int, is_integer: bool) -> None:
+        """
+        Grows the array to fit count new vertices. The capacity is doubled to amortize the reallocations.
+        The array is converted to float64 if a non integer vertex is added.
+        :param count: number of vertices to add
+        :param is_integer: True if the new vertices are integers
+        """
+        if self.__mmap_mode == 'r':
+            raise ValueError("The vertices are memory-mapped read-only: no vertex can be added. Use mmap_mode='c' to add vertices")
+        dtype = np.int64 if is_integer and (self.__is_integer() or self.__size == 0) else np.float64
+        capacity = len(self.__vertices)
+        if self.__size + count <= capacity and dtype == self.__vertices.dtype:
+            return
+        if self.__size + count > capacity:
+            capacity = max(2 * capacity, self.__size + count, 16)
+        vertices = np.empty((capacity, 3), dtype=dtype)
+        vertices[: self.__size] = self.__vertices[: self.__size]
+        self.__vertices = vertices
+        self.__mmap_mode = None  # the vertices are copied in memory
+
+    def __index_vertices(self) -> None:
+        """
+        Adds the vertices that are not in the dict yet (given by from_array()) to the dict
+        The first occurrence is kept if a vertex is in the array multiple times
+        """
+        if self.__indexed_size == self.__size:
+            return
+        keys = self.__to_keys(self.__vertices[self.__indexed_size : self.__size])
+        for index, key in enumerate(map(tuple, keys.tolist()), self.__indexed_size):
+            self.__vertices_dict.setdefault(key, index)
+        self.__indexed_size = self.__size
+
+    def __to_keys(self, vertices: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of self.__vertex_to_key()
+        np.rint() rounds the half-way values of the scaled coordinates to even (0.0025 -> 2 with 3 decimals) where
+        round(coord, precision) rounds the exact decimal value of the coordinate (0.0025 -> 3): these ones are rounded with round()
+        :param vertices: array of shape (N, 3)
+        :return: int64 array of shape (N, 3) of the integer coordinates on the precision grid
         """
-        return f'{vertex[0]} {vertex[1]} {vertex[2]}'
+        if np.issubdtype(vertices.dtype, np.integer):
+            return vertices.astype(np.int64) * self.__factor
+        scaled = vertices * self.__factor
+        keys = np.rint(scaled)
+        half_way = np.abs(np.abs(scaled - keys) - 0.5) < self.__half_way
+        if half_way.any():
+            precision, factor = self.__precision, self.__factor
+            keys[half_way] = [round(round(coord, precision) * factor) for coord in vertices[half_way].tolist()]
+        return keys.astype(np.int64)
 
     @staticmethod
-    def __string_to_vertice(string: str) -> Vertex:
+    def __unique_rows(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Same as np.unique(keys, axis=0) with the unique rows sorted by their first occurrence
+        Uses a lexsort which is much faster than np.unique with an axis
+        :param keys: integer array of shape (N, 3) with N > 0
+        :return: the unique rows, the index of their first occurrence in keys and the index in the unique rows of each row of keys
         """
-        Reverses the __vertex_to_string method
-        :param string: String in the format 'x y z'
+        order = np.lexsort((keys[:, 2], keys[:, 1], keys[:, 0]))
+        sorted_keys = keys[order]
+        starts = np.empty(len(keys), dtype=bool)
+        starts[0] = True
+        np.any(sorted_keys[1:] != sorted_keys[:-1], axis=1, out=starts[1:])
+        groups = np.cumsum(starts) - 1
+
+        # the sort is stable: the first row of each group is its first occurrence
+        first = order[starts]
+        rank = np.argsort(first, kind='stable')
+        unique_order = np.empty_like(rank)
+        unique_order[rank] = np.arange(len(rank))
+        inverse = np.empty(len(keys), dtype=np.int64)
+        inverse[order] = unique_order[groups]
+
+        first = first[rank]
+        return keys[first], first, inverse
+
+    def __vertex_to_key(self, vertex: Vertex) -> tuple[int, int, int]:
+        """
+        Used to store the vertices in a dictionary for performance reasons
+        The coordinates are rounded as with round(coord, precision) - see self.__to_keys()
+        :param vertex: Vertex to convert to its integer coordinates on the precision grid
         """
-        return [float(x) for x in string.split(' ')]
+        factor = self.__factor
+        key = (round(vertex[0] * factor), round(vertex[1] * factor), round(vertex[2] * factor))
+        for axis in range(3):
+            if abs(abs(vertex[axis] * factor - key[axis]) - 0.5) < self.__half_way:
+                return tuple(round(round(coord, self.__precision) * factor) for coord in vertex)
+        return key
@@ -0,0 +1,116 @@
+import errno
+import json
+import os
+
+import pytest
+
+from pycityjson import io
+from pycityjson.io.cache import ParseCache
+from pycityjson.io.snapshot import SnapshotSerializer
+
+
+class TestCacheIntegration:
+    cityjson = {
+        'type': 'CityJSON',
+        'version': '2.0',
+        'transform': {'scale': [0.001, 0.001, 0.001], 'translate': [0.0, 0.0, 0.0]},
+        'CityObjects': {
+            'building-1': {
+                'type': 'Building',
+                'attributes': {'height': 3},
+                'geometry': [{'type': 'MultiSurface', 'lod': '1', 'boundaries': [[[0, 1, 2]]]}],
+            },
+            'tree-1': {
+                'type': 'SolitaryVegetationObject',
+                'geometry': [{'type': 'MultiPoint', 'lod': '1', 'boundaries': [3]}],
+            },
+        },
+        'vertices': [[0, 0, 0], [1000, 0, 0], [1000, 1000, 0], [5000, 5000, 0]],
+    }
+
+    def test_parse_cache(self, file_manager):
+        """
+        Test that an unchanged file is loaded from the cache, that a modified file is parsed again and that the old entries are evicted.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        other_file_path = file_manager.save_json(self.cityjson | {'metadata': {'title': 'other'}})
+        saved_file_path = file_manager.get_empty_file_path()
+        saved_cached_file_path = file_manager.get_empty_file_path()
+        cache_dir = file_manager.get_empty_file_path()
+
+        # Act
+        city = io.read_cityjson(file_path)
+        first_city = io.read_cityjson(file_path, cache_dir=cache_dir)
+        entries = sorted(os.listdir(cache_dir))
+        cached_city = io.read_cityjson(file_path, cache_dir=cache_dir, packed=True)
+        filtered_city = io.read_cityjson(file_path, cache_dir=cache_dir, types=['Building'])
+        io.read_cityjson(other_file_path, cache_dir=cache_dir)
+        entries_count = len(os.listdir(cache_dir))
+        with open(file_path, 'w') as json_file:
+            json.dump(self.cityjson | {'metadata': {'title': 'modified'}}, json_file)
+        modified_city = io.read_cityjson(file_path, cache_dir=cache_dir, cache_size=1)
+        io.write_as_cityjson(city, saved_file_path, semantic_uuids=False)
+        io.write_as_cityjson(first_city, saved_cached_file_path, semantic_uuids=False)
+
+        # Assert
+        assert open(saved_cached_file_path).read() == open(saved_file_path).read()
+        assert len(entries) == 2 and 'sources.json' in entries
+        assert [cityobject.uuid() for cityobject in cached_city.cityobjects] == ['building-1', 'tree-1']
+        assert [cityobject.uuid() for cityobject in filtered_city.cityobjects] == ['building-1']
+        assert entries_count == 5
+        assert modified_city.metadata == {'title': 'modified'}
+        assert len(os.listdir(cache_dir)) == 2
+        with open(os.path.join(cache_dir, 'sources.json')) as sources_file:
+            assert list(json.load(sources_file)) == [os.path.abspath(file_path)]
+
+    def test_cache_hit_and_miss(self, file_manager):
+        """
+        Test that a City loaded from the cache is written as the City parsed on a cache miss, with and without purging the vertices.
+        """
+        # Arrange
+        templates = {
+            'templates': [{'type': 'MultiSurface', 'lod': '2', 'boundaries': [[[2, 3, 0]]]}],
+            'vertices-templates': [[0.0, 1.0, 0.0], [9.0, 9.0, 9.0], [0.0, 0.0, 0.0], [1.0, 0.0, 0.0]],
+        }
+        instance = {'type': 'GeometryInstance', 'template': 0, 'boundaries': [3], 'transformationMatrix': [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]}
+        cityjson = self.cityjson | {'geometry-templates': templates}
+        cityjson['CityObjects'] = cityjson['CityObjects'] | {'tree-2': {'type': 'SolitaryVegetationObject', 'geometry': [instance]}}
+        file_path = file_manager.save_json(cityjson)
+        cache_dir = file_manager.get_empty_file_path()
+
+        # Act
+        results = {}
+        for purge_vertices in (True, False):
+            for name in ('miss', 'hit'):
+                if name == 'miss':
+                    ParseCache(cache_dir).clear()
+                city = io.read_cityjson(file_path, cache_dir=cache_dir)
+                saved_file_path = file_manager.get_empty_file_path()
+                io.write_as_cityjson(city, saved_file_path, purge_vertices=purge_vertices, semantic_uuids=False)
+                results[(name, purge_vertices)] = open(saved_file_path).read()
+
+        # Assert
+        assert results[('hit', True)] == results[('miss', True)]
+        assert results[('hit', False)] == results[('miss', False)]
+
+    def test_parse_cache_write_error(self, file_manager, monkeypatch):
+        """
+        Test that the parsed City is returned with a warning when the entry can't be written.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        cache_dir = file_manager.get_empty_file_path()
+
+        def save(serializer, directory):
+            raise OSError(errno.ENOSPC, 'No space left on device')
+
+        monkeypatch.setattr(SnapshotSerializer, 'save', save)
+
+        # Act
+        with pytest.warns(UserWarning):
+            city = io.read_cityjson(file_path, cache_dir=cache_dir)
+
+        # Assert
+        assert [cityobject.uuid() for cityobject in city.cityobjects] == ['building-1', 'tree-1']
+        assert os.listdir(cache_dir) == ['sources.json']
@@ -0,0 +1,154 @@
+import json
+
+from pycityjson import io, model
+
+
+class TestCityJSONSeqIntegration:
+    header = {
+        'type': 'CityJSON',
+        'version': '2.0',
+        'transform': {
+            'scale': [0.001, 0.001, 0.001],
+            'translate': [100.0, 200.0, 10.0],
+        },
+        'CityObjects': {},
+        'vertices': [],
+        'metadata': {'referenceSystem': 'https://www.opengis.net/def/crs/EPSG/0/2950'},
+    }
+
+    feature_1 = {
+        'type': 'CityJSONFeature',
+        'id': 'building-1',
+        'CityObjects': {
+            'building-1': {
+                'type': 'Building',
+                'attributes': {'height': 3},
+                'children': ['building-1-part'],
+            },
+            'building-1-part': {
+                'type': 'BuildingPart',
+                'parents': ['building-1'],
+                'geometry': [
+                    {
+                        'type': 'MultiSurface',
+                        'lod': '1',
+                        'boundaries': [[[0, 1, 2, 3]]],
+                        'semantics': {
+                            'surfaces': [{'type': 'RoofSurface'}],
+                            'values': [0],
+                        },
+                    },
+                ],
+            },
+        },
+        'vertices': [[0, 0, 3000], [1000, 0, 3000], [1000, 1000, 3000], [0, 1000, 3000]],
+    }
+
+    feature_2 = {
+        'type': 'CityJSONFeature',
+        'id': 'building-2',
+        'CityObjects': {
+            'building-2': {
+                'type': 'Building',
+                'geometry': [
+                    {
+                        'type': 'MultiSurface',
+                        'lod': '1',
+                        'boundaries': [[[2, 1, 0]]],
+                    },
+                ],
+            },
+        },
+        'vertices': [[5000, 5000, 0], [6000, 5000, 0], [6000, 6000, 0]],
+    }
+
+    def test_read_cityjsonseq(self, file_manager):
+        """
+        Test that each feature is parsed with its own vertices and its children linked.
+        """
+        # Arrange
+        file_path = file_manager.get_empty_file_path()
+        with open(file_path, 'w') as file:
+            for line in [self.header, self.feature_1, self.feature_2]:
+                file.write(json.dumps(line) + '\n')
+
+        # Act
+        cityobjects = list(io.read_cityjsonseq(file_path))
+
+        # Assert
+        assert [cityobject.uuid() for cityobject in cityobjects] == ['building-1', 'building-2']
+        assert cityobjects[0].get_attribute('height') == 3
+        assert [child.uuid() for child in cityobjects[0].children] == ['building-1-part']
+
+        part = cityobjects[0].children[0]
+        assert part.parents == [cityobjects[0]]
+        assert part.get_vertices(flatten=True) == [[100.0, 200.0, 13.0], [101.0, 200.0, 13.0], [101.0, 201.0, 13.0], [100.0, 201.0, 13.0]]
+        assert part.geometries[0].get_surfaces()[0].semantic['type'] == 'RoofSurface'
+        assert cityobjects[1].get_vertices(flatten=True) == [[106.0, 206.0, 10.0], [106.0, 205.0, 10.0], [105.0, 205.0, 10.0]]
+
+    def test_write_cityjsonseq(self, file_manager):
+        """
+        Test that each top-level CityObject is written as one feature with its children and its own vertices.
+        """
+        # Arrange
+        cityjson = dict(self.header)
+        cityjson['CityObjects'] = {**self.feature_1['CityObjects'], **self.feature_2['CityObjects']}
+        cityjson['vertices'] = self.feature_1['vertices'] + self.feature_2['vertices']
+        cityjson['CityObjects']['building-2'] = {
+            'type': 'Building',
+            'geometry': [{'type': 'MultiSurface', 'lod': '1', 'boundaries': [[[6, 5, 4]]]}],
+        }
+        file_path = file_manager.save_json(cityjson)
+        saved_file_path = file_manager.get_empty_file_path()
+        saved_stdlib_file_path = file_manager.get_empty_file_path()
+
+        # Act
+        city = io.read_cityjson(file_path)
+        io.write_as_cityjsonseq(city, saved_file_path)
+        io.write_as_cityjsonseq(city, saved_stdlib_file_path, json_backend='json')
+
+        # Assert
+        with open(saved_file_path) as file:
+            lines = [json.loads(line) for line in file]
+        with open(saved_stdlib_file_path) as file:
+            assert [json.loads(line) for line in file] == lines
+        assert len(lines) == 3
+        assert lines[0]['CityObjects'] == {}
+        assert lines[0]['transform'] == self.header['transform']
+        assert [line['id'] for line in lines[1:]] == ['building-1', 'building-2']
+        assert list(lines[1]['CityObjects'].keys()) == ['building-1', 'building-1-part']
+        assert lines[1]['vertices'] == self.feature_1['vertices']
+        assert lines[2]['vertices'] == self.feature_2['vertices'][::-1]
+        assert lines[2]['CityObjects']['building-2']['geometry'][0]['boundaries'] == [[[0, 1, 2]]]
+
+        cityobjects = list(io.read_cityjsonseq(saved_file_path, json_backend='json'))
+        assert [child.uuid() for child in cityobjects[0].children] == ['building-1-part']
+        assert cityobjects[1].get_vertices(flatten=True) == city['building-2'].get_vertices(flatten=True)
+
+    def test_write_cityjsonseq_templates(self, file_manager):
+        """
+        Test that the templates of the GeometryInstance are written in the header without being added to the City.
+        """
+        # Arrange
+        cityjson = dict(self.header)
+        cityjson['CityObjects'] = dict(self.feature_2['CityObjects'])
+        cityjson['vertices'] = self.feature_2['vertices']
+        file_path = file_manager.save_json(cityjson)
+        saved_file_path = file_manager.get_empty_file_path()
+        saved_lazy_file_path = file_manager.get_empty_file_path()
+        city = io.read_cityjson(file_path)
+        template = city['building-2'].geometries[0].duplicate()
+        city['building-2'].geometries.append(model.GeometryInstance(template, model.TransformationMatrix().translate([1.0, 0.0, 0.0])))
+        lazy_city = io.read_cityjson(file_path, geometry='lazy')
+
+        # Act
+        io.write_as_cityjsonseq(city, saved_file_path)
+        io.write_as_cityjsonseq(lazy_city, saved_lazy_file_path)
+
+        # Assert
+        with open(saved_file_path) as file:
+            lines = [json.loads(line) for line in file]
+        assert city.geometry_templates.is_empty()
+        assert len(lines[0]['geometry-templates']['templates']) == 1
+        assert lines[1]['CityObjects']['building-2']['geometry'][1]['template'] == 0
+        assert lazy_city['building-2'].get_geometries_loader() is not None
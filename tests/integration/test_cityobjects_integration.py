@@ -0,0 +1,41 @@
+import pytest
+
+from pycityjson import io
+
+
+class TestCityObjectsIntegration:
+    cityjson = {
+        'type': 'CityJSON',
+        'version': '2.0',
+        'transform': {'scale': [0.001, 0.001, 0.001], 'translate': [0.0, 0.0, 0.0]},
+        'CityObjects': {
+            'a': {'type': 'Building'},
+            'b': {'type': 'Building'},
+            'c': {'type': 'Building'},
+        },
+        'vertices': [],
+    }
+
+    def test_rename_and_remove(self, file_manager):
+        """
+        Test that a CityObject can't be renamed with the uuid of another one and that the removals keep the order of the CityObjects.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        city = io.read_cityjson(file_path)
+        cityobject = city['a']
+
+        # Act
+        with pytest.raises(ValueError):
+            cityobject.set_attribute('uuid', 'b')
+        uuids = [cityobject.uuid() for cityobject in city.cityobjects]
+        cityobject.set_attribute('uuid', 'd')
+        city.cityobjects.remove_cityobject('b')
+
+        # Assert
+        assert uuids == ['a', 'b', 'c']
+        assert cityobject.get_attribute('uuid') == 'd'
+        assert [cityobject.uuid() for cityobject in city.cityobjects] == ['d', 'c']
+        assert city['d'] is cityobject and city['a'] is None and city['b'] is None
+        assert city.cityobjects[1] is city['c']
+        assert len(city.cityobjects) == 2
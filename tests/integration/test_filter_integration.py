@@ -0,0 +1,130 @@
+import json
+
+from pycityjson import io
+
+
+class TestFilterIntegration:
+    cityjson = {
+        'type': 'CityJSON',
+        'version': '2.0',
+        'transform': {'scale': [0.001, 0.001, 0.001], 'translate': [0.0, 0.0, 0.0]},
+        'CityObjects': {
+            'building-1': {
+                'type': 'Building',
+                'attributes': {'height': 3},
+                'children': ['building-1-part'],
+                'geometry': [{'type': 'MultiSurface', 'lod': '1', 'boundaries': [[[0, 1, 2]]]}],
+            },
+            'building-1-part': {
+                'type': 'BuildingPart',
+                'parents': ['building-1'],
+                'geometry': [
+                    {'type': 'MultiSurface', 'lod': '1', 'boundaries': [[[3, 4, 5]]]},
+                    {'type': 'MultiSurface', 'lod': '2', 'boundaries': [[[6, 7, 8]]]},
+                ],
+            },
+            'tree-1': {
+                'type': 'SolitaryVegetationObject',
+                'attributes': {'height': 10},
+                'geometry': [{'type': 'MultiPoint', 'lod': '1', 'boundaries': [9]}],
+            },
+        },
+        'vertices': [[i * 1000, 0, 0] for i in range(10)],
+    }
+
+    def test_filter_by_type(self, file_manager):
+        """
+        Test that only the selected CityObjects and their vertices are kept.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+
+        # Act
+        city = io.read_cityjson(file_path, types=['Building'])
+        related_city = io.read_cityjson(file_path, types=['Building'], include_related=True, lods=['1'])
+        predicate_city = io.read_cityjson(file_path, predicate=lambda attributes: attributes.get('height', 0) > 5)
+
+        # Assert
+        assert [cityobject.uuid() for cityobject in city.cityobjects] == ['building-1']
+        assert city['building-1'].children == []
+        assert city.vertices.tolist() == [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.0, 0.0]]
+
+        assert [cityobject.uuid() for cityobject in related_city.cityobjects] == ['building-1', 'building-1-part']
+        assert related_city['building-1'].children == [related_city['building-1-part']]
+        assert [geometry.lod for geometry in related_city['building-1-part'].geometries] == ['1']
+        assert len(related_city.vertices) == 6
+
+        assert [cityobject.uuid() for cityobject in predicate_city.cityobjects] == ['tree-1']
+
+    def test_include_related_excludes_siblings(self, file_manager):
+        """
+        Test that selecting a part with its related CityObjects keeps its parent but not the other parts of the parent.
+        """
+        # Arrange
+        cityobjects = self.cityjson['CityObjects']
+        building = cityobjects['building-1'] | {'children': ['building-1-part', 'building-1-part-2']}
+        sibling = {'type': 'BuildingPart', 'parents': ['building-1'], 'geometry': []}
+        file_path = file_manager.save_json(self.cityjson | {'CityObjects': cityobjects | {'building-1': building, 'building-1-part-2': sibling}})
+
+        # Act
+        city = io.read_cityjson(file_path, uuids=['building-1-part'], include_related=True)
+        parent_city = io.read_cityjson(file_path, uuids=['building-1'], include_related=True)
+
+        # Assert
+        assert [cityobject.uuid() for cityobject in city.cityobjects] == ['building-1', 'building-1-part']
+        assert [cityobject.uuid() for cityobject in parent_city.cityobjects] == ['building-1', 'building-1-part', 'building-1-part-2']
+
+    def test_lazy_geometry(self, file_manager):
+        """
+        Test that the lazy geometries are only parsed on first access and are written from the raw data as the parsed ones.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        saved_file_path = file_manager.get_empty_file_path()
+        saved_lazy_file_path = file_manager.get_empty_file_path()
+
+        # Act
+        city = io.read_cityjson(file_path)
+        lazy_city = io.read_cityjson(file_path, geometry='lazy')
+        skip_city = io.read_cityjson(file_path, geometry='skip')
+        is_loaded = lazy_city['building-1'].get_geometries_loader() is None
+        io.write_as_cityjson(city, saved_file_path)
+        io.write_as_cityjson(lazy_city, saved_lazy_file_path)
+
+        # Assert
+        assert not is_loaded
+        assert lazy_city['building-1'].get_geometries_loader() is not None
+        assert open(saved_lazy_file_path).read() == open(saved_file_path).read()
+        assert len(lazy_city['building-1'].geometries) == 1
+        assert lazy_city['building-1'].get_geometries_loader() is None
+        assert skip_city['building-1'].geometries == []
+        assert skip_city['building-1'].children == [skip_city['building-1-part']]
+
+    def test_lazy_semantic_uuids(self, file_manager):
+        """
+        Test that the lazy geometries are written with a uuid for each semantic surface, kept when they are written again or parsed.
+        """
+        # Arrange
+        cityjson = self.cityjson | {'CityObjects': dict(self.cityjson['CityObjects'])}
+        semantics = {'surfaces': [{'type': 'RoofSurface'}, {'type': 'WallSurface', 'uuid': 'wall'}], 'values': [0, 1]}
+        geometry = {'type': 'MultiSurface', 'lod': '2', 'boundaries': [[[0, 1, 2]], [[3, 4, 5]]], 'semantics': semantics}
+        cityjson['CityObjects']['building-2'] = {'type': 'Building', 'geometry': [geometry]}
+        file_path = file_manager.save_json(cityjson)
+        saved_file_path = file_manager.get_empty_file_path()
+        saved_again_file_path = file_manager.get_empty_file_path()
+        saved_without_uuids_file_path = file_manager.get_empty_file_path()
+
+        # Act
+        lazy_city = io.read_cityjson(file_path, geometry='lazy')
+        io.write_as_cityjson(lazy_city, saved_without_uuids_file_path, semantic_uuids=False)
+        io.write_as_cityjson(lazy_city, saved_file_path)
+        io.write_as_cityjson(lazy_city, saved_again_file_path)
+        surfaces = lazy_city['building-2'].geometries[0].primitive.get_surfaces()
+
+        # Assert
+        without_uuids = json.load(open(saved_without_uuids_file_path))['CityObjects']['building-2']['geometry'][0]['semantics']['surfaces']
+        written = json.load(open(saved_file_path))['CityObjects']['building-2']['geometry'][0]['semantics']['surfaces']
+        assert without_uuids == semantics['surfaces'] == [{'type': 'RoofSurface'}, {'type': 'WallSurface', 'uuid': 'wall'}]
+        assert all('uuid' in surface for surface in written) and written[1]['uuid'] == 'wall'
+        assert open(saved_again_file_path).read() == open(saved_file_path).read()
+        assert [surface.semantic['uuid'] for surface in surfaces] == [surface['uuid'] for surface in written]
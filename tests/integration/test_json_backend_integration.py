@@ -0,0 +1,44 @@
+import json
+
+from pycityjson import io
+from pycityjson.io.json_backend import JSON_BACKENDS
+
+
+class TestJsonBackendIntegration:
+    cityjson = {
+        'type': 'CityJSON',
+        'version': '2.0',
+        'transform': {'scale': [0.001, 0.001, 0.001], 'translate': [0.0, 0.0, 0.0]},
+        'CityObjects': {
+            'building-1': {
+                'type': 'Building',
+                'attributes': {'name': 'Gebäude', 'height': 3.5, 'floors': [0, 1]},
+                'geometry': [{'type': 'MultiSurface', 'lod': '1', 'boundaries': [[[0, 1, 2]]]}],
+            },
+        },
+        'vertices': [[0, 0, 0], [1000, 0, 0], [1000, 1000, 0]],
+    }
+
+    def test_json_backends(self, file_manager):
+        """
+        Test that all the installed JSON backends read and write the same CityJSON, including attributes with keys that are not str.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        backends = [name for name, backend in JSON_BACKENDS.items() if backend.is_available()]
+
+        # Act
+        results = {}
+        for name in backends:
+            city = io.read_cityjson(file_path, json_backend=name)
+            city['building-1'].set_attribute('rooms', {1: 'kitchen', 2: 'bedroom'})
+            saved_file_path = file_manager.get_empty_file_path()
+            io.write_as_cityjson(city, saved_file_path, semantic_uuids=False, json_backend=name)
+            with open(saved_file_path, encoding='utf-8') as saved_file:
+                results[name] = json.load(saved_file)
+
+        # Assert
+        assert 'json' in backends
+        assert results['json']['CityObjects']['building-1']['attributes']['rooms'] == {'1': 'kitchen', '2': 'bedroom'}
+        for name in backends:
+            assert results[name] == results['json'], name
@@ -831,3 +831,35 @@ class TestJsonIntegration:
 
         assert primitive_geometry['boundaries'] == cube_2_faces
         assert instance_geometry['boundaries'] == [i_10_0_10]
+
+    def test_purge_half_way_vertices(self, file_manager):
+        """
+        Test that the vertices half-way between two values of the precision grid are rounded as with round(coord, precision).
+        """
+        # Arrange
+        cityjson = {
+            'type': 'CityJSON',
+            'version': '2.0',
+            'transform': {'scale': [0.001, 0.001, 0.001], 'translate': [0.0, 0.0, 0.0]},
+            'CityObjects': {'id-1': {'type': 'GenericCityObject', 'geometry': [{'type': 'MultiPoint', 'lod': '1', 'boundaries': [0]}]}},
+            'vertices': [[0, 0, 0]],
+        }
+        file_path = file_manager.save_json(cityjson)
+        heights = [0.0015, 0.0025, -0.0025, 1.0005]
+        expected = [[0, 0, 0]] + [[0, 0, round(round(z, 3) * 1000)] for z in heights]
+
+        # Act
+        results = {}
+        for purge_vertices in (True, False):
+            city = io.read_cityjson(file_path)
+            for z in heights:
+                city['id-1'].geometries[0].primitive.add_child(model.Point(0.0, 0.0, z))
+            saved_file_path = file_manager.get_empty_file_path()
+            io.write_as_cityjson(city, saved_file_path, purge_vertices=purge_vertices)
+            results[purge_vertices] = json.load(open(saved_file_path))
+
+        # Assert
+        assert expected == [[0, 0, 0], [0, 0, 2], [0, 0, 3], [0, 0, -3], [0, 0, 1000]]
+        for result in results.values():
+            assert result['vertices'] == expected
+            assert result['CityObjects']['id-1']['geometry'][0]['boundaries'] == [0, 1, 2, 3, 4]
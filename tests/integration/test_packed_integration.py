@@ -0,0 +1,180 @@
+import json
+
+import pytest
+
+from pycityjson import io, model
+
+
+class TestPackedIntegration:
+    cube = [[[0, 3, 2, 1], [8, 9, 10]], [[4, 5, 6, 7]], [[0, 1, 5, 4]], [[1, 2, 6, 5]], [[2, 3, 7, 6]], [[3, 0, 4, 7]]]
+    cityjson = {
+        'type': 'CityJSON',
+        'version': '2.0',
+        'transform': {'scale': [0.001, 0.001, 0.001], 'translate': [100.0, 200.0, 10.0]},
+        'CityObjects': {
+            'id-1': {
+                'type': 'Building',
+                'geometry': [
+                    {
+                        'type': 'MultiSolid',
+                        'lod': '2',
+                        'boundaries': [[cube], [cube]],
+                        'semantics': {
+                            'surfaces': [
+                                {'type': 'GroundSurface', 'uuid': 'ground'},
+                                {'type': 'RoofSurface', 'uuid': 'roof'},
+                                {'type': 'WallSurface', 'uuid': 'wall'},
+                            ],
+                            'values': [[[0, 1, 2, 2, 2, 2]], [[0, 1, 2, 2, 2, 2]]],
+                        },
+                    },
+                    {'type': 'MultiLineString', 'lod': '0', 'boundaries': [[0, 1, 2], [3, 4]]},
+                ],
+            },
+        },
+        'vertices': [
+            [0, 0, 0],
+            [1000, 0, 0],
+            [1000, 1000, 0],
+            [0, 1000, 0],
+            [0, 0, 1000],
+            [1000, 0, 1000],
+            [1000, 1000, 1000],
+            [0, 1000, 1000],
+            [200, 200, 0],
+            [400, 200, 0],
+            [400, 400, 0],
+        ],
+    }
+
+    def test_packed_is_written_as_primitive(self, file_manager):
+        """
+        Test that a city parsed as PackedPrimitive is written exactly as the same city parsed as Primitive trees.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        saved_file_path = file_manager.get_empty_file_path()
+        saved_packed_file_path = file_manager.get_empty_file_path()
+
+        # Act
+        city = io.read_cityjson(file_path)
+        packed_city = io.read_cityjson(file_path, packed=True)
+        io.write_as_cityjson(city, saved_file_path)
+        io.write_as_cityjson(packed_city, saved_packed_file_path)
+
+        # Assert
+        primitive = packed_city['id-1'].geometries[0].primitive
+        assert isinstance(primitive, model.PackedPrimitive)
+        assert primitive.surface_count() == 12
+        assert len(primitive.vertices) == 11
+
+        result = json.load(open(saved_file_path))
+        packed_result = json.load(open(saved_packed_file_path))
+        assert packed_result == result
+        assert packed_result['CityObjects']['id-1']['geometry'][0]['semantics']['values'] == [[[0, 1, 2, 2, 2, 2]], [[0, 1, 2, 2, 2, 2]]]
+
+    def test_pack_unpack(self, file_manager):
+        """
+        Test that packing and unpacking a Primitive tree keeps its vertices, semantics and structure and that the holes are removed as in the tree.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        city = io.read_cityjson(file_path)
+        primitive = city['id-1'].geometries[0].primitive
+
+        # Act
+        packed = model.PackedPrimitive.pack(primitive)
+        unpacked = packed.unpack()
+        packed_without_holes = packed.copy()
+        packed_without_holes.remove_interior_holes()
+        primitive_without_holes = packed.unpack()
+        primitive_without_holes.remove_interior_holes()
+
+        # Assert
+        assert repr(unpacked) == repr(primitive)
+        assert packed.get_vertices() == primitive.get_vertices()
+        assert packed.get_min_max() == primitive.get_min_max()
+        assert packed_without_holes.get_vertices() == primitive_without_holes.get_vertices()
+        with pytest.raises(TypeError):
+            packed.add_child(model.Point(0.0, 0.0, 0.0))
+
+    def test_packed_content_hash(self, file_manager):
+        """
+        Test that a geometry has the same content hash as a PackedPrimitive and as a Primitive tree.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        geometry = io.read_cityjson(file_path)['id-1'].geometries[0]
+        packed_geometry = io.read_cityjson(file_path, packed=True)['id-1'].geometries[0]
+        content_hash = geometry.content_hash()
+
+        # Act
+        geometry.transform(model.TransformationMatrix().translate([1.0, 0.0, 0.0]))
+
+        # Assert
+        assert content_hash == packed_geometry.content_hash()
+        assert geometry.content_hash() != content_hash
+        assert geometry != packed_geometry
+
+    def test_template_index_after_transform(self, file_manager):
+        """
+        Test that a template modified after being indexed is found by its new content and not by its old one.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        city = io.read_cityjson(file_path)
+        old_geometry = io.read_cityjson(file_path)['id-1'].geometries[0]
+        new_geometry = io.read_cityjson(file_path)['id-1'].geometries[0]
+        new_geometry.transform(model.TransformationMatrix().translate([1.0, 0.0, 0.0]))
+        template = city['id-1'].geometries[0]
+        city.geometry_templates.add_template(template)
+
+        # Act
+        template.transform(model.TransformationMatrix().translate([1.0, 0.0, 0.0]))
+        old_index = city.geometry_templates.get_index(old_geometry)
+        new_index = city.geometry_templates.add_template(new_geometry)
+
+        # Assert
+        assert old_index is None
+        assert new_index == 0
+        assert len(city.geometry_templates.geometries) == 1
+
+    def test_template_index_after_add_child(self, file_manager):
+        """
+        Test that a template modified in place through its primitive is no longer equal to its old content.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        city = io.read_cityjson(file_path)
+        old_geometry = io.read_cityjson(file_path)['id-1'].geometries[1]
+        template = city['id-1'].geometries[1]
+        city.geometry_templates.add_template(template)
+        version = template.version
+
+        # Act
+        template.primitive.children[0].add_child(model.Point(101.0, 201.0, 11.0))
+        old_index = city.geometry_templates.add_template(old_geometry)
+
+        # Assert
+        assert template.version != version
+        assert template != old_geometry
+        assert old_index == 1
+        assert len(city.geometry_templates.geometries) == 2
+
+    def test_packed_null_semantic_values(self, file_manager):
+        """
+        Test that a null semantic value of a solid or of a shell is parsed as a surface without semantic for each of its surfaces.
+        """
+        # Arrange
+        cityjson = json.loads(json.dumps(self.cityjson))
+        cityjson['CityObjects']['id-1']['geometry'][0]['boundaries'] = [[self.cube], [self.cube, self.cube]]
+        cityjson['CityObjects']['id-1']['geometry'][0]['semantics']['values'] = [None, [None, [0, 1, None, 2, 2, 2]]]
+        file_path = file_manager.save_json(cityjson)
+
+        # Act
+        geometry = io.read_cityjson(file_path)['id-1'].geometries[0]
+        packed_geometry = io.read_cityjson(file_path, packed=True)['id-1'].geometries[0]
+
+        # Assert
+        assert packed_geometry.primitive.semantic_values.tolist() == [-1] * 12 + [0, 1, -1, 2, 2, 2]
+        assert packed_geometry == geometry
@@ -0,0 +1,84 @@
+import json
+
+from pycityjson import io
+
+
+class TestParallelIntegration:
+    cityjson = {
+        'type': 'CityJSON',
+        'version': '2.0',
+        'transform': {'scale': [0.001, 0.001, 0.001], 'translate': [100.0, 200.0, 10.0]},
+        'appearance': {'materials': [{'name': 'red'}, {'name': 'blue'}]},
+        'geometry-templates': {
+            'templates': [{'type': 'MultiSurface', 'lod': '2', 'boundaries': [[[0, 1, 2]]]}],
+            'vertices-templates': [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]],
+        },
+        'CityObjects': {
+            f'building-{i}': {
+                'type': 'Building',
+                'attributes': {'index': i},
+                'children': [f'building-{i}-part'],
+                'geometry': [
+                    {
+                        'type': 'MultiSurface',
+                        'lod': '1',
+                        'boundaries': [[[0, 1, 2, 3]]],
+                        'semantics': {'surfaces': [{'type': 'RoofSurface'}], 'values': [0]},
+                        'material': {'visual': {'values': [i % 2]}},
+                    },
+                ],
+            }
+            for i in range(4)
+        }
+        | {
+            f'building-{i}-part': {
+                'type': 'BuildingPart',
+                'parents': [f'building-{i}'],
+                'geometry': [{'type': 'GeometryInstance', 'template': 0, 'boundaries': [4], 'transformationMatrix': [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]}],
+            }
+            for i in range(4)
+        },
+        'vertices': [[0, 0, 0], [1000, 0, 0], [1000, 1000, 0], [0, 1000, 0], [5000, 5000, 0]],
+    }
+
+    def test_parallel_read(self, file_manager):
+        """
+        Test that the CityObjects parsed by several processes are the same as the ones parsed in one process.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        saved_file_path = file_manager.get_empty_file_path()
+        saved_parallel_file_path = file_manager.get_empty_file_path()
+
+        # Act
+        city = io.read_cityjson(file_path)
+        parallel_city = io.read_cityjson(file_path, workers=2)
+        io.write_as_cityjson(city, saved_file_path, semantic_uuids=False)
+        io.write_as_cityjson(parallel_city, saved_parallel_file_path, semantic_uuids=False)
+
+        # Assert
+        assert [cityobject.uuid() for cityobject in parallel_city.cityobjects] == [cityobject.uuid() for cityobject in city.cityobjects]
+        assert parallel_city['building-1'].children == [parallel_city['building-1-part']]
+        assert parallel_city['building-1-part'].parents == [parallel_city['building-1']]
+        assert parallel_city['building-1'].geometries[0].get_surfaces()[0].get_material('visual') is parallel_city.materials['blue']
+        assert parallel_city['building-1-part'].geometries[0].geometry is parallel_city.geometry_templates[0]
+        assert json.load(open(saved_parallel_file_path)) == json.load(open(saved_file_path))
+
+    def test_parallel_write(self, file_manager):
+        """
+        Test that the CityObjects serialized by several processes are written as the ones serialized in one process.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        saved_file_path = file_manager.get_empty_file_path()
+        saved_parallel_file_path = file_manager.get_empty_file_path()
+        city = io.read_cityjson(file_path)
+        parallel_city = io.read_cityjson(file_path, packed=True)
+
+        # Act
+        io.write_as_cityjson(city, saved_file_path, semantic_uuids=False)
+        io.write_as_cityjson(parallel_city, saved_parallel_file_path, semantic_uuids=False, workers=2)
+
+        # Assert
+        assert open(saved_parallel_file_path).read() == open(saved_file_path).read()
+        assert len(parallel_city.vertices) == len(city.vertices)
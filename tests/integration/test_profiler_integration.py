@@ -0,0 +1,49 @@
+from pycityjson import io
+
+
+class TestProfilerIntegration:
+    cityjson = {
+        'type': 'CityJSON',
+        'version': '2.0',
+        'transform': {'scale': [0.001, 0.001, 0.001], 'translate': [0.0, 0.0, 0.0]},
+        'CityObjects': {
+            'building-1': {
+                'type': 'Building',
+                'children': ['building-1-part'],
+                'geometry': [{'type': 'MultiSurface', 'lod': '1', 'boundaries': [[[0, 1, 2]]]}],
+            },
+            'building-1-part': {
+                'type': 'BuildingPart',
+                'parents': ['building-1'],
+                'geometry': [{'type': 'MultiSurface', 'lod': '1', 'boundaries': [[[1, 2, 3]]]}],
+            },
+        },
+        'vertices': [[0, 0, 0], [1000, 0, 0], [1000, 1000, 0], [0, 1000, 0]],
+    }
+
+    def test_profiler(self, file_manager):
+        """
+        Test that the stages of the reading and of the writing are recorded in order with their counts.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        saved_file_path = file_manager.get_empty_file_path()
+        profiler = io.Profiler(trace_memory=True)
+
+        # Act
+        city = io.read_cityjson(file_path, profiler=profiler)
+        io.write_as_cityjson(city, saved_file_path, profiler=profiler)
+        io.write_as_cityjson(city, saved_file_path, profiler=io.NullProfiler())
+        stages = profiler.to_dict()['stages']
+        trace = profiler.to_chrome_trace()
+
+        # Assert
+        names = [stage['name'] for stage in stages]
+        assert names[:3] == ['read_json', 'CityParser.parse', 'VerticesParser.parse']
+        assert names.count('CitySerializer.serialize') == 1
+        assert stages[names.index('CityObjectsParser.parse:cityobjects')]['counts'] == {'cityobjects': 2, 'workers': 1}
+        assert stages[names.index('CityObjectsParser.parse:link_hierarchy')]['depth'] == 1
+        assert stages[names.index('VerticesPurger.purge')]['counts'] == {'vertices': 4}
+        assert all(stage['seconds'] >= 0 and 'allocated_bytes' in stage for stage in stages)
+        assert [event['name'] for event in trace['traceEvents']] == names
+        assert all(event['ph'] == 'X' for event in trace['traceEvents'])
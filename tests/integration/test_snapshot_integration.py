@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+
+from pycityjson import io
+
+
+class TestSnapshotIntegration:
+    cityjson = {
+        'type': 'CityJSON',
+        'version': '2.0',
+        'transform': {'scale': [0.001, 0.001, 0.001], 'translate': [100.0, 200.0, 10.0]},
+        'metadata': {'title': 'snapshot'},
+        'appearance': {'materials': [{'name': 'red', 'diffuseColor': [1.0, 0.0, 0.0]}, {'name': 'blue'}]},
+        'geometry-templates': {
+            'templates': [{'type': 'MultiSurface', 'lod': '2', 'boundaries': [[[0, 1, 2]]]}],
+            'vertices-templates': [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]],
+        },
+        'CityObjects': {
+            'building-1': {
+                'type': 'Building',
+                'attributes': {'height': 3.5},
+                'children': ['building-1-part'],
+                'geometry': [
+                    {
+                        'type': 'Solid',
+                        'lod': '2',
+                        'boundaries': [[[[0, 3, 2, 1]], [[4, 5, 6, 7]], [[0, 1, 5, 4]], [[1, 2, 6, 5]], [[2, 3, 7, 6]], [[3, 0, 4, 7]]]],
+                        'semantics': {'surfaces': [{'type': 'GroundSurface'}, {'type': 'RoofSurface'}, {'type': 'WallSurface'}], 'values': [[0, 1, 2, 2, 2, 2]]},
+                        'material': {'visual': {'values': [[0, 1, None, 0, 0, 1]]}},
+                    },
+                ],
+            },
+            'building-1-part': {
+                'type': 'BuildingPart',
+                'parents': ['building-1'],
+                'geometry': [
+                    {'type': 'MultiLineString', 'lod': '1', 'boundaries': [[0, 1], [1, 2, 3]]},
+                    {'type': 'GeometryInstance', 'template': 0, 'boundaries': [8], 'transformationMatrix': [2, 0, 0, 0, 0, 2, 0, 0, 0, 0, 2, 0, 0, 0, 0, 1]},
+                ],
+            },
+            'tree-1': {'type': 'SolitaryVegetationObject', 'geometry': [{'type': 'MultiPoint', 'lod': '1', 'boundaries': [8, 9]}]},
+        },
+        'vertices': [
+            [0, 0, 0],
+            [1000, 0, 0],
+            [1000, 1000, 0],
+            [0, 1000, 0],
+            [0, 0, 1000],
+            [1000, 0, 1000],
+            [1000, 1000, 1000],
+            [0, 1000, 1000],
+            [5000, 5000, 0],
+            [6000, 5000, 0],
+        ],
+    }
+
+    def test_snapshot(self, file_manager):
+        """
+        Test that the City loaded from a snapshot is written as the City that was saved.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        snapshot_path = file_manager.get_empty_file_path()
+        saved_file_path = file_manager.get_empty_file_path()
+        saved_snapshot_file_path = file_manager.get_empty_file_path()
+        city = io.read_cityjson(file_path, packed=True)
+        roof_uuid = city['building-1'].geometries[0].primitive.semantics[1]['uuid']
+
+        # Act
+        io.save_snapshot(city, snapshot_path)
+        snapshot_city = io.load_snapshot(snapshot_path)
+        packed_city = io.load_snapshot(snapshot_path, packed=True)
+        lazy_city = io.load_snapshot(snapshot_path, geometry='lazy')
+        semantic = packed_city['building-1'].geometries[0].primitive.semantics[0]
+        semantic_repr = repr(semantic)
+        io.write_as_cityjson(city, saved_file_path, semantic_uuids=False)
+        io.write_as_cityjson(snapshot_city, saved_snapshot_file_path, semantic_uuids=False)
+
+        # Assert
+        assert open(saved_snapshot_file_path).read() == open(saved_file_path).read()
+        assert snapshot_city.metadata == {'title': 'snapshot'}
+        assert snapshot_city['building-1'].children == [snapshot_city['building-1-part']]
+        assert snapshot_city['building-1-part'].geometries[1].geometry is snapshot_city.geometry_templates[0]
+        assert [m and m.name for m in packed_city['building-1'].geometries[0].primitive.get_materials('visual')] == ['red', 'blue', None, 'red', 'red', 'blue']
+        assert packed_city.materials['red'].diffuseColor == [1.0, 0.0, 0.0]
+        assert semantic_repr == "Semantic({'type': 'GroundSurface'})"
+        assert 'uuid' not in semantic.to_dict(uuid=False)
+        assert packed_city['building-1'].geometries[0].primitive.semantics[1].to_dict(uuid=False) == {'type': 'RoofSurface', 'uuid': roof_uuid}
+        assert lazy_city['tree-1'].get_geometries_loader() is not None
+        assert lazy_city['tree-1'].geometries[0].get_vertices() == snapshot_city['tree-1'].geometries[0].get_vertices()
+
+    def test_snapshot_templates(self, file_manager):
+        """
+        Test that the geometry templates are saved as they are: the City loaded from a snapshot is written as the City that was read.
+        """
+        # Arrange
+        templates = {
+            'templates': [{'type': 'MultiSurface', 'lod': '2', 'boundaries': [[[2, 3, 0]]]}],
+            'vertices-templates': [[0.0, 1.0, 0.0], [9.0, 9.0, 9.0], [0.0, 0.0, 0.0], [1.0, 0.0, 0.0]],
+        }
+        file_path = file_manager.save_json({**self.cityjson, 'geometry-templates': templates})
+        snapshot_path = file_manager.get_empty_file_path()
+        io.save_snapshot(io.read_cityjson(file_path), snapshot_path)
+
+        # Act
+        results = {}
+        for purge_vertices in (True, False):
+            for name, city in (('read', io.read_cityjson(file_path)), ('snapshot', io.load_snapshot(snapshot_path))):
+                saved_file_path = file_manager.get_empty_file_path()
+                io.write_as_cityjson(city, saved_file_path, purge_vertices=purge_vertices, semantic_uuids=False)
+                results[(name, purge_vertices)] = open(saved_file_path).read()
+
+        # Assert
+        assert results[('snapshot', True)] == results[('read', True)]
+        assert results[('snapshot', False)] == results[('read', False)]
+
+    def test_memory_mapped_snapshot(self, file_manager):
+        """
+        Test that the vertices of a memory-mapped snapshot are read-only with 'r' and copied in memory when edited with 'c'.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        snapshot_path = file_manager.get_empty_file_path()
+        saved_file_path = file_manager.get_empty_file_path()
+        saved_snapshot_file_path = file_manager.get_empty_file_path()
+        city = io.read_cityjson(file_path)
+        io.save_snapshot(city, snapshot_path)
+
+        # Act
+        read_only_city = io.load_snapshot(snapshot_path, packed=True, mmap_mode='r')
+        copy_on_write_city = io.load_snapshot(snapshot_path, mmap_mode='c')
+        read_only_vertices = read_only_city.vertices
+        existing_index = read_only_vertices.add([100.0, 200.0, 10.0])
+        new_index = copy_on_write_city.vertices.add([7.0, 7.0, 7.0])
+        io.write_as_cityjson(city, saved_file_path, semantic_uuids=False)
+        io.write_as_cityjson(read_only_city, saved_snapshot_file_path, semantic_uuids=False)
+
+        # Assert
+        assert existing_index == 0
+        assert read_only_vertices.get_mmap_mode() == 'r'
+        with pytest.raises(ValueError):
+            read_only_vertices.add([7.0, 7.0, 7.0])
+        with pytest.raises(ValueError):
+            read_only_vertices.add_many(np.array([[100.0, 200.0, 10.0], [7.0, 7.0, 7.0]]))
+        assert read_only_vertices.get_index([7.0, 7.0, 7.0]) is None
+        assert new_index == 10
+        assert copy_on_write_city.vertices.get_mmap_mode() is None
+        assert io.load_snapshot(snapshot_path, mmap_mode='c').vertices.get_mmap_mode() == 'c'
+        assert len(io.load_snapshot(snapshot_path).vertices) == 10
+        assert open(saved_snapshot_file_path).read() == open(saved_file_path).read()
@@ -0,0 +1,84 @@
+import gc
+import weakref
+
+from pycityjson import io, model
+
+
+class TestSpatialIntegration:
+    cityjson = {
+        'type': 'CityJSON',
+        'version': '2.0',
+        'transform': {'scale': [0.001, 0.001, 0.001], 'translate': [0.0, 0.0, 0.0]},
+        'CityObjects': {
+            f'building-{x}-{y}': {
+                'type': 'Building',
+                'geometry': [{'type': 'MultiSurface', 'lod': '1', 'boundaries': [[[4 * (10 * x + y) + i for i in range(4)]]]}],
+            }
+            for x in range(10)
+            for y in range(10)
+        },
+        'vertices': [[(10 * x + dx) * 1000, (10 * y + dy) * 1000, 0] for x in range(10) for y in range(10) for dx, dy in [(0, 0), (5, 0), (5, 5), (0, 5)]],
+    }
+
+    def test_spatial_index(self, file_manager):
+        """
+        Test that the queries find the CityObjects by their extent and follow the transformations of the CityObjects.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        city = io.read_cityjson(file_path)
+
+        # Act
+        spatial_index = model.SpatialIndex(city.cityobjects, node_size=4)
+        in_bbox = spatial_index.query_bbox([12.0, 12.0, 31.0, 21.0])
+        at_point = spatial_index.query_point([42.0, 73.0])
+        nearest = spatial_index.nearest([56.0, 2.0], k=2)
+        city['building-0-0'].transform(model.TransformationMatrix().translate([200.0, 0.0, 0.0]))
+
+        # Assert
+        assert len(spatial_index) == 100
+        assert [cityobject.uuid() for cityobject in in_bbox] == ['building-1-1', 'building-1-2', 'building-2-1', 'building-2-2', 'building-3-1', 'building-3-2']
+        assert [cityobject.uuid() for cityobject in at_point] == ['building-4-7']
+        assert [cityobject.uuid() for cityobject in nearest] == ['building-5-0', 'building-6-0']
+        assert spatial_index.query_point([1.0, 1.0]) == []
+        assert spatial_index.query_point([201.0, 1.0]) == [city['building-0-0']]
+
+    def test_rebuilt_spatial_index(self, file_manager):
+        """
+        Test that a spatial index that is no longer used is not kept alive by the CityObjects it indexed.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        city = io.read_cityjson(file_path)
+        old_index = weakref.ref(model.SpatialIndex(city.cityobjects))
+
+        # Act
+        spatial_index = model.SpatialIndex(city.cityobjects)
+        gc.collect()
+        city['building-0-0'].transform(model.TransformationMatrix().translate([200.0, 0.0, 0.0]))
+
+        # Assert
+        assert old_index() is None
+        assert spatial_index.query_point([201.0, 1.0]) == [city['building-0-0']]
+
+    def test_cached_extent(self, file_manager):
+        """
+        Test that the cached bounding boxes are updated when the geometries are modified.
+        """
+        # Arrange
+        file_path = file_manager.save_json(self.cityjson)
+        city = io.read_cityjson(file_path)
+        cityobject = city['building-9-9']
+        extent = cityobject.set_geographical_extent()
+
+        # Act
+        cityobject.transform(model.TransformationMatrix().translate([10.0, 0.0, 1.0]))
+        primitive = cityobject.geometries[0].primitive
+        primitive.get_surfaces()[0].get_children()[0].add_child(model.Point(100.0, 100.0, 1.0))
+        city.set_geographical_extent()
+
+        # Assert
+        assert extent == [90.0, 90.0, 0.0, 95.0, 95.0, 0.0]
+        assert cityobject.geo_extent == [100.0, 90.0, 1.0, 105.0, 95.0, 1.0]
+        assert cityobject.get_min_max() == ([100.0, 90.0, 1.0], [105.0, 100.0, 1.0])
+        assert city.metadata['geographicalExtent'] == [0.0, 0.0, 0.0, 105.0, 100.0, 1.0]
@@ -0,0 +1,63 @@
+import numpy as np
+
+from pycityjson import model
+
+
+class TestTransformIntegration:
+    cube = [
+        [[[0.0, 0.0, 0.0], [0.0, 1.0, 0.0], [1.0, 1.0, 0.0], [1.0, 0.0, 0.0]]],
+        [[[0.0, 0.0, 1.0], [1.0, 0.0, 1.0], [1.0, 1.0, 1.0], [0.0, 1.0, 1.0]]],
+        [[[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 0.0, 1.0], [0.0, 0.0, 1.0]], [[0.2, 0.0, 0.2], [0.4, 0.0, 0.2], [0.4, 0.0, 0.4]]],
+    ]
+    matrix = model.TransformationMatrix().rotate_z(30.0).scale([2.0, 2.0, 1.0]).translate([10.0, 20.0, 5.0])
+
+    def __get_solid(self) -> model.Solid:
+        """
+        :return: Solid with the faces of the cube (one with a hole)
+        """
+        surfaces = []
+        for rings in self.cube:
+            surface = model.MultiLineString()
+            for ring in rings:
+                surface.add_child(model.MultiPoint([model.Point(*vertex) for vertex in ring]))
+            surfaces.append(surface)
+        return model.Solid([model.MultiSurface(surfaces)])
+
+    def test_transform_primitive(self):
+        """
+        Test that a Primitive tree is transformed at once as each of its points would be transformed one by one.
+        """
+        # Arrange
+        solid = self.__get_solid()
+        expected = self.__get_solid()
+        center = [0.5, 0.5, 0.0]
+
+        # Act
+        solid.transform(self.matrix, center)
+        for point in expected.get_points():
+            point.transform(self.matrix, center)
+
+        # Assert
+        assert np.allclose(solid.get_vertices(flatten=True), expected.get_vertices(flatten=True))
+        assert np.allclose(solid.get_min_max(), expected.get_min_max())
+
+    def test_reproject_vertices(self):
+        """
+        Test that an array of vertices is reprojected as the same nested lists and keeps its shape.
+        """
+        # Arrange
+        array = np.array(self.cube[:2])
+        nested = array.tolist()
+
+        # Act
+        reprojected_array = self.matrix.reproject_vertices(array)
+        reprojected_list = self.matrix.reproject_vertices(nested)
+        reprojected_vertices = [self.matrix.reproject_vertex(vertex) for vertex in array.reshape(-1, 3).tolist()]
+        empty = self.matrix.reproject_vertices(np.empty((0, 3)))
+
+        # Assert
+        assert isinstance(reprojected_array, np.ndarray) and reprojected_array.shape == array.shape
+        assert isinstance(reprojected_list, list)
+        assert np.allclose(reprojected_array, reprojected_list)
+        assert np.allclose(reprojected_array.reshape(-1, 3), reprojected_vertices)
+        assert empty.shape == (0, 3)
@@ -0,0 +1,58 @@
+import numpy as np
+
+from pycityjson import model
+
+
+class TestVerticesIntegration:
+    vertices = [
+        [1.0, 2.0, 3.0],
+        [1.0004, 2.0, 3.0],
+        [4.0, 5.0, 6.0],
+        [0.9996, 2.0, 3.0],
+        [1.0, 2.0, 3.0015],
+        [4.0, 5.0, 6.0],
+    ]
+
+    def test_add_many(self):
+        """
+        Test that add_many() deduplicates the vertices on the precision grid and gives the same indexes as add() on each vertex.
+        """
+        # Arrange
+        vertices = model.Vertices(precision=3, start_index=10)
+        added_vertices = model.Vertices(precision=3, start_index=10)
+        added_vertices.add([7.0, 8.0, 9.0])
+
+        # Act
+        indexes = vertices.add_many(np.array(self.vertices))
+        added_indexes = added_vertices.add_many(np.array(self.vertices))
+        expected_vertices = model.Vertices(precision=3, start_index=10)
+        expected_indexes = [expected_vertices.add(vertex) for vertex in self.vertices]
+
+        # Assert
+        assert indexes.tolist() == expected_indexes == [10, 10, 11, 10, 12, 11]
+        assert vertices.tolist() == expected_vertices.tolist() == [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0], [1.0, 2.0, 3.002]]
+        assert added_indexes.tolist() == [11, 11, 12, 11, 13, 12]
+        assert added_vertices.get_index([1.0001, 2.0, 3.0]) == 11
+        assert model.Vertices(precision=3).add_many(np.array([[1, 2, 3], [1, 2, 3]])).tolist() == [0, 0]
+
+    def test_from_array(self):
+        """
+        Test that from_array() keeps each row as a vertex, rounds the floats to the precision and indexes the first occurrence of a vertex.
+        """
+        # Arrange
+        array = np.array(self.vertices)
+        integer_array = np.array([[1, 2, 3], [1, 2, 3], [4, 5, 6]])
+
+        # Act
+        vertices = model.Vertices.from_array(array, precision=3)
+        integer_vertices = model.Vertices.from_array(integer_array, precision=3)
+        index = vertices.get_index([1.0001, 2.0, 3.0])
+        added_index = vertices.add([4.0, 5.0, 6.0])
+        new_index = vertices.add([7.0, 8.0, 9.0])
+
+        # Assert
+        assert len(integer_vertices) == 3
+        assert np.shares_memory(integer_vertices.toarray(), integer_array)
+        assert vertices.tolist()[:6] == [[1.0, 2.0, 3.0], [1.0, 2.0, 3.0], [4.0, 5.0, 6.0], [1.0, 2.0, 3.0], [1.0, 2.0, 3.002], [4.0, 5.0, 6.0]]
+        assert (index, added_index, new_index) == (0, 2, 6)
+        assert integer_vertices.add([1, 2, 3]) == 0